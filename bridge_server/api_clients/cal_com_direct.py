@@ -8,8 +8,24 @@ from typing import Optional, Dict, Any, List
 import pytz
 from pydantic import BaseModel, EmailStr
 
+from core.adaptive_timeout import adaptive_timeouts
+from core.circuit_breaker import CircuitBreaker, CircuitOpenError, get_breaker
+from core.deadline import DeadlineExceeded, check_deadline, remaining_seconds, request_timeout
+from core.hedging import HedgePolicy, get_hedge_policy
+from core.json_codec import json_request, response_json
+from core.metrics import OUTCOMES, STAGE_SECONDS
+from core.rate_limiter import RateLimited, RateLimiter, get_rate_limiter
+from core.slot_cache import SlotCache, utc_day
+from core.slot_index import SlotIndex
+
 logger = logging.getLogger(__name__)
 
+_SLOTS_STAGE = STAGE_SECONDS.labels("cal_com_slots")
+_BOOKING_STAGE = STAGE_SECONDS.labels("cal_com_post")
+_BOOKING_CREATED = OUTCOMES.labels("cal_com_booking", "success")
+_BOOKING_REJECTED = OUTCOMES.labels("cal_com_booking", "failure")
+_BOOKING_ERROR = OUTCOMES.labels("cal_com_booking", "error")
+
 class CalComBookingInput(BaseModel):
     """Input for creating a Cal.com booking"""
     localDate: str  # YYYY-MM-DD
@@ -35,11 +51,22 @@ class CalComBookingOutput(BaseModel):
     meet_url: Optional[str] = None
     booking_details: Optional[Dict[str, Any]] = None
     error_details: Optional[str] = None
+    retryable: bool = False  # Transient failure (network, 429, 5xx) - safe to try again later
 
 class CalComDirectClient:
     """Direct client for Cal.com API v2"""
     
-    def __init__(self, api_key: str, api_base_url: str = "https://api.cal.com/v2"):
+    def __init__(
+        self,
+        api_key: str,
+        api_base_url: str = "https://api.cal.com/v2",
+        http_client: Optional[httpx.AsyncClient] = None,
+        slot_cache: Optional[SlotCache] = None,
+        validate_slots_from_cache: bool = True,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None
+    ):
         self.api_key = api_key
         self.api_base_url = api_base_url.rstrip('/')
         self.headers = {
@@ -47,6 +74,46 @@ class CalComDirectClient:
             "Content-Type": "application/json",
             "cal-api-version": "2024-08-13"  # Required for Cal.com API v2
         }
+        # Shared pooled client injected by the app lifespan; created lazily when used standalone
+        self._http_client = http_client
+        self._owns_http_client = http_client is None
+        # Availability cache; when a day is cached, bookings for taken slots fail locally
+        self.slot_cache = slot_cache or SlotCache()
+        self.validate_slots_from_cache = validate_slots_from_cache
+        # Fails calls fast while Cal.com is down instead of waiting out the timeout
+        self.breaker = circuit_breaker or get_breaker("cal_com")
+        # Re-sends slow slot lookups (idempotent GETs) when hedging is enabled
+        self.hedging = hedge_policy or get_hedge_policy("cal_com")
+        # Paces requests per API key by Cal.com's rate-limit headers, queueing briefly instead of getting 429s
+        self.rate_limiter = rate_limiter or get_rate_limiter("cal_com", api_key)
+    
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client used for every Cal.com request"""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(10.0, connect=5.0),
+                limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
+            )
+            self._owns_http_client = True
+        return self._http_client
+    
+    async def aclose(self) -> None:
+        """Close the HTTP client if this instance created it"""
+        if self._owns_http_client and self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+    
+    async def warm_up(self, event_type_id: Optional[int] = None) -> None:
+        """Open a pooled connection to Cal.com ahead of the first webhook.
+        
+        With an event type, today's slots are prefetched into the slot cache instead (which opens it too).
+        """
+        if event_type_id is not None:
+            await self.get_available_slots(event_type_id, utc_day(int(datetime.now(pytz.UTC).timestamp())))
+            return
+        # Any response will do - the point is the DNS lookup and TLS handshake
+        await self.http_client.head(self.api_base_url)
     
     def _convert_to_utc(self, local_date: str, local_time: str, timezone_str: str) -> datetime:
         """Convert local date/time to UTC"""
@@ -59,8 +126,82 @@ class CalComDirectClient:
             logger.error(f"Error converting to UTC: {e}")
             raise
     
-    # REMOVED: check_availability method - Cal.com API already validates availability during booking creation
-    # This eliminates an unnecessary API call and improves performance
+    async def _fetch_slots(self, event_type_id: int, first_day: str, last_day: str) -> httpx.Response:
+        """GET /slots for a range of UTC days (hedged when enabled)"""
+        with self.breaker.guard() as call, _SLOTS_STAGE.time(), adaptive_timeouts.measure("cal_com", "slots"):
+            response = await self.hedging.run("slots", lambda: self.http_client.get(
+                f"{self.api_base_url}/slots",
+                headers={**self.headers, "cal-api-version": "2024-09-04"},
+                params={
+                    "eventTypeId": event_type_id,
+                    "start": f"{first_day}T00:00:00Z",
+                    "end": f"{last_day}T23:59:59Z"
+                },
+                timeout=request_timeout(
+                    adaptive_timeouts.httpx_timeout("cal_com", "slots", self.http_client.timeout), "Cal.com slots lookup"
+                )
+            ))
+            call.failed = response.status_code >= 500
+        return response
+    
+    async def _post_booking(self, booking_data: Dict[str, Any]) -> httpx.Response:
+        """POST /bookings over the shared connection pool.
+
+        The deadline is only checked before sending: once sent, the booking is not abandoned when the
+        caller's budget runs out (Cal.com may commit it anyway, and a retry would book twice). For the
+        same reason it keeps the static timeout rather than an adaptive one.
+        """
+        check_deadline("Cal.com booking")
+        with self.breaker.guard() as call, _BOOKING_STAGE.time(), adaptive_timeouts.measure("cal_com", "booking"):
+            response = await self.http_client.post(
+                f"{self.api_base_url}/bookings",
+                **json_request(booking_data, self.headers),
+                timeout=self.http_client.timeout
+            )
+            call.failed = response.status_code >= 500
+        return response
+    
+    async def get_slot_index(self, event_type_id: int, days: List[str]) -> SlotIndex:
+        """Available slot starts (epoch seconds) for the given UTC days, served from the slot cache when fresh.
+        
+        Days missing from the cache are fetched with a single /slots call spanning them.
+        """
+        found, missing = self.slot_cache.get_many(event_type_id, days)
+        if missing:
+            response = await self.rate_limiter.send(
+                lambda: self._fetch_slots(event_type_id, min(missing), max(missing)),
+                remaining_seconds(self.rate_limiter.max_wait, "Cal.com slots lookup")
+            )
+            response.raise_for_status()
+            self.slot_cache.put_response(event_type_id, missing, response_json(response).get("data") or {})
+            for day in missing:
+                found[day] = self.slot_cache.get(event_type_id, day) or SlotIndex()
+        if len(found) == 1:
+            return next(iter(found.values()))
+        return SlotIndex.merge(found[day] for day in sorted(found))
+    
+    async def get_available_slots(self, event_type_id: int, day: str) -> SlotIndex:
+        """Available slot starts for a single UTC day"""
+        return await self.get_slot_index(event_type_id, [day])
+    
+    async def is_slot_available(self, event_type_id: int, start_utc: datetime) -> bool:
+        """Check a slot against cached availability, fetching the day's slots on a cache miss"""
+        start_epoch = int(start_utc.timestamp())
+        return start_epoch in await self.get_available_slots(event_type_id, utc_day(start_epoch))
+    
+    async def suggest_slots(
+        self,
+        event_type_id: int,
+        target_utc: datetime,
+        count: int = 3,
+        search_days: int = 1
+    ) -> List[datetime]:
+        """The `count` free slots nearest to target_utc (other than target_utc itself), searching `search_days` either side of its day"""
+        target = int(target_utc.timestamp())
+        days = [utc_day(target + offset * 86400) for offset in range(-search_days, search_days + 1)]
+        index = await self.get_slot_index(event_type_id, days)
+        now = int(datetime.now(pytz.UTC).timestamp())
+        return [datetime.fromtimestamp(start, tz=pytz.UTC) for start in index.nearest(target, count, not_before=now, exclude_target=True)]
     
     async def create_booking(self, booking_input: CalComBookingInput) -> CalComBookingOutput:
         """Create a booking in Cal.com"""
@@ -76,8 +217,15 @@ class CalComDirectClient:
             duration_minutes = booking_input.eventDurationMinutes or 30
             end_utc = start_utc + timedelta(minutes=duration_minutes)
             
-            # Skip availability check - Cal.com API will validate during booking creation
-            # This improves performance by eliminating an extra API call
+            # No upstream availability check - Cal.com validates during booking creation.
+            # If the day's slots are already cached, reject taken slots locally instead.
+            start_epoch = int(start_utc.timestamp())
+            if self.validate_slots_from_cache and self.slot_cache.is_available(booking_input.eventTypeId, start_epoch) is False:
+                return CalComBookingOutput(
+                    success=False,
+                    message="The requested time slot is not available",
+                    error_details=f"Slot {start_utc.isoformat()} is not available for event type {booking_input.eventTypeId}"
+                )
             
             # Prepare booking data for Cal.com API v2
             booking_data = {
@@ -96,62 +244,72 @@ class CalComDirectClient:
             if booking_input.guests:
                 booking_data["guests"] = booking_input.guests
             
-            # Create the booking with optimized timeout and connection pooling
-            async with httpx.AsyncClient(
-                timeout=httpx.Timeout(10.0, connect=5.0),  # Reduced from 30s
-                limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
-            ) as client:
-                response = await client.post(
-                    f"{self.api_base_url}/bookings",
-                    headers=self.headers,
-                    json=booking_data
+            # Create the booking (a 429 is retried once if Cal.com's Retry-After fits in the budget)
+            try:
+                response = await self.rate_limiter.send(
+                    lambda: self._post_booking(booking_data),
+                    remaining_seconds(self.rate_limiter.max_wait, "Cal.com booking")
                 )
+            finally:
+                # The day's availability has changed (or our cached view was wrong) - also when the
+                # request failed in flight, since Cal.com may have created the booking anyway
+                self.slot_cache.invalidate(booking_input.eventTypeId, utc_day(start_epoch))
+            
+            if response.status_code in [200, 201]:
+                result = response_json(response)
+                booking_info = result.get("data", result)
+                _BOOKING_CREATED.inc()
+                
+                return CalComBookingOutput(
+                    success=True,
+                    message="Booking created successfully",
+                    booking_id=str(booking_info.get("id", "")),
+                    booking_uid=booking_info.get("uid", ""),
+                    title=booking_info.get("title", "Meeting"),
+                    start_time=start_utc.isoformat(),
+                    end_time=end_utc.isoformat(),
+                    meet_url=booking_info.get("meetingUrl", ""),
+                    booking_details={
+                        "id": booking_info.get("id"),
+                        "uid": booking_info.get("uid"),
+                        "title": booking_info.get("title"),
+                        "startTime": start_utc.isoformat(),
+                        "endTime": end_utc.isoformat(),
+                        "attendees": [{
+                            "name": booking_input.attendeeName,
+                            "email": booking_input.attendeeEmail
+                        }],
+                        "status": "accepted",
+                        "eventTypeId": booking_input.eventTypeId
+                    }
+                )
+            else:
+                error_msg = f"Cal.com API error: {response.status_code}"
+                try:
+                    error_data = response_json(response)
+                    error_msg = f"{error_msg} - {error_data}"
+                except:
+                    error_msg = f"{error_msg} - {response.text}"
+                _BOOKING_REJECTED.inc()
                 
-                if response.status_code in [200, 201]:
-                    result = response.json()
-                    booking_info = result.get("data", result)
-                    
-                    return CalComBookingOutput(
-                        success=True,
-                        message="Booking created successfully",
-                        booking_id=str(booking_info.get("id", "")),
-                        booking_uid=booking_info.get("uid", ""),
-                        title=booking_info.get("title", "Meeting"),
-                        start_time=start_utc.isoformat(),
-                        end_time=end_utc.isoformat(),
-                        meet_url=booking_info.get("meetingUrl", ""),
-                        booking_details={
-                            "id": booking_info.get("id"),
-                            "uid": booking_info.get("uid"),
-                            "title": booking_info.get("title"),
-                            "startTime": start_utc.isoformat(),
-                            "endTime": end_utc.isoformat(),
-                            "attendees": [{
-                                "name": booking_input.attendeeName,
-                                "email": booking_input.attendeeEmail
-                            }],
-                            "status": "accepted",
-                            "eventTypeId": booking_input.eventTypeId
-                        }
-                    )
-                else:
-                    error_msg = f"Cal.com API error: {response.status_code}"
-                    try:
-                        error_data = response.json()
-                        error_msg = f"{error_msg} - {error_data}"
-                    except:
-                        error_msg = f"{error_msg} - {response.text}"
-                    
-                    return CalComBookingOutput(
-                        success=False,
-                        message="Failed to create booking",
-                        error_details=error_msg
-                    )
-                    
+                return CalComBookingOutput(
+                    success=False,
+                    message="Failed to create booking",
+                    error_details=error_msg,
+                    retryable=response.status_code == 429 or response.status_code >= 500
+                )
+                
+        except (DeadlineExceeded, CircuitOpenError, RateLimited):
+            _BOOKING_ERROR.inc()
+            raise
         except Exception as e:
+            _BOOKING_ERROR.inc()
+            # A timeout caused by the request budget running out is reported as such
+            check_deadline("Cal.com booking")
             logger.exception("Error creating Cal.com booking")
             return CalComBookingOutput(
                 success=False,
                 message="An error occurred while creating the booking",
-                error_details=str(e)
+                error_details=str(e),
+                retryable=True
             )
\ No newline at end of file
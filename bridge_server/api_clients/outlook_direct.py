@@ -1,21 +1,39 @@
 """
 Direct Microsoft Graph API client for Outlook - bypasses MCP layer
 """
+import asyncio
 import httpx
 import logging
-from typing import Optional, Dict, Any
-from datetime import datetime, timedelta
-import json
+from typing import Optional, Dict, Any, Tuple
+from datetime import datetime
 from pydantic import BaseModel, EmailStr
 
+from core.adaptive_timeout import adaptive_timeouts
+from core.circuit_breaker import CircuitBreaker, CircuitOpenError, get_breaker
+from core.deadline import DeadlineExceeded, check_deadline, current_deadline, remaining_seconds, request_timeout
+from core.email_templates import EmailTemplateEngine, default_engine
+from core.graph_batch import GraphBatcher, GRAPH_BATCH_LIMIT
+from core.hedging import HedgePolicy, get_hedge_policy
+from core.json_codec import json_request, response_json
+from core.metrics import OUTCOMES, STAGE_SECONDS
+from core.rate_limiter import RateLimited, RateLimiter, get_rate_limiter
+from core.token_manager import AccessTokenManager
+
 logger = logging.getLogger(__name__)
 
+_TOKEN_STAGE = STAGE_SECONDS.labels("token_acquisition")
+_SEND_MAIL_STAGE = STAGE_SECONDS.labels("graph_send_mail")
+_MAIL_SENT = OUTCOMES.labels("graph_send_mail", "success")
+_MAIL_REJECTED = OUTCOMES.labels("graph_send_mail", "failure")
+_MAIL_ERROR = OUTCOMES.labels("graph_send_mail", "error")
+
 class OutlookEmailInput(BaseModel):
     """Input for sending an email via Outlook"""
     recipientEmail: EmailStr
     emailSubject: str
     emailBodyHtml: str
     saveToSentItems: bool = True
+    template: Optional[str] = None  # Named template in templates/email (default, confirmation, follow_up, reminder)
 
 class OutlookEmailOutput(BaseModel):
     """Output from email sending"""
@@ -24,6 +42,7 @@ class OutlookEmailOutput(BaseModel):
     message_id: Optional[str] = None
     details: Optional[Dict[str, Any]] = None
     error_details: Optional[str] = None
+    retryable: bool = False  # Transient failure (network, 429, 5xx) - safe to try again later
 
 class OutlookDirectClient:
     """Direct client for Microsoft Graph API"""
@@ -33,179 +52,229 @@ class OutlookDirectClient:
         tenant_id: str, 
         client_id: str, 
         client_secret: str, 
-        sender_upn: str
+        sender_upn: str,
+        graph_base_url: str = "https://graph.microsoft.com/v1.0",
+        login_base_url: str = "https://login.microsoftonline.com",
+        graph_http_client: Optional[httpx.AsyncClient] = None,
+        login_http_client: Optional[httpx.AsyncClient] = None,
+        batch_window_seconds: float = 0.0,
+        batch_max_size: int = GRAPH_BATCH_LIMIT,
+        template_engine: Optional[EmailTemplateEngine] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None
     ):
         self.tenant_id = tenant_id
         self.client_id = client_id
         self.client_secret = client_secret
         self.sender_upn = sender_upn
-        self.graph_base_url = "https://graph.microsoft.com/v1.0"
-        self._access_token = None
-        self._token_expiry = None
+        self.graph_base_url = graph_base_url.rstrip('/')
+        self.login_base_url = login_base_url.rstrip('/')
+        # Single-flight token cache, refreshed in the background 5 minutes before expiry
+        self.token_manager = AccessTokenManager(
+            self._fetch_access_token, name="graph", refresh_margin=300
+        )
+        # Shared pooled clients injected by the app lifespan; created lazily when used standalone
+        self._graph_http_client = graph_http_client
+        self._login_http_client = login_http_client
+        self._owned_http_clients = []
+        # sendMail calls arriving within the window are coalesced into one Graph $batch (0 = off)
+        self._batcher: Optional[GraphBatcher] = None
+        if batch_window_seconds > 0:
+            self._batcher = GraphBatcher(
+                self._send_graph_batch,
+                self._send_graph_request,
+                window_seconds=batch_window_seconds,
+                max_batch_size=batch_max_size
+            )
+        self._template_engine = template_engine
+        # Fails sends fast while Graph (or the token endpoint) is down instead of waiting out the timeout
+        self.breaker = circuit_breaker or get_breaker("graph")
+        # Re-sends slow Graph reads (idempotent GETs) when hedging is enabled
+        self.hedging = hedge_policy or get_hedge_policy("graph")
+        # Paces Graph requests per tenant by its throttling headers, queueing briefly instead of getting 429s
+        self.rate_limiter = rate_limiter or get_rate_limiter("graph", tenant_id)
+    
+    def _own_client(self) -> httpx.AsyncClient:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
+        )
+        self._owned_http_clients.append(client)
+        return client
+    
+    @property
+    def graph_http_client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client for graph.microsoft.com"""
+        if self._graph_http_client is None or self._graph_http_client.is_closed:
+            self._graph_http_client = self._own_client()
+        return self._graph_http_client
+    
+    @property
+    def login_http_client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client for the Azure AD token endpoint"""
+        if self._login_http_client is None or self._login_http_client.is_closed:
+            self._login_http_client = self._own_client()
+        return self._login_http_client
+    
+    async def aclose(self) -> None:
+        """Close any HTTP clients this instance created itself"""
+        if self._batcher is not None:
+            await self._batcher.aclose()
+        self.token_manager.close()
+        for client in self._owned_http_clients:
+            await client.aclose()
+        self._owned_http_clients.clear()
+    
+    async def warm_up(self) -> None:
+        """Fetch the access token and open a pooled connection to Graph ahead of the first email"""
+        # Any Graph response will do - the point is the DNS lookup and TLS handshake
+        await asyncio.gather(self.token_manager.get_token(), self.graph_http_client.head(self.graph_base_url))
     
     async def _get_access_token(self) -> str:
-        """Get or refresh the access token"""
-        # Check if we have a valid token
-        if self._access_token and self._token_expiry and datetime.utcnow() < self._token_expiry:
-            return self._access_token
-        
-        # Get new token
-        token_url = f"https://login.microsoftonline.com/{self.tenant_id}/oauth2/v2.0/token"
+        """Get the cached access token; only awaits the token endpoint when none is usable"""
+        token = self.token_manager.peek()
+        if token is not None:
+            return token
+        deadline = current_deadline()
+        if deadline is None:
+            return await self.token_manager.get_token()
+        # The fetch itself is shared with other callers; only this caller's wait is bounded by its budget
+        try:
+            timeout = deadline.check("Azure AD token fetch")
+            return await asyncio.wait_for(self.token_manager.get_token(), timeout)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("Azure AD token fetch")
+    
+    async def _fetch_access_token(self) -> Tuple[str, int]:
+        """Request a new access token from Azure AD, returning (token, expires_in)"""
+        token_url = f"{self.login_base_url}/{self.tenant_id}/oauth2/v2.0/token"
         
-        async with httpx.AsyncClient(
-            timeout=httpx.Timeout(10.0, connect=5.0),  # Optimized from 30s
-            limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
-        ) as client:
-            try:
-                response = await client.post(
+        try:
+            with _TOKEN_STAGE.time(), adaptive_timeouts.measure("login", "token"):
+                response = await self.login_http_client.post(
                     token_url,
                     data={
                         "client_id": self.client_id,
                         "client_secret": self.client_secret,
                         "scope": "https://graph.microsoft.com/.default",
                         "grant_type": "client_credentials"
-                    }
+                    },
+                    timeout=adaptive_timeouts.httpx_timeout("login", "token", self.login_http_client.timeout)
                 )
+            
+            if response.status_code == 200:
+                token_data = response_json(response)
+                return token_data["access_token"], int(token_data.get("expires_in", 3600))
+            else:
+                error_msg = f"Failed to get access token: {response.status_code}"
+                try:
+                    error_data = response_json(response)
+                    error_msg = f"{error_msg} - {error_data}"
+                except:
+                    error_msg = f"{error_msg} - {response.text}"
+                logger.error(error_msg)
+                raise Exception(error_msg)
                 
-                if response.status_code == 200:
-                    token_data = response.json()
-                    self._access_token = token_data["access_token"]
-                    # Set expiry 5 minutes before actual expiry
-                    expires_in = token_data.get("expires_in", 3600)
-                    self._token_expiry = datetime.utcnow() + timedelta(seconds=expires_in - 300)
-                    return self._access_token
-                else:
-                    error_msg = f"Failed to get access token: {response.status_code}"
-                    try:
-                        error_data = response.json()
-                        error_msg = f"{error_msg} - {error_data}"
-                    except:
-                        error_msg = f"{error_msg} - {response.text}"
-                    logger.error(error_msg)
-                    raise Exception(error_msg)
-                    
-            except Exception as e:
-                logger.exception("Error getting access token")
-                raise
+        except Exception as e:
+            logger.exception("Error getting access token")
+            raise
     
-    def _format_email_html(self, content: str) -> str:
-        """Format email content with proper HTML structure for Outlook compatibility"""
-        # Clean up content by adding proper line breaks and structure
-        formatted_content = content.replace('\n', '<br>')
+    async def _send_graph_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one Graph request ({method, url, headers, body}) and return {status, headers, body}"""
+        access_token = await self._get_access_token()
+        # Timeouts are tracked per operation (the last path segment, e.g. sendMail), not per mailbox
+        operation = f"{request['method']} {request['url'].rsplit('/', 1)[-1]}"
+        
+        async def send() -> httpx.Response:
+            if request["method"] == "GET":
+                timeout = request_timeout(
+                    adaptive_timeouts.httpx_timeout("graph", operation, self.graph_http_client.timeout),
+                    f"Graph {request['method']} {request['url']}"
+                )
+            else:
+                # A write (sendMail) isn't cut short by the caller's deadline or an adaptive timeout once
+                # sent - it may go through anyway
+                check_deadline(f"Graph {request['method']} {request['url']}")
+                timeout = self.graph_http_client.timeout
+            with adaptive_timeouts.measure("graph", operation):
+                return await self.graph_http_client.request(
+                    request["method"],
+                    f"{self.graph_base_url}{request['url']}",
+                    **json_request(request.get("body"), {**request.get("headers", {}), "Authorization": f"Bearer {access_token}"}),
+                    timeout=timeout
+                )
         
-        # Create a professional HTML email template
-        html_template = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style type="text/css">
-        /* Reset styles for Outlook */
-        .ExternalClass, .ExternalClass p, .ExternalClass span, 
-        .ExternalClass font, .ExternalClass td, .ExternalClass div {{
-            line-height: 100%;
-        }}
-        p {{
-            margin: 0;
-            padding: 0;
-            margin-bottom: 15px;
-            line-height: 1.6;
-        }}
-        /* Table styles */
-        table {{
-            border-collapse: collapse;
-            mso-table-lspace: 0px;
-            mso-table-rspace: 0px;
-        }}
-        td, a, span {{
-            border-collapse: collapse;
-            mso-line-height-rule: exactly;
-        }}
-        /* Custom styles */
-        .email-container {{
-            font-family: Arial, sans-serif;
-            font-size: 14px;
-            line-height: 1.6;
-            color: #333333;
-        }}
-        .header {{
-            background-color: #f8f9fa;
-            padding: 20px;
-            border-bottom: 2px solid #e9ecef;
-        }}
-        .content {{
-            padding: 25px;
-        }}
-        .footer {{
-            background-color: #343a40;
-            color: #ffffff;
-            padding: 20px;
-            font-size: 12px;
-        }}
-        h1, h2, h3 {{
-            margin-top: 20px;
-            margin-bottom: 10px;
-            font-weight: bold;
-        }}
-        h1 {{ font-size: 24px; color: #2c3e50; }}
-        h2 {{ font-size: 18px; color: #34495e; }}
-        h3 {{ font-size: 16px; color: #34495e; }}
-        ul, ol {{
-            margin-bottom: 15px;
-            padding-left: 20px;
-        }}
-        li {{
-            margin-bottom: 8px;
-            line-height: 1.6;
-        }}
-        .cta-button {{
-            background-color: #007bff;
-            color: #ffffff;
-            padding: 12px 24px;
-            text-decoration: none;
-            border-radius: 5px;
-            display: inline-block;
-            margin: 15px 0;
-            font-weight: bold;
-        }}
-        .highlight {{
-            background-color: #fff3cd;
-            padding: 10px;
-            border-left: 4px solid #ffc107;
-            margin: 15px 0;
-        }}
-    </style>
-</head>
-<body style="margin: 0; padding: 0;">
-    <table width="100%" cellpadding="0" cellspacing="0" border="0" style="max-width: 600px; margin: 0 auto;">
-        <tr>
-            <td class="email-container">
-                <div class="content">
-                    {formatted_content}
-                </div>
-                <div class="footer">
-                    <p style="margin: 0; text-align: center;">
-                        <strong>Stuart | AI Sales Strategist</strong><br>
-                        Cre8tive AI<br>
-                        📧 stuart@cre8tive.ai | 🌐 <a href="https://cre8tive.ai" style="color: #ffffff;">cre8tive.ai</a>
-                    </p>
-                </div>
-            </td>
-        </tr>
-    </table>
-</body>
-</html>"""
-        return html_template
+        response = await self.rate_limiter.send(send, remaining_seconds(self.rate_limiter.max_wait, f"Graph {operation}"))
+        try:
+            body = response_json(response) if response.content else None
+        except ValueError:
+            body = response.text
+        return {"status": response.status_code, "headers": dict(response.headers), "body": body}
+    
+    async def _send_graph_batch(self, requests: list) -> list:
+        """POST up to 20 requests as one Graph $batch and return the per-request responses"""
+        access_token = await self._get_access_token()
+        
+        async def send() -> httpx.Response:
+            # Shared by every caller in the batch, so no single request's deadline applies; the batch carries
+            # writes (sendMail), so it keeps the static timeout rather than an adaptive one
+            with adaptive_timeouts.measure("graph", "POST $batch"):
+                return await self.graph_http_client.post(
+                    f"{self.graph_base_url}/$batch",
+                    **json_request({"requests": requests}, {"Authorization": f"Bearer {access_token}"})
+                )
+        
+        response = await self.rate_limiter.send(send)
+        if response.status_code != 200:
+            # The whole batch was rejected (e.g. throttled) - every request gets that outcome
+            try:
+                body = response_json(response)
+            except ValueError:
+                body = response.text
+            return [{"id": r["id"], "status": response.status_code, "headers": dict(response.headers), "body": body} for r in requests]
+        responses = response_json(response).get("responses", [])
+        # Requests inside a batch are throttled individually, with their own Retry-After
+        for item in responses:
+            if item.get("status") == 429:
+                self.rate_limiter.observe(429, item.get("headers") or {})
+        return responses
+    
+    async def _send_mail(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """POST /users/{upn}/sendMail, coalesced into a $batch with concurrent sends when batching is on"""
+        request = {
+            "method": "POST",
+            "url": f"/users/{self.sender_upn}/sendMail",
+            "headers": {"Content-Type": "application/json"},
+            "body": message
+        }
+        if self._batcher is None:
+            return await self._send_graph_request(request)
+        deadline = current_deadline()
+        if deadline is None:
+            return await self._batcher.submit(request)
+        try:
+            timeout = deadline.check("Graph sendMail")
+            return await asyncio.wait_for(self._batcher.submit(request), timeout)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("Graph sendMail")
+    
+    @property
+    def template_engine(self) -> EmailTemplateEngine:
+        """Compiled email templates; loaded on first use when not injected by the app lifespan"""
+        if self._template_engine is None:
+            self._template_engine = default_engine()
+        return self._template_engine
+    
+    def _format_email_html(self, content: str, template: Optional[str] = None) -> str:
+        """Render email content into a named template (default: the standard layout and signature)"""
+        return self.template_engine.render(content, template)
 
     async def send_email(self, email_input: OutlookEmailInput) -> OutlookEmailOutput:
         """Send an email using Microsoft Graph API"""
         try:
-            # Get access token
-            access_token = await self._get_access_token()
-            
             # Format the email content with proper HTML structure
-            formatted_html = self._format_email_html(email_input.emailBodyHtml)
+            formatted_html = self._format_email_html(email_input.emailBodyHtml, email_input.template)
             
             # Prepare email message
             message = {
@@ -226,58 +295,63 @@ class OutlookDirectClient:
                 "saveToSentItems": email_input.saveToSentItems
             }
             
-            # Send the email with optimized timeout and connection pooling
-            async with httpx.AsyncClient(
-                timeout=httpx.Timeout(10.0, connect=5.0),  # Optimized from 30s
-                limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
-            ) as client:
-                response = await client.post(
-                    f"{self.graph_base_url}/users/{self.sender_upn}/sendMail",
-                    headers={
-                        "Authorization": f"Bearer {access_token}",
-                        "Content-Type": "application/json"
-                    },
-                    json=message
+            # Send the email over the shared connection pool (batched with concurrent sends if enabled)
+            with self.breaker.guard() as call, _SEND_MAIL_STAGE.time():
+                response = await self._send_mail(message)
+                call.failed = response["status"] >= 500
+            status_code = response["status"]
+            if status_code == 429:
+                # Throttled inside a $batch (a request of its own would have been retried by the limiter)
+                raise RateLimited("graph", self.rate_limiter.retry_after)
+            
+            if status_code in [200, 201, 202]:
+                _MAIL_SENT.inc()
+                # Success - Graph API returns 202 Accepted for sendMail
+                return OutlookEmailOutput(
+                    success=True,
+                    message=f"Email sent successfully to {email_input.recipientEmail}",
+                    details={
+                        "recipient": email_input.recipientEmail,
+                        "subject": email_input.emailSubject,
+                        "saved_to_sent": email_input.saveToSentItems,
+                        "sent_at": datetime.utcnow().isoformat()
+                    }
                 )
-                
-                if response.status_code in [200, 201, 202]:
-                    # Success - Graph API returns 202 Accepted for sendMail
-                    return OutlookEmailOutput(
-                        success=True,
-                        message=f"Email sent successfully to {email_input.recipientEmail}",
-                        details={
-                            "recipient": email_input.recipientEmail,
-                            "subject": email_input.emailSubject,
-                            "saved_to_sent": email_input.saveToSentItems,
-                            "sent_at": datetime.utcnow().isoformat()
-                        }
-                    )
-                else:
-                    error_msg = f"Graph API error: {response.status_code}"
-                    try:
-                        error_data = response.json()
-                        error_msg = f"{error_msg} - {error_data}"
-                        
-                        # Extract specific error message if available
-                        if "error" in error_data:
-                            error_msg = error_data["error"].get("message", error_msg)
-                    except:
-                        error_msg = f"{error_msg} - {response.text}"
-                    
-                    return OutlookEmailOutput(
-                        success=False,
-                        message="Failed to send email",
-                        error_details=error_msg,
-                        details={"error": error_msg}
-                    )
+            else:
+                error_msg = f"Graph API error: {status_code}"
+                error_data = response["body"]
+                if isinstance(error_data, dict):
+                    error_msg = f"{error_msg} - {error_data}"
                     
+                    # Extract specific error message if available
+                    if "error" in error_data:
+                        error_msg = error_data["error"].get("message", error_msg)
+                else:
+                    error_msg = f"{error_msg} - {error_data}"
+                _MAIL_REJECTED.inc()
+                
+                return OutlookEmailOutput(
+                    success=False,
+                    message="Failed to send email",
+                    error_details=error_msg,
+                    details={"error": error_msg},
+                    retryable=status_code == 429 or status_code >= 500
+                )
+                
+        except (DeadlineExceeded, CircuitOpenError, RateLimited):
+            _MAIL_ERROR.inc()
+            raise
         except Exception as e:
+            _MAIL_ERROR.inc()
+            # A timeout caused by the request budget running out is reported as such
+            check_deadline("Graph sendMail")
             logger.exception("Error sending email via Outlook")
             return OutlookEmailOutput(
                 success=False,
                 message="An error occurred while sending the email",
                 error_details=str(e),
-                details={"error": str(e)}
+                details={"error": str(e)},
+                retryable=True
             )
     
     async def test_connection(self) -> bool:
@@ -286,23 +360,21 @@ class OutlookDirectClient:
             access_token = await self._get_access_token()
             
             # Try to get user info
-            async with httpx.AsyncClient(
-                timeout=httpx.Timeout(5.0, connect=3.0),  # Quick test
-                limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
-            ) as client:
-                response = await client.get(
+            with adaptive_timeouts.measure("graph", "GET users"):
+                response = await self.hedging.run("GET users", lambda: self.graph_http_client.get(
                     f"{self.graph_base_url}/users/{self.sender_upn}",
-                    headers={"Authorization": f"Bearer {access_token}"}
-                )
+                    headers={"Authorization": f"Bearer {access_token}"},
+                    timeout=httpx.Timeout(5.0, connect=3.0)  # Quick test
+                ))
+            
+            if response.status_code == 200:
+                user_data = response_json(response)
+                logger.info(f"Successfully connected to Graph API. User: {user_data.get('displayName', 'Unknown')}")
+                return True
+            else:
+                logger.error(f"Failed to connect to Graph API: {response.status_code}")
+                return False
                 
-                if response.status_code == 200:
-                    user_data = response.json()
-                    logger.info(f"Successfully connected to Graph API. User: {user_data.get('displayName', 'Unknown')}")
-                    return True
-                else:
-                    logger.error(f"Failed to connect to Graph API: {response.status_code}")
-                    return False
-                    
         except Exception as e:
             logger.error(f"Connection test failed: {e}")
             return False
\ No newline at end of file
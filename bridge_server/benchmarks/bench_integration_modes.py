@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Cal.com booking latency through each bridge integration mode.
+
+Compares, against the same local Cal.com stand-in (stubs/upstreams.py):
+  - direct      CalComDirectClient -> Cal.com API
+  - mcp         pooled MCP session -> streamable HTTP -> Cal.com MCP server -> Cal.com API
+  - mcp-inproc  pooled MCP session -> in-memory streams -> Cal.com FastMCP tools -> Cal.com API
+
+Run from the project root:
+    python bridge_server/benchmarks/bench_integration_modes.py --iterations 200 --upstream-latency-ms 50
+
+Note: the MCP tool checks /slots before booking, so the MCP modes make one more upstream
+call than direct mode; --upstream-latency-ms applies to each upstream call.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+BRIDGE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BRIDGE_DIR))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+UPSTREAM_STUB_PORT = _free_port()
+MCP_SERVER_PORT = _free_port()
+
+# Point every Cal.com client (bridge and MCP server) at the local stand-in before config is imported
+os.environ["CAL_COM_API_KEY"] = "bench-key"
+os.environ["UPSTREAM_STUB_URL"] = f"http://127.0.0.1:{UPSTREAM_STUB_PORT}"
+os.environ.setdefault("INTEGRATION_MODE", "direct")
+
+import uvicorn  # noqa: E402
+
+from api_clients.cal_com_direct import CalComDirectClient, CalComBookingInput  # noqa: E402
+from core.config import CAL_COM_API_BASE_URL  # noqa: E402
+from mcp_clients.inproc import get_inproc_server  # noqa: E402
+from mcp_clients.session_pool import McpSessionPool  # noqa: E402
+from stubs.upstreams import StubConfig, create_app  # noqa: E402
+
+
+def _serve_in_thread(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def _summary(mode: str, samples: list, errors: int) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[int(0.95 * (len(ordered) - 1))]
+    return (
+        f"{mode:<11} n={len(samples):<5} mean={statistics.mean(samples) * 1000:8.2f}ms "
+        f"p50={statistics.median(samples) * 1000:8.2f}ms p95={p95 * 1000:8.2f}ms errors={errors}"
+    )
+
+
+def _tool_succeeded(result) -> bool:
+    if result.isError or not result.content:
+        return False
+    return bool(json.loads(result.content[0].text).get("success"))
+
+
+async def _measure(call, iterations: int, concurrency: int):
+    samples = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            ok = await call()
+            samples.append(time.perf_counter() - start)
+            errors += 0 if ok else 1
+
+    await asyncio.gather(*(one() for _ in range(iterations)))
+    return samples, errors
+
+
+async def run(iterations: int, warmup: int, concurrency: int, modes: list, upstream_latency_ms: float) -> None:
+    booking = CalComBookingInput(
+        localDate="2030-01-15", localTime="10:00", localTimeZone="Australia/Sydney",
+        attendeeName="Bench User", attendeeEmail="bench@example.com", eventTypeId=1837761
+    )
+    tool_args = {"args": {
+        "localDate": booking.localDate, "localTime": booking.localTime, "localTimeZone": booking.localTimeZone,
+        "attendeeName": booking.attendeeName, "attendeeEmail": booking.attendeeEmail, "eventTypeId": booking.eventTypeId,
+    }}
+
+    direct_client = CalComDirectClient(api_key="bench-key", api_base_url=CAL_COM_API_BASE_URL)
+    pool = McpSessionPool()
+
+    async def direct():
+        return (await direct_client.create_booking(booking)).success
+
+    async def via_mcp(url: str):
+        return _tool_succeeded(await pool.call_tool(url, "create_cal_com_booking_mcp", tool_args))
+
+    targets = {
+        "direct": direct,
+        "mcp": lambda: via_mcp(f"http://127.0.0.1:{MCP_SERVER_PORT}/mcp"),
+        "mcp-inproc": lambda: via_mcp("inproc://cal_com"),
+    }
+
+    print(f"iterations={iterations} warmup={warmup} concurrency={concurrency} upstream_latency={upstream_latency_ms:.0f}ms")
+    try:
+        for mode in modes:
+            await _measure(targets[mode], warmup, concurrency)
+            samples, errors = await _measure(targets[mode], iterations, concurrency)
+            print(_summary(mode, samples, errors))
+    finally:
+        await pool.close_all()
+        await direct_client.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--upstream-latency-ms", type=float, default=0.0)
+    parser.add_argument("--modes", default="direct,mcp,mcp-inproc")
+    args = parser.parse_args()
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+
+    _serve_in_thread(create_app(StubConfig(latency=str(args.upstream_latency_ms))), UPSTREAM_STUB_PORT)
+    if "mcp" in modes:
+        cal_com_mcp = get_inproc_server("inproc://cal_com")
+        _serve_in_thread(cal_com_mcp.streamable_http_app(), MCP_SERVER_PORT)
+
+    asyncio.run(run(args.iterations, args.warmup, args.concurrency, modes, args.upstream_latency_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: JSON encode/decode for the bridge's booking and email payload shapes.
+
+Compares the stdlib path the bridge used before (httpx `json=` / `response.json()`,
+Starlette's JSONResponse) with core/json_codec (orjson when installed):
+  - encode   request body -> bytes (Cal.com booking, Graph sendMail, 20-request $batch)
+  - decode   upstream response bytes -> dict (Cal.com booking/slots, Graph $batch)
+  - render   webhook response dict -> body bytes (JSONResponse vs FastJSONResponse)
+
+Run from the project root:
+    python bridge_server/benchmarks/bench_json.py --iterations 20000
+"""
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+BRIDGE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BRIDGE_DIR))
+
+import httpx  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from core.email_templates import EmailTemplateEngine, signature_values  # noqa: E402
+from core.json_codec import JSON_BACKEND, FastJSONResponse, dumps, loads  # noqa: E402
+
+
+def _stdlib_dumps(obj) -> bytes:
+    # What httpx does for json=
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def _payloads() -> dict:
+    booking_request = {
+        "start": "2030-01-15T00:00:00.000Z",
+        "eventTypeId": 1837761,
+        "attendee": {"name": "Jane Doe", "email": "jane@example.com", "timeZone": "Australia/Sydney", "language": "en"},
+        "metadata": {"source": "elevenlabs", "conversation_id": "conv_0123456789"},
+        "guests": ["guest@example.com"],
+    }
+    engine = EmailTemplateEngine(
+        BRIDGE_DIR / "templates" / "email",
+        signature_values("Stuart", "AI Sales Strategist", "Cre8tive AI", "stuart@cre8tive.ai", "https://cre8tive.ai")
+    )
+    body = "<p>Hi Jane,</p>\n<p>Thanks for your time today - here is a summary of what we covered.</p>\n" * 4
+    send_mail = {
+        "message": {
+            "subject": "Your consultation is confirmed",
+            "body": {"contentType": "HTML", "content": engine.render(body, "confirmation")},
+            "toRecipients": [{"emailAddress": {"address": "jane@example.com"}}],
+        },
+        "saveToSentItems": True,
+    }
+    graph_batch = {"requests": [
+        {"id": str(i), "method": "POST", "url": "/users/stuart@cre8tive.ai/sendMail",
+         "headers": {"Content-Type": "application/json"}, "body": send_mail}
+        for i in range(1, 21)
+    ]}
+    booking_response = {"status": "success", "data": {
+        "id": 123456, "uid": "bk_9f8e7d6c5b4a", "title": "Consultation between Stuart and Jane Doe",
+        "start": "2030-01-15T00:00:00.000Z", "end": "2030-01-15T00:30:00.000Z", "status": "accepted",
+        "meetingUrl": "https://meet.example.com/abc-defg-hij", "eventTypeId": 1837761,
+        "attendees": [{"name": "Jane Doe", "email": "jane@example.com", "timeZone": "Australia/Sydney", "language": "en"}],
+        "hosts": [{"id": 1, "name": "Stuart", "email": "stuart@cre8tive.ai", "timeZone": "Australia/Brisbane"}],
+    }}
+    slots_response = {"status": "success", "data": {
+        f"2030-01-{day:02d}": [{"start": f"2030-01-{day:02d}T{m // 60:02d}:{m % 60:02d}:00.000Z"} for m in range(0, 24 * 60, 30)]
+        for day in range(15, 18)
+    }}
+    batch_response = {"responses": [{"id": str(i), "status": 202, "headers": {}, "body": None} for i in range(1, 21)]}
+    webhook_response = {
+        "status": "success",
+        "message": "Booking created successfully. Confirmation email to jane@example.com sent.",
+        "details": {"id": "123456", "uid": "bk_9f8e7d6c5b4a", "title": "Consultation", "start_time": "2030-01-15T00:00:00+00:00",
+                    "end_time": "2030-01-15T00:30:00+00:00", "meet_url": "https://meet.example.com/abc-defg-hij"},
+        "email": {"status": "success", "message": "Email sent successfully to jane@example.com", "messageId": None},
+    }
+    return {
+        "encode": {"booking request": booking_request, "sendMail": send_mail, "$batch x20": graph_batch},
+        "decode": {"booking response": booking_response, "slots (3 days)": slots_response, "$batch response": batch_response},
+        "render": {"webhook response": webhook_response},
+    }
+
+
+def _time(func, iterations: int) -> float:
+    # Best of 3, in microseconds per call
+    return min(timeit.repeat(func, number=iterations, repeat=3)) / iterations * 1e6
+
+
+def _row(kind: str, name: str, size: int, baseline: float, fast: float) -> str:
+    return f"{kind:<7} {name:<17} {size:>7}B  stdlib={baseline:8.2f}us  {JSON_BACKEND}={fast:8.2f}us  x{baseline / fast:5.1f}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10000)
+    args = parser.parse_args()
+    n = args.iterations
+    payloads = _payloads()
+
+    print(f"backend={JSON_BACKEND} iterations={n}")
+    for name, obj in payloads["encode"].items():
+        assert loads(dumps(obj)) == obj
+        print(_row("encode", name, len(dumps(obj)), _time(lambda: _stdlib_dumps(obj), n), _time(lambda: dumps(obj), n)))
+    for name, obj in payloads["decode"].items():
+        response = httpx.Response(200, content=_stdlib_dumps(obj), headers={"Content-Type": "application/json"})
+        print(_row("decode", name, len(response.content), _time(response.json, n), _time(lambda: loads(response.content), n)))
+    for name, obj in payloads["render"].items():
+        size = len(FastJSONResponse(obj).body)
+        print(_row("render", name, size, _time(lambda: JSONResponse(obj), n), _time(lambda: FastJSONResponse(obj), n)))
+
+
+if __name__ == "__main__":
+    main()
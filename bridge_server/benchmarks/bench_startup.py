@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Cold-start profile for the bridge: import costs, time-to-ready and time-to-first-request.
+
+For every INTEGRATION_MODE the bridge is started the way it is deployed (python run.py) against
+the upstream stubs, and each run records:
+  - import_ms         how long `from main import app` took (reported by run.py)
+  - ready_ms          process spawn until GET /ready answers 200 (imports, lifespan startup and the
+                      upstream warm-up)
+  - first_request_ms  the first schedule_consultation webhook after that, i.e. the cost of anything
+                      still initialised lazily on the first request
+Each mode is started --repeats times and the medians are reported. One more start per mode runs
+under `python -X importtime` (not counted in the timings, importtime slows imports down) and
+its per-module costs are summarized: the slowest modules by self time, and self time grouped by
+top-level package.
+
+Run from the project root:
+    python bridge_server/benchmarks/bench_startup.py --output startup.json
+    python bridge_server/benchmarks/bench_startup.py --write-baseline bridge_server/benchmarks/startup_baseline.json
+    python bridge_server/benchmarks/bench_startup.py --baseline bridge_server/benchmarks/startup_baseline.json
+
+Like bench_webhooks.py, baselines are machine-specific.
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from harness import BRIDGE_DIR, MODES, bridge_env, free_port, start_mcp_servers, start_stub, stop
+
+METRICS = ("import_ms", "ready_ms", "first_request_ms")
+
+# "import time:   self [us] | cumulative | imported package", indented by nesting depth
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+_IMPORTED_APP_LINE = re.compile(r"Imported app in (\d+)ms")
+
+
+# --- one cold start ---
+
+def _first_request_payload() -> dict:
+    return {
+        "attendee_name": "Startup Bench",
+        "attendee_email": "startup-bench@example.com",
+        "attendee_timezone": "Australia/Sydney",
+        "event_type_id": 1837761,
+        "start_time_utc": "2030-01-01T00:00:00Z",
+    }
+
+
+def cold_start(env: Dict[str, str], importtime: bool, timeout: float) -> dict:
+    """Start run.py, wait until /ready says ready, send the first webhook and stop it again."""
+    port = free_port()
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + [str(BRIDGE_DIR / "run.py")]
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as stdout, tempfile.TemporaryFile("w+", encoding="utf-8") as stderr:
+        started = time.perf_counter()
+        process = subprocess.Popen(command, cwd=str(BRIDGE_DIR), env={**env, "PORT": str(port)}, stdout=stdout, stderr=stderr)
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+                ready_ms = _wait_until_ready(client, process, started, timeout)
+                first_started = time.perf_counter()
+                response = client.post("/webhook/cal/schedule_consultation", json=_first_request_payload())
+                first_request_ms = (time.perf_counter() - first_started) * 1000
+        finally:
+            stop(process)
+        stdout.seek(0)
+        stderr.seek(0)
+        imported = _IMPORTED_APP_LINE.search(stdout.read())
+        run = {
+            "import_ms": float(imported.group(1)) if imported else None,
+            "ready_ms": round(ready_ms, 1),
+            "first_request_ms": round(first_request_ms, 1),
+            "first_request_status": response.status_code,
+        }
+        if importtime:
+            run["modules"] = parse_importtime(stderr.read())
+    return run
+
+
+def _wait_until_ready(client: httpx.Client, process: subprocess.Popen, started: float, timeout: float) -> float:
+    while time.perf_counter() - started < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"run.py exited with code {process.returncode} before becoming ready")
+        try:
+            if client.get("/ready", timeout=1).status_code == 200:
+                return (time.perf_counter() - started) * 1000
+        except httpx.TransportError:
+            pass
+        time.sleep(0.01)
+    raise RuntimeError(f"/ready not ready after {timeout:.0f}s")
+
+
+# --- import-time profile ---
+
+def parse_importtime(text: str) -> List[dict]:
+    """Module rows from `-X importtime` output, in import order."""
+    modules = []
+    for line in text.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                "module": name, "self_us": int(self_us), "cumulative_us": int(cumulative_us), "depth": len(indent) // 2,
+            })
+    return modules
+
+
+def summarize_imports(modules: List[dict], top: int) -> dict:
+    by_package: Dict[str, int] = defaultdict(int)
+    for row in modules:
+        by_package[row["module"].split(".")[0]] += row["self_us"]
+    slowest = sorted(modules, key=lambda row: row["self_us"], reverse=True)[:top]
+    return {
+        "modules": len(modules),
+        "total_ms": round(sum(row["self_us"] for row in modules) / 1000, 1),
+        "slowest_modules": [
+            {"module": row["module"], "self_ms": round(row["self_us"] / 1000, 2), "cumulative_ms": round(row["cumulative_us"] / 1000, 2)}
+            for row in slowest
+        ],
+        "by_package_ms": {
+            package: round(self_us / 1000, 2)
+            for package, self_us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+    }
+
+
+# --- running the modes ---
+
+def _median(values: List[Optional[float]]) -> Optional[float]:
+    values = [value for value in values if value is not None]
+    return round(statistics.median(values), 1) if values else None
+
+
+def run_benchmarks(args: argparse.Namespace) -> Dict[str, dict]:
+    stub, stub_url = start_stub(args.upstream_latency)
+    results: Dict[str, dict] = {}
+    try:
+        for mode in args.modes:
+            print(f"starting {mode} x{args.repeats} ...", file=sys.stderr)
+            mcp_servers, mcp_urls = [], None
+            if mode == "mcp":
+                mcp_servers, mcp_urls = start_mcp_servers(bridge_env(mode, stub_url, args.log_level))
+            try:
+                env = bridge_env(mode, stub_url, args.log_level, mcp_urls)
+                runs = [cold_start(env, False, args.timeout) for _ in range(args.repeats)]
+                profile = cold_start(env, True, args.timeout)
+            finally:
+                for server in mcp_servers:
+                    stop(server)
+            result = {metric: _median([run[metric] for run in runs]) for metric in METRICS}
+            result["first_request_errors"] = sum(run["first_request_status"] >= 400 for run in runs)
+            result["runs"] = [{metric: run[metric] for metric in METRICS} for run in runs]
+            result["imports"] = summarize_imports(profile["modules"], args.top)
+            results[mode] = result
+            print(_row(mode, result))
+    finally:
+        stop(stub)
+    return results
+
+
+# --- reporting and regression check ---
+
+def _row(name: str, result: dict) -> str:
+    import_ms = f"{result['import_ms']:7.1f}ms" if result["import_ms"] is not None else "      -"
+    slowest = ", ".join(f"{package} {ms:.0f}ms" for package, ms in list(result["imports"]["by_package_ms"].items())[:4])
+    return (
+        f"{name:<12} import={import_ms} ready={result['ready_ms']:7.1f}ms first_request={result['first_request_ms']:7.1f}ms "
+        f"errors={result['first_request_errors']}  top packages: {slowest}"
+    )
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float, min_delta_ms: float) -> List[str]:
+    """Regressions against a baseline: any median startup time up by more than allowed."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in METRICS:
+            if current.get(metric) is None or previous.get(metric) is None:
+                continue
+            limit = max(previous[metric] * (1 + threshold), previous[metric] + min_delta_ms)
+            if current[metric] > limit:
+                regressions.append(f"{name}: {metric} {current[metric]:.1f} > {limit:.1f} (baseline {previous[metric]:.1f})")
+        if current["first_request_errors"] > previous.get("first_request_errors", 0):
+            regressions.append(f"{name}: {current['first_request_errors']} first request(s) failed")
+    return regressions
+
+
+def _report(args: argparse.Namespace, results: Dict[str, dict]) -> dict:
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "settings": {"repeats": args.repeats, "upstream_latency": args.upstream_latency},
+        "results": results,
+    }
+
+
+def _csv(value: str, allowed) -> List[str]:
+    items = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = [item for item in items if item not in allowed]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown value(s) {', '.join(unknown)}; choose from {', '.join(allowed)}")
+    return items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", type=lambda v: _csv(v, MODES), default=list(MODES))
+    parser.add_argument("--repeats", type=int, default=5, help="Timed cold starts per mode")
+    parser.add_argument("--top", type=int, default=15, help="Modules and packages listed in the import profile")
+    parser.add_argument("--upstream-latency", default="fixed:5", help="Stub latency spec per upstream call (ms)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for /ready")
+    parser.add_argument("--log-level", default="WARNING", help="LOG_LEVEL for the bridge under test")
+    parser.add_argument("--output", type=Path, help="Write the results JSON here")
+    parser.add_argument("--write-baseline", type=Path, help="Write the results JSON as the new baseline")
+    parser.add_argument("--baseline", type=Path, help="Fail if results regressed against this baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=50.0, help="Increases smaller than this never fail")
+    args = parser.parse_args()
+
+    report = _report(args, run_benchmarks(args))
+    for path in (args.output, args.write_baseline):
+        if path is not None:
+            path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+            print(f"wrote {path}", file=sys.stderr)
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline.get("settings") != report["settings"]:
+            print(f"warning: baseline settings {baseline.get('settings')} differ from this run's", file=sys.stderr)
+        regressions = compare(report["results"], baseline.get("results", {}), args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"FAIL: {len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"OK: no regressions against {args.baseline} (threshold {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
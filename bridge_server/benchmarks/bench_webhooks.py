@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Load test and latency-regression check for the bridge's webhooks, run entirely offline.
+
+The bridge is driven against the upstream stubs (stubs/upstreams.py, a separate process) for
+every INTEGRATION_MODE and transport:
+  - asgi     the app in a worker process, called through httpx's ASGI transport (no sockets)
+  - uvicorn  the app served by uvicorn in its own process, called over HTTP
+In mcp mode the Cal.com and Outlook MCP servers are started as well, also against the stubs.
+
+Each scenario (schedule_consultation, send_email) runs at a fixed concurrency and reports
+p50/p95/p99 latency, throughput and error rate. Results are written as JSON; with
+--baseline the run fails (exit code 1) if any scenario regressed past --threshold.
+
+Run from the project root:
+    python bridge_server/benchmarks/bench_webhooks.py --requests 300 --concurrency 20 --output bench.json
+    python bridge_server/benchmarks/bench_webhooks.py --write-baseline bridge_server/benchmarks/baseline.json
+    python bridge_server/benchmarks/bench_webhooks.py --baseline bridge_server/benchmarks/baseline.json
+
+Baselines are machine-specific: record one on the machine (or CI runner) that runs the check.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+from harness import BRIDGE_DIR, MODES, bridge_env, free_port, spawn, start_mcp_servers, start_stub, stop, wait_for_port
+
+TRANSPORTS = ("asgi", "uvicorn")
+SCENARIOS = ("schedule_consultation", "send_email")
+
+# Printed by an ASGI worker before its JSON results, so log lines on stdout can't confuse the parent
+RESULTS_MARKER = "BENCH_RESULTS "
+
+# --- load generation ---
+
+def _payload(scenario: str, index: int, run_id: str) -> dict:
+    """A distinct payload per request, so idempotency never replays a response."""
+    if scenario == "schedule_consultation":
+        start = datetime(2030, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=30 * index)
+        return {
+            "attendee_name": f"Bench User {index}",
+            "attendee_email": f"bench+{run_id}-{index}@example.com",
+            "attendee_timezone": "Australia/Sydney",
+            "event_type_id": 1837761,
+            "start_time_utc": start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+    return {
+        "recipient_email": f"bench+{run_id}-{index}@example.com",
+        "email_subject": f"Benchmark {run_id} #{index}",
+        "email_body_html": "<p>Hi,</p>\n<p>Thanks for your time today - here is a summary of what we covered.</p>",
+    }
+
+
+def _endpoint(scenario: str) -> str:
+    return "/webhook/cal/schedule_consultation" if scenario == "schedule_consultation" else "/webhook/outlook/send_email"
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    # Nearest rank
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    total = len(ordered)
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "throughput_rps": round(total / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(ordered) / total * 1000, 3) if total else 0.0,
+        "p50_ms": round(_percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(_percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(_percentile(ordered, 0.99) * 1000, 3),
+    }
+
+
+async def drive(client: httpx.AsyncClient, scenario: str, requests: int, concurrency: int, run_id: str) -> Dict[str, float]:
+    """Closed loop: `concurrency` callers issue `requests` webhooks between them."""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def caller() -> None:
+        nonlocal errors
+        for index in counter:
+            start = time.perf_counter()
+            try:
+                response = await client.post(_endpoint(scenario), json=_payload(scenario, index, run_id))
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run_scenarios(client: httpx.AsyncClient, args: argparse.Namespace, label: str) -> Dict[str, dict]:
+    results = {}
+    for scenario in args.scenarios:
+        await drive(client, scenario, args.warmup, args.concurrency, f"{label}-warmup")
+        results[scenario] = await drive(client, scenario, args.requests, args.concurrency, label)
+    return results
+
+
+# --- running the bridge ---
+
+
+def _run_asgi(args: argparse.Namespace, env: Dict[str, str]) -> Dict[str, dict]:
+    """Run the scenarios in a fresh worker process (INTEGRATION_MODE is read when main is imported)."""
+    command = [
+        sys.executable, str(Path(__file__).resolve()), "--asgi-worker",
+        "--scenarios", ",".join(args.scenarios), "--requests", str(args.requests),
+        "--concurrency", str(args.concurrency), "--warmup", str(args.warmup),
+    ]
+    completed = subprocess.run(command, cwd=str(BRIDGE_DIR), env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULTS_MARKER):
+            return json.loads(line[len(RESULTS_MARKER):])
+    raise RuntimeError(f"ASGI worker for {env['INTEGRATION_MODE']} exited with code {completed.returncode} without results")
+
+
+async def _asgi_worker(args: argparse.Namespace) -> None:
+    sys.path.insert(0, str(BRIDGE_DIR))
+    import main
+
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bridge", timeout=60) as client:
+            results = await run_scenarios(client, args, f"{os.environ['INTEGRATION_MODE']}-asgi")
+    print(RESULTS_MARKER + json.dumps(results), flush=True)
+
+
+def _run_uvicorn(args: argparse.Namespace, env: Dict[str, str]) -> Dict[str, dict]:
+    port = free_port()
+    server = spawn(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        BRIDGE_DIR, env
+    )
+    try:
+        wait_for_port(port, server)
+
+        async def go() -> Dict[str, dict]:
+            limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+                return await run_scenarios(client, args, f"{env['INTEGRATION_MODE']}-uvicorn")
+
+        return asyncio.run(go())
+    finally:
+        stop(server)
+
+
+def run_benchmarks(args: argparse.Namespace) -> Dict[str, dict]:
+    stub, stub_url = start_stub(args.upstream_latency, args.upstream_error_rate, args.seed)
+    results: Dict[str, dict] = {}
+    try:
+        for mode in args.modes:
+            mcp_servers, mcp_urls = [], None
+            if mode == "mcp":
+                mcp_servers, mcp_urls = start_mcp_servers(bridge_env(mode, stub_url, args.log_level))
+            try:
+                env = bridge_env(mode, stub_url, args.log_level, mcp_urls)
+                for transport in args.transports:
+                    label = f"{mode}/{transport}"
+                    print(f"running {label} ...", file=sys.stderr)
+                    runner = _run_asgi if transport == "asgi" else _run_uvicorn
+                    for scenario, summary in runner(args, env).items():
+                        results[f"{label}/{scenario}"] = summary
+                        print(_row(f"{label}/{scenario}", summary))
+            finally:
+                for server in mcp_servers:
+                    stop(server)
+    finally:
+        stop(stub)
+    return results
+
+
+# --- reporting and regression check ---
+
+def _row(name: str, summary: dict) -> str:
+    return (
+        f"{name:<45} n={summary['requests']:<5} p50={summary['p50_ms']:8.2f}ms p95={summary['p95_ms']:8.2f}ms "
+        f"p99={summary['p99_ms']:8.2f}ms rps={summary['throughput_rps']:8.1f} errors={summary['error_rate']:.2%}"
+    )
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float, min_delta_ms: float) -> List[str]:
+    """Regressions against a baseline: latency percentiles up, throughput down or error rate up by more than allowed."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            limit = max(previous[metric] * (1 + threshold), previous[metric] + min_delta_ms)
+            if current[metric] > limit:
+                regressions.append(f"{name}: {metric} {current[metric]:.2f} > {limit:.2f} (baseline {previous[metric]:.2f})")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {current['throughput_rps']:.1f} rps < {previous['throughput_rps'] * (1 - threshold):.1f} "
+                f"(baseline {previous['throughput_rps']:.1f})"
+            )
+        if current["error_rate"] > previous["error_rate"] + 0.01:
+            regressions.append(f"{name}: error rate {current['error_rate']:.2%} (baseline {previous['error_rate']:.2%})")
+    return regressions
+
+
+def _report(args: argparse.Namespace, results: Dict[str, dict]) -> dict:
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "settings": {
+            "requests": args.requests, "concurrency": args.concurrency, "warmup": args.warmup,
+            "upstream_latency": args.upstream_latency, "upstream_error_rate": args.upstream_error_rate, "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+def _csv(value: str, allowed) -> List[str]:
+    items = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = [item for item in items if item not in allowed]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown value(s) {', '.join(unknown)}; choose from {', '.join(allowed)}")
+    return items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", type=lambda v: _csv(v, MODES), default=list(MODES))
+    parser.add_argument("--transports", type=lambda v: _csv(v, TRANSPORTS), default=list(TRANSPORTS))
+    parser.add_argument("--scenarios", type=lambda v: _csv(v, SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per scenario first")
+    parser.add_argument("--upstream-latency", default="normal:50,5", help="Stub latency spec per upstream call (ms)")
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--log-level", default="WARNING", help="LOG_LEVEL for the bridge under test")
+    parser.add_argument("--output", type=Path, help="Write the results JSON here")
+    parser.add_argument("--write-baseline", type=Path, help="Write the results JSON as the new baseline")
+    parser.add_argument("--baseline", type=Path, help="Fail if results regressed against this baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="Latency increases smaller than this never fail")
+    parser.add_argument("--asgi-worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.asgi_worker:
+        asyncio.run(_asgi_worker(args))
+        return
+
+    report = _report(args, run_benchmarks(args))
+    for path in (args.output, args.write_baseline):
+        if path is not None:
+            path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+            print(f"wrote {path}", file=sys.stderr)
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline.get("settings") != report["settings"]:
+            print(f"warning: baseline settings {baseline.get('settings')} differ from this run's", file=sys.stderr)
+        regressions = compare(report["results"], baseline.get("results", {}), args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"FAIL: {len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"OK: no regressions against {args.baseline} (threshold {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Process helpers shared by the benchmarks: free ports, the upstream stubs, the MCP servers and
+the environment the bridge under test runs with.
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+BRIDGE_DIR = Path(__file__).resolve().parent.parent
+PROJECT_ROOT = BRIDGE_DIR.parent
+
+MODES = ("direct", "mcp-inproc", "mcp")
+
+# Starts a FastMCP tool server on a given port: <module> <instance attribute> <port>
+_MCP_SERVER_BOOT = (
+    "import importlib, sys; sys.path.insert(0, '.'); "
+    "server = getattr(importlib.import_module(sys.argv[1]), sys.argv[2]); "
+    "server.settings.port = int(sys.argv[3]); server.run(transport='streamable-http')"
+)
+
+# (service directory, tools module, FastMCP instance, bridge setting holding its URL)
+_MCP_SERVERS = (
+    ("cal_com_mcp_server", "tools.cal_com_tools", "cal_com_mcp_instance", "CAL_COM_MCP_SERVER_URL"),
+    ("outlook_mcp_server", "tools.outlook_tools", "outlook_mcp_instance", "OUTLOOK_MCP_SERVER_URL"),
+)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{' '.join(map(str, process.args[:3]))} exited with code {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Nothing listening on port {port} after {timeout:.0f}s")
+
+
+def spawn(args: List[str], cwd: Path, env: Dict[str, str], stderr=subprocess.DEVNULL) -> subprocess.Popen:
+    return subprocess.Popen(args, cwd=str(cwd), env=env, stdout=subprocess.DEVNULL, stderr=stderr)
+
+
+def stop(process: Optional[subprocess.Popen]) -> None:
+    if process is None or process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def start_stub(latency: str, error_rate: float = 0.0, seed: int = 1) -> Tuple[subprocess.Popen, str]:
+    """Start stubs/upstreams.py on a free port; returns the process and its URL (for UPSTREAM_STUB_URL)."""
+    port = free_port()
+    process = spawn(
+        [sys.executable, str(BRIDGE_DIR / "stubs" / "upstreams.py"), "--port", str(port),
+         "--latency", latency, "--error-rate", str(error_rate), "--seed", str(seed)],
+        BRIDGE_DIR, dict(os.environ)
+    )
+    try:
+        wait_for_port(port, process)
+    except Exception:
+        stop(process)
+        raise
+    return process, f"http://127.0.0.1:{port}"
+
+
+def start_mcp_servers(env: Dict[str, str]) -> Tuple[List[subprocess.Popen], Dict[str, str]]:
+    """Start the Cal.com and Outlook MCP servers; returns the processes and the bridge's URL settings."""
+    processes, urls = [], {}
+    try:
+        for service, module, attribute, url_setting in _MCP_SERVERS:
+            port = free_port()
+            process = spawn([sys.executable, "-c", _MCP_SERVER_BOOT, module, attribute, str(port)], PROJECT_ROOT / service, env)
+            processes.append(process)
+            wait_for_port(port, process)
+            urls[url_setting] = f"http://127.0.0.1:{port}/mcp"
+    except Exception:
+        for process in processes:
+            stop(process)
+        raise
+    return processes, urls
+
+
+def bridge_env(mode: str, stub_url: str, log_level: str = "WARNING", mcp_urls: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Environment for a bridge (or MCP server) wired to the stubs with dummy credentials."""
+    env = {
+        **os.environ,
+        "INTEGRATION_MODE": mode,
+        "UPSTREAM_STUB_URL": stub_url,
+        "CAL_COM_API_KEY": "bench-key",
+        "AZURE_TENANT_ID": "bench-tenant",
+        "AZURE_CLIENT_ID": "bench-client",
+        "AZURE_CLIENT_SECRET": "bench-secret",
+        "SENDER_UPN": "bench@example.com",
+        "LOG_LEVEL": log_level,
+        "PYTHONUNBUFFERED": "1",
+    }
+    if mcp_urls:
+        env.update(mcp_urls)
+    return env
@@ -0,0 +1,167 @@
+"""
+Adaptive upstream timeouts.
+
+Every upstream call records its latency in a streaming quantile sketch per (upstream, operation),
+and its next timeout is ADAPTIVE_TIMEOUT_MULTIPLIER x the recent p99: tight for a healthy
+upstream, so a hung call is noticed in about a second instead of ten, and longer for one that is
+slow but still answering. The static timeouts remain the ceiling (and the default until enough
+calls have been seen); the request deadline still caps whatever comes out of here.
+"""
+import asyncio
+import math
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+import httpx
+
+from core.config import (
+    ADAPTIVE_TIMEOUTS_ENABLED, ADAPTIVE_TIMEOUT_MULTIPLIER, ADAPTIVE_TIMEOUT_QUANTILE, ADAPTIVE_TIMEOUT_MIN_SECONDS,
+    ADAPTIVE_TIMEOUT_MIN_SAMPLES, ADAPTIVE_TIMEOUT_WINDOW_SECONDS
+)
+from core.metrics import Gauge
+
+# Latencies below this land in the lowest bucket
+_MIN_LATENCY = 1e-4
+
+
+class LatencySketch:
+    """Log-bucketed latency histogram (DDSketch-style) over a sliding window.
+
+    Bucket boundaries grow by a factor of gamma, so any quantile is within `relative_accuracy`
+    of the true value while memory stays at a few dozen counters. Recency comes from two halves
+    that rotate every window/2: quantiles cover the last half to full window of samples.
+    """
+    __slots__ = ("_gamma", "_log_gamma", "_half_window", "_current", "_previous", "_rotated_at")
+
+    def __init__(self, window_seconds: float = 300.0, relative_accuracy: float = 0.02):
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._half_window = window_seconds / 2
+        self._current: Dict[int, int] = {}
+        self._previous: Dict[int, int] = {}
+        self._rotated_at = time.monotonic()
+
+    def _rotate(self) -> None:
+        elapsed = time.monotonic() - self._rotated_at
+        if elapsed < self._half_window:
+            return
+        # More than a whole window without samples: the previous half is stale too
+        self._previous = self._current if elapsed < 2 * self._half_window else {}
+        self._current = {}
+        self._rotated_at = time.monotonic()
+
+    def add(self, seconds: float) -> None:
+        self._rotate()
+        key = math.ceil(math.log(max(seconds, _MIN_LATENCY)) / self._log_gamma)
+        self._current[key] = self._current.get(key, 0) + 1
+
+    @property
+    def count(self) -> int:
+        self._rotate()
+        return sum(self._current.values()) + sum(self._previous.values())
+
+    def quantile(self, q: float) -> Optional[float]:
+        """The q-quantile (0..1) of the windowed samples in seconds, or None when empty."""
+        self._rotate()
+        counts = dict(self._previous)
+        for key, count in self._current.items():
+            counts[key] = counts.get(key, 0) + count
+        total = sum(counts.values())
+        if not total:
+            return None
+        rank = q * (total - 1)
+        seen = 0
+        for key in sorted(counts):
+            seen += counts[key]
+            if seen > rank:
+                # Midpoint of the bucket (gamma^(key-1), gamma^key]
+                return 2 * self._gamma ** key / (self._gamma + 1)
+        return 2 * self._gamma ** max(counts) / (self._gamma + 1)
+
+
+class AdaptiveTimeouts:
+    """Per-(upstream, operation) latency sketches and the timeouts derived from them."""
+
+    def __init__(
+        self,
+        multiplier: float = ADAPTIVE_TIMEOUT_MULTIPLIER,
+        quantile: float = ADAPTIVE_TIMEOUT_QUANTILE,
+        min_seconds: float = ADAPTIVE_TIMEOUT_MIN_SECONDS,
+        min_samples: int = ADAPTIVE_TIMEOUT_MIN_SAMPLES,
+        window_seconds: float = ADAPTIVE_TIMEOUT_WINDOW_SECONDS,
+        enabled: bool = ADAPTIVE_TIMEOUTS_ENABLED
+    ):
+        self.multiplier = multiplier
+        self.quantile = quantile
+        self.min_seconds = min_seconds
+        self.min_samples = min_samples
+        self.window_seconds = window_seconds
+        self.enabled = enabled
+        self._sketches: Dict[Tuple[str, str], LatencySketch] = {}
+        self._current: Dict[Tuple[str, str], float] = {}
+
+    def _sketch(self, upstream: str, operation: str) -> LatencySketch:
+        sketch = self._sketches.get((upstream, operation))
+        if sketch is None:
+            sketch = self._sketches[(upstream, operation)] = LatencySketch(self.window_seconds)
+        return sketch
+
+    def observe(self, upstream: str, operation: str, seconds: float) -> None:
+        self._sketch(upstream, operation).add(seconds)
+
+    def observed_quantile(self, upstream: str, operation: str, q: float) -> Optional[float]:
+        """The recent q-quantile latency in seconds, or None until min_samples calls have been seen."""
+        sketch = self._sketch(upstream, operation)
+        return sketch.quantile(q) if sketch.count >= self.min_samples else None
+
+    def timeout(self, upstream: str, operation: str, ceiling: float) -> float:
+        """multiplier x the recent quantile, between min_seconds and `ceiling` (the static timeout).
+
+        `ceiling` is returned as is while disabled or until min_samples calls have been seen.
+        """
+        observed = self.observed_quantile(upstream, operation, self.quantile) if self.enabled else None
+        timeout = ceiling if observed is None else min(ceiling, max(self.min_seconds, self.multiplier * observed))
+        self._current[(upstream, operation)] = timeout
+        return timeout
+
+    def httpx_timeout(self, upstream: str, operation: str, default: httpx.Timeout) -> httpx.Timeout:
+        """The client's timeout with read/write/pool adapted; connect keeps its own (a new TLS handshake isn't the norm)."""
+        ceiling = max(value for value in (default.read, default.write, default.pool) if value is not None)
+        adapted = self.timeout(upstream, operation, ceiling)
+
+        def cap(value: Optional[float]) -> float:
+            return adapted if value is None else min(value, adapted)
+
+        return httpx.Timeout(connect=default.connect, read=cap(default.read), write=cap(default.write), pool=cap(default.pool))
+
+    @contextmanager
+    def measure(self, upstream: str, operation: str) -> Iterator[None]:
+        """Record the block's duration. A timeout is recorded too (at the time waited), so an
+        upstream that has become slower pushes its own timeout up; other errors are not."""
+        started = time.monotonic()
+        try:
+            yield
+        except (httpx.TimeoutException, asyncio.TimeoutError):
+            self.observe(upstream, operation, time.monotonic() - started)
+            raise
+        self.observe(upstream, operation, time.monotonic() - started)
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        """Samples, p99 and the last applied timeout per upstream operation (for /health)."""
+        stats = {}
+        for (upstream, operation), sketch in self._sketches.items():
+            p99 = sketch.quantile(0.99)
+            stats[f"{upstream}:{operation}"] = {
+                "samples": sketch.count,
+                "p99_ms": round(p99 * 1000, 1) if p99 is not None else None,
+                "timeout_seconds": self._current.get((upstream, operation)),
+            }
+        return stats
+
+
+# Process-wide controller shared by the direct clients and the MCP session pool
+adaptive_timeouts = AdaptiveTimeouts()
+
+Gauge("adaptive_timeout_seconds", "Timeout most recently applied per upstream operation", ["upstream", "operation"],
+      callback=lambda: list(adaptive_timeouts._current.items()))
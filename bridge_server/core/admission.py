@@ -0,0 +1,159 @@
+"""
+Admission control for the webhook routes.
+
+Each route handles at most ADMISSION_MAX_CONCURRENCY requests at once; up to ADMISSION_MAX_QUEUE
+more wait in line (first come, first served) for a slot. Rather than letting a spike pile up
+behind the upstream connection pools until every request misses its deadline together, a request
+is turned away straight away - with a 503 the agent can act on - when:
+  - the queue is full, or
+  - the wait it can expect (its place in line x the route's recent handling time / the limit)
+    plus its own handling time doesn't fit in what is left of its deadline budget.
+A request that is queued anyway leaves the line once its budget can no longer cover the handling
+time, so slots only go to requests that can still finish in time: under overload the admitted
+requests keep succeeding (goodput) while the rest are told to retry.
+"""
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from core.config import (
+    ADMISSION_CONTROL_ENABLED, ADMISSION_MAX_CONCURRENCY, ADMISSION_MAX_QUEUE, ADMISSION_ROUTE_CONCURRENCY
+)
+from core.metrics import OUTCOMES, Gauge
+
+# Weight of the latest request in the route's average handling time
+_SERVICE_TIME_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """The route is at its concurrency limit and the request can't wait long enough for a slot."""
+
+    def __init__(self, route: str, retry_after: float, reason: str):
+        super().__init__(f"{route} is overloaded ({reason})")
+        self.route = route
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AdmissionController:
+    """Concurrency limit and bounded wait queue for one route.
+
+    Not thread-safe - like the rest of the bridge it is used from the event loop only.
+    """
+
+    def __init__(self, route: str, limit: int, max_queue: int, enabled: bool = True):
+        self.route = route
+        self.limit = max(1, limit)
+        self.max_queue = max(0, max_queue)
+        self.enabled = enabled
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Exponentially weighted average of how long an admitted request takes (None until one has finished)
+        self.service_seconds: Optional[float] = None
+        self._admitted = OUTCOMES.labels(f"admission:{route}", "admitted")
+        self._queued = OUTCOMES.labels(f"admission:{route}", "queued")
+        self._rejected = OUTCOMES.labels(f"admission:{route}", "rejected")
+        self._shed = OUTCOMES.labels(f"admission:{route}", "shed")
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def expected_wait(self, position: int) -> float:
+        """Seconds until the request at `position` (0 = next) in the queue gets a slot."""
+        if self.service_seconds is None:
+            return 0.0
+        return (position + 1) * self.service_seconds / self.limit
+
+    def _reject(self, reason: str, wait: float) -> Overloaded:
+        self._rejected.inc()
+        return Overloaded(self.route, max(wait, self.service_seconds or 0.0), reason)
+
+    async def acquire(self, budget: Optional[float] = None) -> None:
+        """Take a slot, waiting in line while that still leaves `budget` seconds enough to be handled.
+
+        Raises Overloaded (without taking a slot) when it doesn't.
+        """
+        if not self.enabled:
+            return
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self._admitted.inc()
+            return
+        service = self.service_seconds or 0.0
+        wait = self.expected_wait(len(self._waiters))
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject("queue full", wait)
+        if budget is not None and wait + service > budget:
+            raise self._reject("expected wait exceeds the request budget", wait)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._queued.inc()
+        try:
+            # Leave the line once the slot would come too late to finish in the budget
+            await asyncio.wait_for(asyncio.shield(waiter), None if budget is None else max(0.0, budget - service))
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                self._waiters.remove(waiter)
+                waiter.cancel()
+                self._shed.inc()
+                raise Overloaded(self.route, max(service, self.expected_wait(len(self._waiters))), "timed out in queue")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the caller went away - pass it on
+                self._release_slot()
+            else:
+                self._waiters.remove(waiter)
+                waiter.cancel()
+            raise
+        # Handed over by release(): the slot was counted as active for us already
+        self._admitted.inc()
+
+    def release(self, seconds: Optional[float] = None) -> None:
+        """Give the slot back; `seconds` (how long the request took) updates the handling-time estimate."""
+        if not self.enabled:
+            return
+        if seconds is not None:
+            self.service_seconds = seconds if self.service_seconds is None else (
+                _SERVICE_TIME_ALPHA * seconds + (1 - _SERVICE_TIME_ALPHA) * self.service_seconds
+            )
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "limit": self.limit,
+            "active": self.active,
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+            "service_ms": round(self.service_seconds * 1000, 1) if self.service_seconds is not None else None,
+        }
+
+
+_controllers: Dict[str, AdmissionController] = {}
+
+
+def get_admission_controller(route: str) -> AdmissionController:
+    """The process-wide controller for a route path, created with the configured limits on first use."""
+    controller = _controllers.get(route)
+    if controller is None:
+        limit = ADMISSION_ROUTE_CONCURRENCY.get(route, ADMISSION_MAX_CONCURRENCY)
+        controller = _controllers[route] = AdmissionController(route, limit, ADMISSION_MAX_QUEUE, ADMISSION_CONTROL_ENABLED)
+    return controller
+
+
+def admission_stats() -> Dict[str, Dict[str, Any]]:
+    return {route: controller.stats() for route, controller in _controllers.items()}
+
+
+Gauge("admission_queue_depth", "Requests waiting for a slot per route", ["route"],
+      callback=lambda: [((route,), controller.queued) for route, controller in _controllers.items()])
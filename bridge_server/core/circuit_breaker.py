@@ -0,0 +1,193 @@
+"""
+Circuit breakers for the upstreams: Cal.com, Microsoft Graph and the two MCP servers.
+
+Each breaker keeps a rolling window of call outcomes and latencies. When enough recent calls
+failed (or were slower than CIRCUIT_SLOW_CALL_SECONDS) it opens, and calls fail straight away
+with CircuitOpenError instead of waiting out a timeout against a service that is down - or a
+Render service that is still asleep. After CIRCUIT_OPEN_SECONDS one probe call is let through
+(half-open): if it succeeds the circuit closes, if it fails it opens again.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Tuple
+
+from core.config import (
+    CIRCUIT_BREAKER_ENABLED, CIRCUIT_WINDOW_SECONDS, CIRCUIT_MIN_CALLS, CIRCUIT_FAILURE_RATE,
+    CIRCUIT_SLOW_CALL_SECONDS, CIRCUIT_OPEN_SECONDS
+)
+from core.deadline import DeadlineExceeded
+from core.rate_limiter import RateLimited
+from core.metrics import OUTCOMES, Gauge
+
+logger = logging.getLogger(__name__)
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+# Upstream name -> how it is named in error messages
+UPSTREAM_LABELS = {
+    "cal_com": "Cal.com",
+    "graph": "Microsoft Graph",
+    "cal_com_mcp": "The Cal.com MCP server",
+    "outlook_mcp": "The Outlook MCP server",
+}
+
+
+class CircuitOpenError(Exception):
+    """The upstream's circuit is open, so the call was not attempted."""
+
+    def __init__(self, upstream: str, retry_after: float):
+        label = UPSTREAM_LABELS.get(upstream, upstream)
+        super().__init__(f"{label} is temporarily unavailable after repeated failures; retry in {max(1, round(retry_after))}s")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+class CallOutcome:
+    """Yielded by CircuitBreaker.guard(); set `failed` when the call returned an error response."""
+    __slots__ = ("failed",)
+
+    def __init__(self):
+        self.failed = False
+
+
+class CircuitBreaker:
+    """Rolling-window circuit breaker for one upstream.
+
+    Not thread-safe - like the rest of the bridge it is used from the event loop only.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = CIRCUIT_WINDOW_SECONDS,
+        min_calls: int = CIRCUIT_MIN_CALLS,
+        failure_rate: float = CIRCUIT_FAILURE_RATE,
+        slow_call_seconds: float = CIRCUIT_SLOW_CALL_SECONDS,
+        open_seconds: float = CIRCUIT_OPEN_SECONDS,
+        enabled: bool = CIRCUIT_BREAKER_ENABLED
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = max(1, min_calls)
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.enabled = enabled
+        self.state = CLOSED
+        self._calls: Deque[Tuple[float, bool, float]] = deque()  # (finished at, failed, duration)
+        self._opened_at = 0.0
+        self._probing = False
+        self._rejected = OUTCOMES.labels(f"circuit:{name}", "rejected")
+
+    def retry_after(self) -> float:
+        """Seconds until a call may be let through again (0 when closed)."""
+        if self.state == OPEN:
+            return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+        if self.state == HALF_OPEN and self._probing:
+            return 1.0
+        return 0.0
+
+    @contextmanager
+    def guard(self) -> Iterator[CallOutcome]:
+        """Wrap one upstream call: raises CircuitOpenError without running the block when the
+        circuit is open, otherwise records the block's outcome and duration.
+
+        An exception from the block is a failure, except DeadlineExceeded (the caller's budget,
+        not the upstream), RateLimited (our own limiter turning the call away, or the upstream
+        throttling us - it is up) and cancellation, which aren't counted at all.
+        """
+        probe = self._admit()
+        outcome = CallOutcome()
+        started = time.monotonic()
+        try:
+            yield outcome
+        except (DeadlineExceeded, RateLimited, asyncio.CancelledError):
+            if probe:
+                self._probing = False
+            raise
+        except Exception:
+            self._record(True, time.monotonic() - started, probe)
+            raise
+        self._record(outcome.failed, time.monotonic() - started, probe)
+
+    def _admit(self) -> bool:
+        """Let a call through or raise CircuitOpenError; returns True when the call is the half-open probe."""
+        if not self.enabled or self.state == CLOSED:
+            return False
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._set_state(HALF_OPEN, "probing with a single call")
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self._rejected.inc()
+        raise CircuitOpenError(self.name, self.retry_after())
+
+    def _record(self, failed: bool, duration: float, probe: bool) -> None:
+        now = time.monotonic()
+        failed = failed or duration >= self.slow_call_seconds
+        if probe:
+            self._probing = False
+            if failed:
+                self._open(now, f"probe call failed after {duration:.2f}s")
+            else:
+                self._calls.clear()
+                self._set_state(CLOSED, f"probe call succeeded in {duration:.2f}s")
+        self._calls.append((now, failed, duration))
+        self._prune(now)
+        if failed and self.state == CLOSED and self.enabled:
+            failures = sum(1 for _, call_failed, _ in self._calls if call_failed)
+            if len(self._calls) >= self.min_calls and failures / len(self._calls) >= self.failure_rate:
+                self._open(now, f"{failures} of the last {len(self._calls)} calls failed or were slow")
+
+    def _open(self, now: float, reason: str) -> None:
+        self._opened_at = now
+        self._set_state(OPEN, f"{reason}; failing fast for {self.open_seconds:g}s")
+
+    def _set_state(self, state: str, reason: str) -> None:
+        if state != self.state:
+            log = logger.warning if state == OPEN else logger.info
+            log(f"Circuit for {self.name} {self.state} -> {state}: {reason}")
+            self.state = state
+
+    def _prune(self, now: float) -> None:
+        horizon = now - self.window_seconds
+        while self._calls and self._calls[0][0] < horizon:
+            self._calls.popleft()
+
+    def stats(self) -> Dict[str, object]:
+        """State plus failure rate and latency over the rolling window (for /health)."""
+        self._prune(time.monotonic())
+        durations = sorted(duration for _, _, duration in self._calls)
+        failures = sum(1 for _, failed, _ in self._calls if failed)
+        return {
+            "state": self.state,
+            "calls": len(durations),
+            "failure_rate": round(failures / len(durations), 3) if durations else 0.0,
+            "mean_ms": round(sum(durations) / len(durations) * 1000, 1) if durations else None,
+            "p95_ms": round(durations[max(0, -(-len(durations) * 95 // 100) - 1)] * 1000, 1) if durations else None,
+            "retry_after_seconds": round(self.retry_after(), 1),
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """The process-wide breaker for an upstream, created with the configured settings on first use."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(name)
+    return breaker
+
+
+def breaker_stats() -> Dict[str, Dict[str, object]]:
+    return {name: breaker.stats() for name, breaker in _breakers.items()}
+
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+Gauge("circuit_state", "Circuit breaker state per upstream (0 closed, 1 half-open, 2 open)", ["upstream"],
+      callback=lambda: [((name,), _STATE_VALUES[breaker.state]) for name, breaker in _breakers.items()])
@@ -19,14 +19,159 @@ CAL_COM_API_BASE_URL = os.getenv("CAL_COM_API_BASE_URL", "https://api.cal.com/v2
 DEFAULT_EVENT_TYPE_ID = int(os.getenv("DEFAULT_EVENT_TYPE_ID", "1837761"))
 DEFAULT_EVENT_DURATION_MINUTES = int(os.getenv("DEFAULT_EVENT_DURATION_MINUTES", "30"))
 
+# Cal.com availability slot cache
+SLOT_CACHE_TTL_SECONDS = float(os.getenv("SLOT_CACHE_TTL_SECONDS", "60"))
+SLOT_CACHE_MAX_ENTRIES = int(os.getenv("SLOT_CACHE_MAX_ENTRIES", "512"))
+# Reject bookings for slots the cache knows are taken, without calling Cal.com
+CAL_COM_VALIDATE_SLOTS_FROM_CACHE = os.getenv("CAL_COM_VALIDATE_SLOTS_FROM_CACHE", "true").lower() == "true"
+
+# Webhook idempotency (ElevenLabs retries tool calls on timeout)
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "600"))
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "1024"))
+
+# Per-request time budget; ElevenLabs gives a tool webhook ~20s. Callers may send X-Request-Timeout-Ms instead
+REQUEST_BUDGET_SECONDS = float(os.getenv("REQUEST_BUDGET_SECONDS", "18"))
+
+# Admission control for the webhook routes: each route handles at most ADMISSION_MAX_CONCURRENCY requests at once and
+# up to ADMISSION_MAX_QUEUE more wait for a slot. A request gets a 503 straight away when the queue is full or its
+# expected wait would leave too little of its budget to be handled. Per-route limits override the default, e.g.
+# ADMISSION_ROUTE_CONCURRENCY="/webhook/cal/suggest_alternatives=20,/webhook/outlook/send_email=5"
+ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL_ENABLED", "true").lower() == "true"
+ADMISSION_MAX_CONCURRENCY = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "10"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "50"))
+ADMISSION_ROUTE_CONCURRENCY = {
+    route.strip(): int(limit)
+    for route, _, limit in (item.partition("=") for item in os.getenv("ADMISSION_ROUTE_CONCURRENCY", "").split(","))
+    if route.strip() and limit.strip()
+}
+
+# Background jobs: send_email answers 202 + job id and sends from a worker pool
+# (always when SEND_EMAIL_ASYNC is true, otherwise per request with a "Prefer: respond-async" header)
+SEND_EMAIL_ASYNC = os.getenv("SEND_EMAIL_ASYNC", "false").lower() == "true"
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "1000"))
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", "1000"))  # Finished jobs kept for /jobs/{id}
+
+# Durable SQLite (WAL) outbox for bookings and emails in direct mode: persisted before they are
+# attempted, retried with backoff, and recovered after a restart (at-least-once delivery)
+OUTBOX_ENABLED = os.getenv("OUTBOX_ENABLED", "false").lower() == "true"
+OUTBOX_PATH = os.getenv("OUTBOX_PATH", str(BASE_DIR / "outbox.db"))
+OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", "4"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_BASE_BACKOFF_SECONDS = float(os.getenv("OUTBOX_BASE_BACKOFF_SECONDS", "1"))
+OUTBOX_MAX_BACKOFF_SECONDS = float(os.getenv("OUTBOX_MAX_BACKOFF_SECONDS", "60"))
+OUTBOX_RETENTION_SECONDS = float(os.getenv("OUTBOX_RETENTION_SECONDS", "86400"))  # Finished rows kept for /jobs/{id}
+
 # Microsoft Graph API (Outlook)
 AZURE_TENANT_ID = os.getenv("AZURE_TENANT_ID")
 AZURE_CLIENT_ID = os.getenv("AZURE_CLIENT_ID")
 AZURE_CLIENT_SECRET = os.getenv("AZURE_CLIENT_SECRET")
 SENDER_UPN = os.getenv("SENDER_UPN")
 
-# Integration mode: "mcp" or "direct"
+# Integration mode: "mcp", "mcp-inproc" or "direct"
+# "mcp-inproc" hosts the Cal.com/Outlook FastMCP tools inside the bridge process (no network hop)
 INTEGRATION_MODE = os.getenv("INTEGRATION_MODE", "direct")
+MCP_INTEGRATION_MODES = ("mcp", "mcp-inproc")
+
+# Persistent MCP session pool (MCP mode)
+MCP_SESSION_POOL_SIZE = int(os.getenv("MCP_SESSION_POOL_SIZE", "2"))
+MCP_SESSION_TIMEOUT_SECONDS = float(os.getenv("MCP_SESSION_TIMEOUT_SECONDS", "60"))  # Long enough for Render cold starts
+MCP_SESSION_HEALTHCHECK_SECONDS = float(os.getenv("MCP_SESSION_HEALTHCHECK_SECONDS", "30"))  # Ping sessions idle longer than this
+
+# Coalesce sendMail calls arriving within this window into one Graph $batch (0 disables batching)
+GRAPH_BATCH_WINDOW_MS = float(os.getenv("GRAPH_BATCH_WINDOW_MS", "10"))
+GRAPH_BATCH_MAX_SIZE = int(os.getenv("GRAPH_BATCH_MAX_SIZE", "20"))  # Graph allows at most 20 per batch
+
+# Email templates: templates/email/_layout.html plus one body template per .html file (default, confirmation, ...)
+EMAIL_TEMPLATE_DIR = Path(os.getenv("EMAIL_TEMPLATE_DIR", str(BASE_DIR / "templates" / "email")))
+EMAIL_TEMPLATE_CACHE_SIZE = int(os.getenv("EMAIL_TEMPLATE_CACHE_SIZE", "256"))  # Rendered emails kept for identical content
+EMAIL_SIGNATURE_NAME = os.getenv("EMAIL_SIGNATURE_NAME", "Stuart")
+EMAIL_SIGNATURE_TITLE = os.getenv("EMAIL_SIGNATURE_TITLE", "AI Sales Strategist")
+EMAIL_SIGNATURE_COMPANY = os.getenv("EMAIL_SIGNATURE_COMPANY", "Cre8tive AI")
+EMAIL_SIGNATURE_EMAIL = os.getenv("EMAIL_SIGNATURE_EMAIL", "stuart@cre8tive.ai")
+EMAIL_SIGNATURE_WEBSITE = os.getenv("EMAIL_SIGNATURE_WEBSITE", "https://cre8tive.ai")
+
+# Logging: records are written by a background thread ("json" = one JSON object per line, or "text")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # Records beyond this are dropped rather than block a request
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.1"))  # Share of webhook payloads logged in full
+
+# Upstream base URLs for the direct clients
+GRAPH_API_BASE_URL = os.getenv("GRAPH_API_BASE_URL", "https://graph.microsoft.com/v1.0")
+AZURE_LOGIN_BASE_URL = os.getenv("AZURE_LOGIN_BASE_URL", "https://login.microsoftonline.com")
+
+# Offline benchmarking: send every upstream call to the stand-ins in stubs/upstreams.py instead
+# (e.g. UPSTREAM_STUB_URL=http://127.0.0.1:9100); overrides the three base URLs
+UPSTREAM_STUB_URL = os.getenv("UPSTREAM_STUB_URL", "").rstrip("/")
+if UPSTREAM_STUB_URL:
+    CAL_COM_API_BASE_URL = f"{UPSTREAM_STUB_URL}/v2"
+    GRAPH_API_BASE_URL = f"{UPSTREAM_STUB_URL}/v1.0"
+    AZURE_LOGIN_BASE_URL = UPSTREAM_STUB_URL
+
+# Shared HTTP connection pools (one long-lived client per upstream host).
+# Defaults apply to every host; override per host with e.g. CAL_COM_HTTP_MAX_CONNECTIONS.
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "10"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "5"))
+HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "60"))
+
+def _http_pool_settings(prefix: str) -> dict:
+    return {
+        "max_connections": int(os.getenv(f"{prefix}_HTTP_MAX_CONNECTIONS", HTTP_MAX_CONNECTIONS)),
+        "max_keepalive_connections": int(os.getenv(f"{prefix}_HTTP_MAX_KEEPALIVE_CONNECTIONS", HTTP_MAX_KEEPALIVE_CONNECTIONS)),
+        "keepalive_expiry": float(os.getenv(f"{prefix}_HTTP_KEEPALIVE_EXPIRY_SECONDS", HTTP_KEEPALIVE_EXPIRY_SECONDS)),
+    }
+
+HTTP_POOL_SETTINGS = {
+    "cal_com": _http_pool_settings("CAL_COM"),
+    "graph": _http_pool_settings("GRAPH"),
+    "login": _http_pool_settings("AZURE_LOGIN"),
+}
+
+# Circuit breakers per upstream (Cal.com, Graph, each MCP server): a breaker opens when at least CIRCUIT_MIN_CALLS
+# calls in the last CIRCUIT_WINDOW_SECONDS ended and CIRCUIT_FAILURE_RATE of them failed or took CIRCUIT_SLOW_CALL_SECONDS
+# or longer. While open, calls fail at once; after CIRCUIT_OPEN_SECONDS a single probe call decides whether it closes
+CIRCUIT_BREAKER_ENABLED = os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() == "true"
+CIRCUIT_WINDOW_SECONDS = float(os.getenv("CIRCUIT_WINDOW_SECONDS", "30"))
+CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "5"))
+CIRCUIT_FAILURE_RATE = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))
+CIRCUIT_SLOW_CALL_SECONDS = float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "8"))
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "15"))
+
+# Adaptive timeouts: each upstream operation's timeout is ADAPTIVE_TIMEOUT_MULTIPLIER x its recent p99 latency (over
+# the last ADAPTIVE_TIMEOUT_WINDOW_SECONDS), never below ADAPTIVE_TIMEOUT_MIN_SECONDS and never above the static timeout,
+# which also applies until ADAPTIVE_TIMEOUT_MIN_SAMPLES calls have been seen
+ADAPTIVE_TIMEOUTS_ENABLED = os.getenv("ADAPTIVE_TIMEOUTS_ENABLED", "true").lower() == "true"
+ADAPTIVE_TIMEOUT_MULTIPLIER = float(os.getenv("ADAPTIVE_TIMEOUT_MULTIPLIER", "3"))
+ADAPTIVE_TIMEOUT_QUANTILE = float(os.getenv("ADAPTIVE_TIMEOUT_QUANTILE", "0.99"))
+ADAPTIVE_TIMEOUT_MIN_SECONDS = float(os.getenv("ADAPTIVE_TIMEOUT_MIN_SECONDS", "1"))
+ADAPTIVE_TIMEOUT_MIN_SAMPLES = int(os.getenv("ADAPTIVE_TIMEOUT_MIN_SAMPLES", "20"))
+ADAPTIVE_TIMEOUT_WINDOW_SECONDS = float(os.getenv("ADAPTIVE_TIMEOUT_WINDOW_SECONDS", "300"))
+
+# Hedged reads (opt-in): an idempotent GET (Cal.com slots, Graph user lookup) still unanswered after the operation's
+# recent HEDGE_QUANTILE latency (at least HEDGE_MIN_DELAY_MS) is sent a second time and the first answer wins.
+# Hedges are capped at HEDGE_BUDGET_PERCENT of requests per upstream, so an outage can't double the load
+HEDGING_ENABLED = os.getenv("HEDGING_ENABLED", "false").lower() == "true"
+HEDGE_QUANTILE = float(os.getenv("HEDGE_QUANTILE", "0.95"))
+HEDGE_BUDGET_PERCENT = float(os.getenv("HEDGE_BUDGET_PERCENT", "10"))
+HEDGE_MIN_DELAY_MS = float(os.getenv("HEDGE_MIN_DELAY_MS", "20"))
+
+# Client-side rate limiting per Cal.com API key / Azure AD tenant: a token bucket that follows the upstream's
+# X-RateLimit-* and Retry-After headers and queues requests for up to RATE_LIMIT_MAX_WAIT_SECONDS (capped by the request
+# deadline) instead of sending them into a 429. *_RATE_LIMIT_RPS/BURST add a limit of our own (0 = headers only)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("RATE_LIMIT_MAX_WAIT_SECONDS", "5"))
+CAL_COM_RATE_LIMIT_RPS = float(os.getenv("CAL_COM_RATE_LIMIT_RPS", "0"))
+CAL_COM_RATE_LIMIT_BURST = float(os.getenv("CAL_COM_RATE_LIMIT_BURST", "0"))
+GRAPH_RATE_LIMIT_RPS = float(os.getenv("GRAPH_RATE_LIMIT_RPS", "0"))
+GRAPH_RATE_LIMIT_BURST = float(os.getenv("GRAPH_RATE_LIMIT_BURST", "0"))
+
+# Startup warm-up: open connections to the upstreams (MCP sessions in MCP modes) and fetch the Graph
+# token in the background after startup; /ready answers 503 until it has finished
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+WARMUP_TIMEOUT_SECONDS = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "10"))  # Per step; a step that times out doesn't block /ready
+# Also prefetch today's slots for DEFAULT_EVENT_TYPE_ID into the slot cache (direct mode)
+WARMUP_PREFETCH_SLOTS = os.getenv("WARMUP_PREFETCH_SLOTS", "false").lower() == "true"
 
 # Default to localhost if not set, useful for local dev
 if INTEGRATION_MODE == "mcp":
@@ -37,6 +182,10 @@ if INTEGRATION_MODE == "mcp":
     if not OUTLOOK_MCP_SERVER_URL:
         OUTLOOK_MCP_SERVER_URL = "http://localhost:8002/mcp"
         print(f"Warning: OUTLOOK_MCP_SERVER_URL not set in .env, defaulting to {OUTLOOK_MCP_SERVER_URL}")
+elif INTEGRATION_MODE == "mcp-inproc":
+    # The session pool resolves inproc:// URLs to FastMCP instances loaded into this process
+    CAL_COM_MCP_SERVER_URL = "inproc://cal_com"
+    OUTLOOK_MCP_SERVER_URL = "inproc://outlook"
 else:
     # Direct mode - check for required credentials
     if not CAL_COM_API_KEY:
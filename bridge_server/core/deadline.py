@@ -0,0 +1,109 @@
+"""
+Per-request deadline budget.
+
+ElevenLabs gives a tool webhook ~20s. The deadline middleware creates a Deadline for
+each request (from REQUEST_BUDGET_SECONDS or the caller's X-Request-Timeout-Ms header)
+and stores it in a contextvar, so every upstream call made while handling the request
+sizes its timeout from the time actually left rather than a fixed 10s/60s.
+"""
+import contextvars
+import time
+from datetime import timedelta
+from typing import Optional
+
+import httpx
+
+DEADLINE_HEADER = "X-Request-Timeout-Ms"
+
+# Don't start an upstream call with less time than this left - it can't finish anyway
+MIN_CALL_SECONDS = 0.25
+
+
+class DeadlineExceeded(Exception):
+    """The request's time budget ran out (or is too short to start the next call)."""
+
+    def __init__(self, operation: str = "request", remaining: float = 0.0):
+        super().__init__(f"Deadline exceeded before {operation} ({remaining:.2f}s left)")
+        self.operation = operation
+        self.remaining = remaining
+
+
+class Deadline:
+    __slots__ = ("budget", "expires_at")
+
+    def __init__(self, budget_seconds: float):
+        self.budget = budget_seconds
+        self.expires_at = time.monotonic() + budget_seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() < MIN_CALL_SECONDS
+
+    def check(self, operation: str = "request") -> float:
+        """Return the seconds left, raising DeadlineExceeded if too little is left for another call."""
+        remaining = self.remaining()
+        if remaining < MIN_CALL_SECONDS:
+            raise DeadlineExceeded(operation, remaining)
+        return remaining
+
+
+_current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("request_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+def set_deadline(deadline: Optional[Deadline]) -> contextvars.Token:
+    return _current_deadline.set(deadline)
+
+
+def reset_deadline(token: contextvars.Token) -> None:
+    _current_deadline.reset(token)
+
+
+def budget_from_header(value: Optional[str], default_seconds: float) -> float:
+    """Budget in seconds from the X-Request-Timeout-Ms header, falling back to the default."""
+    if value:
+        try:
+            millis = float(value)
+            if millis > 0:
+                return millis / 1000
+        except ValueError:
+            pass
+    return default_seconds
+
+
+def check_deadline(operation: str = "request") -> None:
+    """Raise DeadlineExceeded if the current request's budget is (nearly) spent."""
+    deadline = current_deadline()
+    if deadline is not None:
+        deadline.check(operation)
+
+
+def remaining_seconds(default: float, operation: str = "request") -> float:
+    """min(default, time left in the current request's budget)."""
+    deadline = current_deadline()
+    if deadline is None:
+        return default
+    return min(default, deadline.check(operation))
+
+
+def remaining_timedelta(default: timedelta, operation: str = "request") -> timedelta:
+    return timedelta(seconds=remaining_seconds(default.total_seconds(), operation))
+
+
+def request_timeout(default: httpx.Timeout, operation: str = "request") -> httpx.Timeout:
+    """The client's default timeout, with every phase capped at the time left in the budget."""
+    deadline = current_deadline()
+    if deadline is None:
+        return default
+    remaining = deadline.check(operation)
+
+    def cap(value: Optional[float]) -> float:
+        return remaining if value is None else min(value, remaining)
+
+    return httpx.Timeout(connect=cap(default.connect), read=cap(default.read), write=cap(default.write), pool=cap(default.pool))
@@ -0,0 +1,136 @@
+"""
+Email templates compiled once at startup.
+
+templates/email/_layout.html is the shared frame (styles, footer) and every other .html
+file in that directory is a named body template rendered into the layout's {{body}} slot.
+The layout opens with a blank line, as the original inline template did, so the default
+template's output is byte-identical to it.
+When loaded, each template is split into static segments and {{slot}} names; values known
+up front (the signature, from config) are folded into the static text, so rendering a
+message is a single join. Rendered emails are kept in a small LRU keyed by
+(template, content) - agents resend the same body on retries and follow-ups.
+"""
+import logging
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LAYOUT_NAME = "_layout"
+DEFAULT_TEMPLATE = "default"
+
+# The only slot filled per message; everything else must be known when templates load
+CONTENT_SLOT = "content"
+
+_SLOT_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class UnknownEmailTemplate(ValueError):
+    def __init__(self, name: str, available: List[str]):
+        super().__init__(f"Unknown email template '{name}' (available: {', '.join(available)})")
+        self.name = name
+        self.available = available
+
+
+def _compile(source: str, static_values: Mapping[str, str], origin: str) -> Tuple[str, ...]:
+    """Split a template into the static segments between its {{content}} slots."""
+    segments: List[str] = [""]
+    position = 0
+    for match in _SLOT_PATTERN.finditer(source):
+        segments[-1] += source[position:match.start()]
+        slot = match.group(1)
+        if slot in static_values:
+            segments[-1] += static_values[slot]
+        elif slot == CONTENT_SLOT:
+            segments.append("")
+        else:
+            raise ValueError(f"Email template {origin} uses unknown slot '{slot}'")
+        position = match.end()
+    segments[-1] += source[position:]
+    return tuple(segments)
+
+
+class EmailTemplateEngine:
+    """Named email templates, pre-split into static segments, with an LRU of rendered bodies."""
+
+    def __init__(self, directory: Path, static_values: Optional[Mapping[str, str]] = None, cache_size: int = 256):
+        self.directory = Path(directory)
+        self.cache_size = cache_size
+        self._templates: Dict[str, Tuple[str, ...]] = {}
+        self._rendered: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._load(dict(static_values or {}))
+
+    def _load(self, static_values: Dict[str, str]) -> None:
+        layout = (self.directory / f"{LAYOUT_NAME}.html").read_text(encoding="utf-8").rstrip("\r\n")
+        for path in sorted(self.directory.glob("*.html")):
+            if path.stem == LAYOUT_NAME:
+                continue
+            body = path.read_text(encoding="utf-8").rstrip("\r\n")
+            # Compose at load time so each named template is a single flat segment list
+            source = _SLOT_PATTERN.sub(lambda m: body if m.group(1) == "body" else m.group(0), layout)
+            self._templates[path.stem] = _compile(source, static_values, path.name)
+        if DEFAULT_TEMPLATE not in self._templates:
+            raise ValueError(f"No {DEFAULT_TEMPLATE}.html email template in {self.directory}")
+        logger.info(f"Loaded email templates from {self.directory}: {', '.join(self.names)}")
+
+    @property
+    def names(self) -> List[str]:
+        return sorted(self._templates)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._templates
+
+    def render(self, content: str, template: Optional[str] = None) -> str:
+        """Render `content` (HTML; newlines become <br>) into the named template."""
+        name = template or DEFAULT_TEMPLATE
+        key = (name, content)
+        rendered = self._rendered.get(key)
+        if rendered is not None:
+            self._rendered.move_to_end(key)
+            self.hits += 1
+            return rendered
+
+        segments = self._templates.get(name)
+        if segments is None:
+            raise UnknownEmailTemplate(name, self.names)
+        # Static slots were folded in at load time, so the content is all that's left to join in
+        rendered = content.replace("\n", "<br>").join(segments)
+
+        self.misses += 1
+        if self.cache_size > 0:
+            self._rendered[key] = rendered
+            if len(self._rendered) > self.cache_size:
+                self._rendered.popitem(last=False)
+        return rendered
+
+
+def signature_values(name: str, title: str, company: str, email: str, website: str) -> Dict[str, str]:
+    """Static slot values for the footer signature."""
+    return {
+        "signature_name": name,
+        "signature_title": title,
+        "signature_company": company,
+        "signature_email": email,
+        "signature_website": website,
+        "signature_website_label": re.sub(r"^https?://", "", website).rstrip("/"),
+    }
+
+
+def default_engine() -> EmailTemplateEngine:
+    """Engine for the configured template directory and signature."""
+    from core.config import (
+        EMAIL_SIGNATURE_COMPANY, EMAIL_SIGNATURE_EMAIL, EMAIL_SIGNATURE_NAME, EMAIL_SIGNATURE_TITLE,
+        EMAIL_SIGNATURE_WEBSITE, EMAIL_TEMPLATE_CACHE_SIZE, EMAIL_TEMPLATE_DIR
+    )
+    return EmailTemplateEngine(
+        EMAIL_TEMPLATE_DIR,
+        signature_values(
+            EMAIL_SIGNATURE_NAME, EMAIL_SIGNATURE_TITLE, EMAIL_SIGNATURE_COMPANY,
+            EMAIL_SIGNATURE_EMAIL, EMAIL_SIGNATURE_WEBSITE
+        ),
+        cache_size=EMAIL_TEMPLATE_CACHE_SIZE
+    )
@@ -0,0 +1,95 @@
+"""
+Micro-batching dispatcher for Microsoft Graph JSON batching ($batch).
+
+Requests submitted within `window_seconds` of each other are sent together as one
+POST /$batch (at most 20 per batch, Graph's limit) and each caller gets its own
+sub-response back. A request that ends up alone in its window is sent on its own.
+
+Mirrored in outlook_mcp_server/core/graph_batch.py (the services deploy separately) - keep both in sync.
+"""
+import asyncio
+import contextvars
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+GRAPH_BATCH_LIMIT = 20
+
+# A Graph request is {"method", "url" (relative to the version root), "headers", "body"};
+# a response is {"status", "headers", "body"} - the shapes used inside a $batch.
+GraphRequest = Dict[str, Any]
+GraphResponse = Dict[str, Any]
+SendBatch = Callable[[List[GraphRequest]], Awaitable[List[GraphResponse]]]
+SendSingle = Callable[[GraphRequest], Awaitable[GraphResponse]]
+
+
+class GraphBatcher:
+    def __init__(
+        self,
+        send_batch: SendBatch,
+        send_single: Optional[SendSingle] = None,
+        window_seconds: float = 0.01,
+        max_batch_size: int = GRAPH_BATCH_LIMIT
+    ):
+        self._send_batch = send_batch
+        self._send_single = send_single
+        self.window_seconds = window_seconds
+        self.max_batch_size = max(1, min(max_batch_size, GRAPH_BATCH_LIMIT))
+        self._pending: List[Tuple[GraphRequest, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._dispatches: Set[asyncio.Task] = set()
+        self.batches_sent = 0
+        self.requests_sent = 0
+
+    async def submit(self, request: GraphRequest) -> GraphResponse:
+        """Queue a request for the next batch and wait for its sub-response."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((request, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            # Dispatch outside the caller's context so one caller's request-scoped state
+            # (e.g. its deadline) doesn't apply to the whole batch
+            self._timer = loop.call_later(self.window_seconds, self._flush, context=contextvars.Context())
+        # Shield so a caller giving up doesn't cancel the batch other callers are waiting on
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            task = contextvars.Context().run(asyncio.ensure_future, self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: List[Tuple[GraphRequest, asyncio.Future]]) -> None:
+        try:
+            if len(batch) == 1 and self._send_single is not None:
+                responses = [await self._send_single(batch[0][0])]
+            else:
+                requests = [{**request, "id": str(i)} for i, (request, _) in enumerate(batch, start=1)]
+                by_id = {str(r.get("id")): r for r in await self._send_batch(requests)}
+                missing = {"status": 500, "headers": {}, "body": {"error": {"message": "Missing from $batch response"}}}
+                responses = [by_id.get(str(i), missing) for i in range(1, len(batch) + 1)]
+                self.batches_sent += 1
+                logger.debug(f"Sent {len(batch)} Graph requests in one $batch")
+            self.requests_sent += len(batch)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), response in zip(batch, responses):
+            if not future.done():
+                future.set_result(response)
+
+    async def aclose(self) -> None:
+        """Send anything still waiting for its window and wait for in-flight batches."""
+        self._flush()
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
@@ -0,0 +1,119 @@
+"""
+Hedged requests for idempotent upstream reads.
+
+When a GET hasn't answered by the operation's recent p95 (from the adaptive-timeout latency
+sketches), a second, identical request is sent - concurrent requests on one httpx client go out
+on separate pooled connections - and whichever answers first wins; the other is cancelled.
+That trims the tail caused by one slow connection or backend instance, at the cost of a few
+percent more upstream calls.
+
+Hedges are paid for from a per-upstream budget: every request earns HEDGE_BUDGET_PERCENT/100 of a
+hedge, and a hedge is only sent when a whole one is available. Hedging therefore never adds more
+than that share of traffic, and when an upstream is slow for everyone (an outage rather than a
+straggler) the budget runs dry instead of doubling the load.
+
+Only for idempotent requests: both attempts may reach the upstream.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from core.adaptive_timeout import adaptive_timeouts
+from core.config import HEDGING_ENABLED, HEDGE_QUANTILE, HEDGE_BUDGET_PERCENT, HEDGE_MIN_DELAY_MS
+from core.metrics import OUTCOMES
+
+T = TypeVar("T")
+
+# Unused budget carried over, in hedges - allows a short burst of hedges after a quiet spell
+_MAX_BALANCE = 10.0
+
+
+class HedgeBudget:
+    """Token budget limiting hedges to a share of requests."""
+    __slots__ = ("ratio", "balance")
+
+    def __init__(self, percent: float):
+        self.ratio = percent / 100
+        self.balance = 0.0
+
+    def earn(self) -> None:
+        self.balance = min(_MAX_BALANCE, self.balance + self.ratio)
+
+    def spend(self) -> bool:
+        if self.balance < 1:
+            return False
+        self.balance -= 1
+        return True
+
+
+class HedgePolicy:
+    """Hedging for one upstream's idempotent reads."""
+
+    def __init__(
+        self,
+        upstream: str,
+        quantile: float = HEDGE_QUANTILE,
+        budget_percent: float = HEDGE_BUDGET_PERCENT,
+        min_delay_seconds: float = HEDGE_MIN_DELAY_MS / 1000,
+        enabled: bool = HEDGING_ENABLED
+    ):
+        self.upstream = upstream
+        self.quantile = quantile
+        self.min_delay_seconds = min_delay_seconds
+        self.enabled = enabled
+        self.budget = HedgeBudget(budget_percent)
+        self._sent = OUTCOMES.labels(f"hedge:{upstream}", "sent")
+        self._won = OUTCOMES.labels(f"hedge:{upstream}", "won")
+        self._denied = OUTCOMES.labels(f"hedge:{upstream}", "over_budget")
+
+    def delay(self, operation: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None when the operation isn't hedged (yet)."""
+        if not self.enabled:
+            return None
+        observed = adaptive_timeouts.observed_quantile(self.upstream, operation, self.quantile)
+        return None if observed is None else max(self.min_delay_seconds, observed)
+
+    async def run(self, operation: str, attempt: Callable[[], Awaitable[T]]) -> T:
+        """Run `attempt()`, and once more if the first is still outstanding after delay(operation).
+
+        The first attempt to return wins. An attempt that raises only decides the outcome if the
+        other one fails too (then the first attempt's exception is raised).
+        """
+        delay = self.delay(operation)
+        if delay is None:
+            return await attempt()
+        self.budget.earn()
+        first = asyncio.ensure_future(attempt())
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return first.result()
+            if not self.budget.spend():
+                self._denied.inc()
+                return await first
+            self._sent.inc()
+            tasks.append(asyncio.ensure_future(attempt()))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in tasks:
+                    if task in done and task.exception() is None:
+                        if task is not first:
+                            self._won.inc()
+                        return task.result()
+            return first.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+
+_policies: Dict[str, HedgePolicy] = {}
+
+
+def get_hedge_policy(upstream: str) -> HedgePolicy:
+    """The process-wide hedging policy for an upstream, created with the configured settings on first use."""
+    policy = _policies.get(upstream)
+    if policy is None:
+        policy = _policies[upstream] = HedgePolicy(upstream)
+    return policy
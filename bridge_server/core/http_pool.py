@@ -0,0 +1,62 @@
+"""
+Shared, long-lived httpx clients - one connection pool per upstream host
+"""
+import logging
+from typing import Dict, Optional
+
+import httpx
+
+from core.config import HTTP_POOL_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+# Default per-request timeout; individual calls may pass a tighter one
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+
+
+class HttpClientPool:
+    """Owns one pooled httpx.AsyncClient per upstream host.
+
+    Created once in the FastAPI lifespan and injected into the direct clients so
+    back-to-back tool calls reuse warm TCP/TLS connections.
+    """
+
+    def __init__(self, settings: Optional[Dict[str, dict]] = None):
+        self._settings = settings or HTTP_POOL_SETTINGS
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Return the pooled client for an upstream, creating it on first use."""
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            settings = self._settings.get(name, {})
+            client = httpx.AsyncClient(
+                timeout=DEFAULT_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=settings.get("max_connections"),
+                    max_keepalive_connections=settings.get("max_keepalive_connections"),
+                    keepalive_expiry=settings.get("keepalive_expiry"),
+                ),
+            )
+            self._clients[name] = client
+            logger.debug(f"Created pooled HTTP client for upstream '{name}' with settings {settings}")
+        return client
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Active/idle connection counts per upstream (read from httpcore's pool; best effort)."""
+        stats = {}
+        for name, client in self._clients.items():
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            connections = list(getattr(pool, "connections", []))
+            idle = sum(1 for connection in connections if connection.is_idle())
+            stats[name] = {"active": len(connections) - idle, "idle": idle}
+        return stats
+
+    async def aclose(self) -> None:
+        """Close every pooled client, releasing their connections."""
+        for name, client in list(self._clients.items()):
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing HTTP client for upstream '{name}': {e}")
+        self._clients.clear()
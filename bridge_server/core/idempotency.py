@@ -0,0 +1,101 @@
+"""
+Idempotency cache for webhook retries.
+
+ElevenLabs retries a tool webhook when it times out. Requests are keyed by the
+`Idempotency-Key` header when present, otherwise by a hash of the normalized payload:
+- a duplicate that arrives while the original is still running joins the original's future
+- a duplicate that arrives after it finished gets the stored result straight away
+Failed attempts (exceptions, 5xx responses) are only shared with requests already
+waiting on them, so a later retry runs again.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def idempotency_key(scope: str, payload: BaseModel, header_key: Optional[str] = None) -> str:
+    """Key for a webhook call: the caller's Idempotency-Key if given, else a payload hash."""
+    if header_key and header_key.strip():
+        return f"{scope}:key:{header_key.strip()}"
+    normalized = json.dumps(_normalize(payload.model_dump(mode="json")), sort_keys=True, separators=(",", ":"))
+    return f"{scope}:sha256:{hashlib.sha256(normalized.encode()).hexdigest()}"
+
+
+def _is_cacheable(result: Any) -> bool:
+    status_code = getattr(result, "status_code", 200)
+    return status_code < 500
+
+
+class IdempotencyCache:
+    """Bounded LRU of in-flight and completed results, with a TTL on completed ones."""
+
+    def __init__(self, ttl_seconds: float = 600.0, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # key -> (expiry or None while in flight, future)
+        self._entries: "OrderedDict[str, Tuple[Optional[float], asyncio.Future]]" = OrderedDict()
+        self.replays = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def run(self, key: str, handler: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Run handler() once per key. Returns (result, replayed)."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, future = entry
+            if expires_at is None or expires_at >= time.monotonic():
+                self._entries.move_to_end(key)
+                self.replays += 1
+                logger.info(f"Idempotent replay for {key} ({'in flight' if expires_at is None else 'completed'})")
+                return await asyncio.shield(future), True
+            del self._entries[key]
+
+        future = asyncio.ensure_future(handler())
+        self._entries[key] = (None, future)
+        self._evict()
+        future.add_done_callback(lambda done: self._on_done(key, done))
+        # Shield so a caller that gives up (client timeout) doesn't cancel work a retry is waiting on
+        return await asyncio.shield(future), False
+
+    def _on_done(self, key: str, future: asyncio.Future) -> None:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] is not future:
+            return
+        if future.cancelled() or future.exception() is not None or not _is_cacheable(future.result()):
+            del self._entries[key]
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, future)
+
+    def _evict(self) -> None:
+        # Oldest first; in-flight entries are kept so duplicates can still join them
+        if len(self._entries) <= self.max_entries:
+            return
+        for key in list(self._entries):
+            if len(self._entries) <= self.max_entries:
+                break
+            if self._entries[key][0] is not None:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,133 @@
+"""
+In-process background job queue - lets a webhook answer 202 straight away and finish
+the work (e.g. the Graph sendMail round trip) on a small pool of worker tasks.
+Outcomes are kept for a while so callers can poll /jobs/{id}.
+"""
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# A job function returns (succeeded, result)
+JobFunc = Callable[[], Awaitable[tuple]]
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    __slots__ = ("id", "kind", "status", "created_at", "started_at", "finished_at", "result", "error", "func")
+
+    def __init__(self, kind: str, func: JobFunc):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "queued"  # queued -> running -> succeeded | failed
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.func: Optional[JobFunc] = func
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """Bounded asyncio queue drained by `workers` tasks started in the app lifespan."""
+
+    def __init__(self, workers: int = 4, max_queued: int = 1000, max_retained: int = 1000):
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.max_retained = max_retained
+        self._queue: Optional[asyncio.Queue] = None
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._tasks: list = []
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        # Created here so the queue belongs to the running event loop
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Started {self.workers} background job workers")
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """Let queued jobs finish (up to drain_timeout), then stop the workers."""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{self._queue.qsize()} background jobs still queued at shutdown")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, kind: str, func: JobFunc) -> Job:
+        if self._queue is None:
+            raise RuntimeError("JobQueue.start() has not been called")
+        job = Job(kind, func)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFull(f"Background job queue is full ({self.max_queued} jobs)")
+        self._jobs[job.id] = job
+        self._trim()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        queued = self._queue.qsize() if self._queue is not None else 0
+        return {"workers": len(self._tasks), "queued": queued, "retained": len(self._jobs)}
+
+    def _trim(self) -> None:
+        # Forget the oldest finished jobs; queued/running ones are always kept
+        excess = len(self._jobs) - self.max_retained
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.done][:excess]:
+            del self._jobs[job_id]
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job: Job = await self._queue.get()
+            try:
+                job.status = "running"
+                job.started_at = datetime.now(timezone.utc)
+                succeeded, job.result = await job.func()
+                job.status = "succeeded" if succeeded else "failed"
+            except asyncio.CancelledError:
+                job.status = "failed"
+                job.error = "Cancelled at shutdown"
+                raise
+            except Exception as e:
+                logger.exception(f"Background job {job.id} ({job.kind}) failed")
+                job.status = "failed"
+                job.error = str(e)
+            finally:
+                job.finished_at = datetime.now(timezone.utc)
+                job.func = None
+                self._queue.task_done()
+            logger.info(f"Background job {job.id} ({job.kind}) {job.status}")
@@ -0,0 +1,56 @@
+"""
+JSON encoding and decoding for webhook responses and upstream payloads.
+
+Uses orjson when it is installed and the stdlib json module otherwise; both produce the
+same compact UTF-8 output for the payloads the bridge handles. Bodies are encoded straight
+to bytes (sent to httpx as `content=`) and responses decoded straight from bytes, skipping
+the str round trip that httpx's `json=` / `response.json()` and JSONResponse go through.
+"""
+import json
+from typing import Any, Dict, Optional, Union
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+JSON_CONTENT_TYPE = "application/json"
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS)
+
+    def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        return orjson.loads(data)
+else:
+    def dumps(obj: Any) -> bytes:
+        # Same settings as httpx's json= and Starlette's JSONResponse
+        return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+    def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        return json.loads(data)
+
+
+def json_request(body: Any, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """httpx request kwargs for a pre-encoded JSON body: `client.post(url, **json_request(body, headers))`"""
+    if body is None:
+        return {"headers": headers} if headers is not None else {}
+    return {"content": dumps(body), "headers": {**(headers or {}), "Content-Type": JSON_CONTENT_TYPE}}
+
+
+def response_json(response: Any) -> Any:
+    """Decode an httpx response body from bytes (raises ValueError if it isn't JSON)."""
+    return loads(response.content)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with the fast encoder; the app's default response class."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
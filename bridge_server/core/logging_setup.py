@@ -0,0 +1,161 @@
+"""
+Logging pipeline: structured records written by a background thread.
+
+configure_logging() puts a QueueHandler on the root logger and starts a QueueListener
+thread that formats and writes the records, so a request never waits on a stream write.
+Records are queued unformatted - the message, and any payload passed as LazyPayload, is
+only built in the listener thread, and only for records that pass the level check.
+Verbose per-request payload logs go through log_payload(), which samples them.
+
+Mirrored in cal_com_mcp_server/core/ and outlook_mcp_server/core/ (the services deploy separately) - keep all three in sync.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+# Attributes every LogRecord has; anything else was passed with extra= and becomes a field
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+# uvicorn's loggers write to their own stream handlers; route them through the queue too
+_UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["_DeferredQueueHandler"] = None
+_payload_sample_rate = 1.0
+
+
+class LazyPayload:
+    """A pydantic model or dict that is only serialized if its log record is written."""
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def to_json(self) -> Any:
+        if hasattr(self.value, "model_dump"):
+            return self.value.model_dump(mode="json")
+        return self.value
+
+    def __str__(self) -> str:
+        return json.dumps(self.to_json(), default=str, ensure_ascii=False)
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {
+        key: value.to_json() if isinstance(value, LazyPayload) else value
+        for key, value in record.__dict__.items()
+        if key not in _RECORD_ATTRS
+    }
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message, extra= fields, exc_info."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(_extra_fields(record))
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Plain text for local development; extra= fields are appended as key=value."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        message = super().formatMessage(record)
+        extras = _extra_fields(record)
+        if not extras:
+            return message
+        return message + " " + " ".join(f"{key}={json.dumps(value, default=str, ensure_ascii=False)}" for key, value in extras.items())
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock QueueHandler formats here, on the caller's thread; leave it to the listener.
+        # Log arguments must therefore not be mutated after the call (payloads are request-scoped).
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Never block a request on logging; count what was shed instead
+            self.dropped += 1
+
+
+def configure_logging(
+    level: str = "INFO",
+    fmt: str = "json",
+    queue_size: int = 10000,
+    payload_sample_rate: float = 1.0
+) -> logging.handlers.QueueListener:
+    """Route all logging through a bounded queue to a background writer thread (idempotent)."""
+    global _listener, _queue_handler, _payload_sample_rate
+    _payload_sample_rate = max(0.0, min(1.0, payload_sample_rate))
+    if _listener is not None:
+        return _listener
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    _queue_handler = _DeferredQueueHandler(queue.Queue(maxsize=queue_size))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(level.upper())
+    for name in _UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging() -> None:
+    """Write out anything still queued and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def dropped_records() -> int:
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def log_payload(logger: logging.Logger, payload: Any, msg: str, *args: Any, level: int = logging.INFO) -> None:
+    """Log a request/response payload for a sample of calls (see configure_logging).
+
+    `msg % args` is formatted lazily like any log call; the payload is attached as a
+    structured `payload` field and only serialized by the listener thread.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    if _payload_sample_rate < 1.0 and random.random() >= _payload_sample_rate:
+        return
+    logger.log(level, msg, *args, extra={"payload": LazyPayload(payload)})
@@ -0,0 +1,251 @@
+"""
+Prometheus metrics without the client library: counters, gauges and histograms kept in
+plain Python lists and rendered in the text exposition format by GET /metrics.
+
+Recording is cheap enough to leave on in production. Label children are resolved once
+(keep the result of .labels() in a module constant on hot paths); a histogram observation
+is a bisect over the bucket bounds and two additions; nothing takes a lock, since the
+services record from the event loop thread (a scrape may read a value mid-update, which
+Prometheus tolerates).
+
+Mirrored in cal_com_mcp_server/core/ and outlook_mcp_server/core/ (the services deploy separately) - keep all three in sync.
+"""
+import functools
+import math
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans a cached token lookup (~µs) to a slow upstream call near the request budget
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List["_Metric"] = []
+
+    def register(self, metric: "_Metric") -> None:
+        if any(m.name == metric.name for m in self._metrics):
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: Registry = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, Any] = {}
+        self._default = self._new_child() if not self.labelnames else None
+        if self._default is not None:
+            self._children[()] = self._default
+        registry.register(self)
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def labels(self, *values: Any) -> Any:
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            child = self._children[key] = self._new_child()
+        return child
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.value += amount
+
+    def samples(self) -> Iterable[str]:
+        for key, child in self._children.items():
+            yield f"{self.name}{_label_text(self.labelnames, key)} {_format_value(child.value)}"
+
+
+class Gauge(_Metric):
+    """A settable gauge, or - with `callback` - one read at scrape time.
+
+    The callback returns the value (no labels) or an iterable of (label values, value).
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Registry = REGISTRY, callback: Optional[Callable[[], Any]] = None):
+        super().__init__(name, documentation, labelnames, registry)
+        self._callback = callback
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default.value -= amount
+
+    def set(self, value: float) -> None:
+        self._default.value = value
+
+    def track_in_flight(self, func: Callable) -> Callable:
+        """Decorator for async functions: the gauge counts calls currently running."""
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            self._default.value += 1
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self._default.value -= 1
+        return wrapper
+
+    def samples(self) -> Iterable[str]:
+        if self._callback is None:
+            values = ((key, child.value) for key, child in self._children.items())
+        else:
+            try:
+                result = self._callback()
+            except Exception:
+                return
+            values = [((), result)] if isinstance(result, (int, float)) else result
+        for key, value in values:
+            yield f"{self.name}{_label_text(self.labelnames, tuple(str(v) for v in key))} {_format_value(value)}"
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_start")
+
+    def __init__(self, histogram: "_HistogramValue"):
+        self._histogram = histogram
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._histogram.observe(time.perf_counter() - self._start)
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def time(self) -> _Timer:
+        """`with STAGE.time():` observes the block's duration in seconds."""
+        return _Timer(self)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Registry = REGISTRY, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(float(b) for b in buckets if not math.isinf(b)))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def time(self) -> _Timer:
+        return _Timer(self._default)
+
+    def samples(self) -> Iterable[str]:
+        for key, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += count
+                labels = _label_text(self.labelnames, key, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _label_text(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+# --- metrics shared by the bridge and both MCP servers ---
+
+STAGE_SECONDS = Histogram(
+    "stage_duration_seconds", "Time spent in each stage of handling a request", ["stage"]
+)
+OUTCOMES = Counter(
+    "outcomes_total", "Outcomes of webhook requests, tool calls and upstream operations", ["operation", "outcome"]
+)
+RETRIES = Counter(
+    "retries_total", "Operations attempted again (reconnects, outbox redeliveries, webhook replays)", ["operation"]
+)
+IN_FLIGHT = Gauge(
+    "requests_in_flight", "Requests (webhooks or tool calls) currently being handled"
+)
+
+
+def render() -> bytes:
+    return REGISTRY.render().encode("utf-8")
@@ -0,0 +1,290 @@
+"""
+Durable outbox for outbound operations (emails, bookings), backed by SQLite in WAL mode.
+
+Every operation is written to the outbox before it is attempted, then delivered by a pool
+of async workers with exponential backoff. Rows left in progress by a crash or restart are
+picked up again on startup, so delivery is at-least-once.
+
+Handlers are registered per kind and return (succeeded, result, retryable):
+- succeeded          -> the row is marked done and `result` stored
+- failed, retryable  -> retried with backoff until OUTBOX_MAX_ATTEMPTS
+- failed, permanent  -> the row is marked failed
+Exceptions raised by a handler count as retryable failures.
+"""
+import asyncio
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from core.metrics import OUTCOMES, RETRIES
+
+logger = logging.getLogger(__name__)
+
+# handler(payload) -> (succeeded, result, retryable)
+OutboxHandler = Callable[[Dict[str, Any]], Awaitable[Tuple[bool, Dict[str, Any], bool]]]
+
+PENDING = "pending"
+IN_PROGRESS = "in_progress"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    last_error TEXT,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+"""
+
+_COLUMNS = "id, kind, payload, status, attempts, next_attempt_at, created_at, updated_at, last_error, result"
+
+
+def _row_to_dict(row: Optional[tuple]) -> Optional[Dict[str, Any]]:
+    if row is None:
+        return None
+    record = dict(zip([c.strip() for c in _COLUMNS.split(",")], row))
+    record["payload"] = json.loads(record["payload"])
+    record["result"] = json.loads(record["result"]) if record["result"] else None
+    return record
+
+
+class Outbox:
+    """SQLite-backed outbox drained by `workers` asyncio tasks started in the app lifespan."""
+
+    def __init__(
+        self,
+        path: str,
+        workers: int = 4,
+        max_attempts: int = 5,
+        base_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        poll_interval: float = 1.0,
+        retention_seconds: float = 86400.0
+    ):
+        self.path = path
+        self.workers = max(1, workers)
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self._handlers: Dict[str, OutboxHandler] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+
+    def register(self, kind: str, handler: OutboxHandler) -> None:
+        self._handlers[kind] = handler
+
+    # --- database (runs in a worker thread; one connection serialized by a lock) ---
+
+    def _execute(self, sql: str, params: tuple = (), fetch: str = "") -> Any:
+        with self._db_lock:
+            cursor = self._conn.execute(sql, params)
+            if fetch == "one":
+                result = cursor.fetchone()
+            elif fetch == "all":
+                result = cursor.fetchall()
+            else:
+                result = cursor.rowcount
+            self._conn.commit()
+            return result
+
+    async def _db(self, sql: str, params: tuple = (), fetch: str = "") -> Any:
+        return await asyncio.to_thread(self._execute, sql, params, fetch)
+
+    def _open(self) -> int:
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")  # durable across process crashes in WAL mode
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(_SCHEMA)
+        # Anything in progress when the process died is delivered again
+        return self._execute(
+            f"UPDATE outbox SET status = '{PENDING}', updated_at = ? WHERE status = '{IN_PROGRESS}'",
+            (time.time(),)
+        )
+
+    # --- lifecycle ---
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        recovered = await asyncio.to_thread(self._open)
+        pending = await self._db(f"SELECT COUNT(*) FROM outbox WHERE status = '{PENDING}'", fetch="one")
+        if recovered:
+            logger.warning(f"Outbox: recovered {recovered} operations interrupted by a restart")
+        logger.info(f"Outbox at {self.path}: {pending[0]} pending operations, starting {self.workers} workers")
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """Let in-flight deliveries finish (up to drain_timeout), then stop the workers.
+
+        Pending rows stay in the database; anything cut off mid-delivery is retried on the next start.
+        """
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self._tasks:
+            _, still_running = await asyncio.wait(self._tasks, timeout=drain_timeout)
+            for task in still_running:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._conn is not None:
+            with self._db_lock:
+                self._conn.close()
+            self._conn = None
+
+    # --- producers ---
+
+    async def enqueue(self, kind: str, payload: Dict[str, Any]) -> str:
+        """Persist an operation and wake a worker; returns its id."""
+        if kind not in self._handlers:
+            raise ValueError(f"No outbox handler registered for {kind}")
+        op_id = uuid.uuid4().hex
+        now = time.time()
+        await self._db(
+            f"INSERT INTO outbox ({_COLUMNS}) VALUES (?, ?, ?, '{PENDING}', 0, ?, ?, ?, NULL, NULL)",
+            (op_id, kind, json.dumps(payload), now, now, now)
+        )
+        self._wakeup.set()
+        return op_id
+
+    async def wait(self, op_id: str) -> Dict[str, Any]:
+        """Wait until an operation is done or has permanently failed; returns its record."""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(op_id, []).append(future)
+        try:
+            # It may have finished before we started waiting
+            record = await self.get(op_id)
+            if record is not None and record["status"] in (DONE, FAILED):
+                return record
+            return await future
+        finally:
+            waiters = self._waiters.get(op_id)
+            if waiters and future in waiters:
+                waiters.remove(future)
+                if not waiters:
+                    del self._waiters[op_id]
+
+    async def run(self, kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Persist, deliver and wait for the final outcome (the caller's deadline bounds the wait)."""
+        return await self.wait(await self.enqueue(kind, payload))
+
+    async def get(self, op_id: str) -> Optional[Dict[str, Any]]:
+        row = await self._db(f"SELECT {_COLUMNS} FROM outbox WHERE id = ?", (op_id,), fetch="one")
+        return _row_to_dict(row)
+
+    async def stats(self) -> Dict[str, int]:
+        rows = await self._db("SELECT status, COUNT(*) FROM outbox GROUP BY status", fetch="all")
+        return {status: count for status, count in rows}
+
+    # --- workers ---
+
+    def _claim(self) -> Optional[tuple]:
+        with self._db_lock:
+            row = self._conn.execute(
+                f"UPDATE outbox SET status = '{IN_PROGRESS}', attempts = attempts + 1, updated_at = ? "
+                f"WHERE id = (SELECT id FROM outbox WHERE status = '{PENDING}' AND next_attempt_at <= ? "
+                f"ORDER BY next_attempt_at LIMIT 1) RETURNING {_COLUMNS}",
+                (time.time(), time.time())
+            ).fetchall()
+            self._conn.commit()
+            return row[0] if row else None
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.max_backoff, self.base_backoff * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _worker(self, index: int) -> None:
+        while not self._stopping:
+            # Clear before claiming so an enqueue that lands in between isn't missed
+            self._wakeup.clear()
+            row = await asyncio.to_thread(self._claim)
+            if row is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    if index == 0:
+                        await self._prune()
+                continue
+            await self._deliver(_row_to_dict(row))
+
+    async def _deliver(self, record: Dict[str, Any]) -> None:
+        op_id, kind, attempts = record["id"], record["kind"], record["attempts"]
+        try:
+            succeeded, result, retryable = await self._handlers[kind](record["payload"])
+            error = None if succeeded else (result or {}).get("error_details") or (result or {}).get("message")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception(f"Outbox {kind} {op_id}: attempt {attempts} raised")
+            succeeded, result, retryable, error = False, None, True, str(e)
+
+        now = time.time()
+        if succeeded:
+            status = DONE
+        elif retryable and attempts < self.max_attempts:
+            status = PENDING
+            delay = self._backoff(attempts)
+            RETRIES.labels(f"outbox:{kind}").inc()
+            logger.warning(f"Outbox {kind} {op_id}: attempt {attempts} failed ({error}), retrying in {delay:.1f}s")
+        else:
+            status = FAILED
+            logger.error(f"Outbox {kind} {op_id}: giving up after {attempts} attempts ({error})")
+        if status != PENDING:
+            OUTCOMES.labels(f"outbox:{kind}", status).inc()
+        await self._db(
+            "UPDATE outbox SET status = ?, next_attempt_at = ?, updated_at = ?, last_error = ?, result = ? WHERE id = ?",
+            (status, now + delay if status == PENDING else now, now, error,
+             json.dumps(result) if result is not None else None, op_id)
+        )
+        if status == PENDING:
+            # Wake a worker when the retry is due rather than at the next poll
+            asyncio.get_running_loop().call_later(delay, self._wakeup.set)
+        else:
+            self._notify(op_id)
+
+    def _notify(self, op_id: str) -> None:
+        waiters = self._waiters.pop(op_id, [])
+        if not waiters:
+            return
+        task = asyncio.ensure_future(self.get(op_id))
+
+        def resolve(done: asyncio.Future) -> None:
+            for waiter in waiters:
+                if waiter.done():
+                    continue
+                if done.exception() is not None:
+                    waiter.set_exception(done.exception())
+                else:
+                    waiter.set_result(done.result())
+
+        task.add_done_callback(resolve)
+
+    async def _prune(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        removed = await self._db(
+            f"DELETE FROM outbox WHERE status IN ('{DONE}', '{FAILED}') AND updated_at < ?", (cutoff,)
+        )
+        if removed:
+            logger.info(f"Outbox: pruned {removed} finished operations")
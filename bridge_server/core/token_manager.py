@@ -0,0 +1,120 @@
+"""
+Single-flight, proactively refreshed OAuth access token cache.
+
+Mirrored in outlook_mcp_server/core/token_manager.py (the services deploy separately) - keep both in sync.
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# fetch_token() returns (access_token, expires_in_seconds)
+TokenFetcher = Callable[[], Awaitable[Tuple[str, int]]]
+
+# Never refresh sooner than this after a fetch, even for a token that expires within refresh_margin
+_MIN_REFRESH_DELAY = 1.0
+
+
+class AccessTokenManager:
+    """Caches an access token and keeps it fresh off the request path.
+
+    - Steady state: get_token() returns the cached token without awaiting any I/O.
+    - Concurrent callers that find no valid token share one in-flight fetch.
+    - A background refresh starts `refresh_margin` seconds before expiry, so requests
+      never wait on the token endpoint while the cached token is still usable.
+    """
+
+    def __init__(
+        self,
+        fetch_token: TokenFetcher,
+        name: str = "token",
+        refresh_margin: float = 300.0,
+        expiry_skew: float = 60.0,
+        retry_delay: float = 30.0
+    ):
+        self._fetch_token = fetch_token
+        self.name = name
+        self.refresh_margin = refresh_margin
+        self.expiry_skew = expiry_skew
+        self.retry_delay = retry_delay
+        self._token: Optional[str] = None
+        self._expires_at = 0.0  # monotonic time after which the token must not be used
+        self._inflight: Optional[asyncio.Future] = None
+        self._refresh_handle: Optional[asyncio.TimerHandle] = None
+
+    def peek(self) -> Optional[str]:
+        """Return the cached token if it is still usable, without any I/O."""
+        if self._token and time.monotonic() < self._expires_at:
+            return self._token
+        return None
+
+    @property
+    def expires_in(self) -> float:
+        return max(0.0, self._expires_at - time.monotonic())
+
+    async def get_token(self) -> str:
+        token = self.peek()
+        if token is not None:
+            return token
+        return await self.refresh()
+
+    async def refresh(self) -> str:
+        """Fetch a new token, joining an in-flight fetch if there is one."""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._do_fetch())
+        # Shield so a cancelled caller doesn't cancel the fetch other callers are waiting on
+        return await asyncio.shield(self._inflight)
+
+    def invalidate(self) -> None:
+        """Drop the cached token, e.g. after the API rejected it with 401."""
+        self._token = None
+        self._expires_at = 0.0
+
+    async def _do_fetch(self) -> str:
+        try:
+            token, expires_in = await self._fetch_token()
+        except Exception:
+            if self.peek() is not None:
+                # Background refresh failed but the current token is still good - try again shortly
+                self._schedule_refresh(self.retry_delay)
+            raise
+        now = time.monotonic()
+        self._token = token
+        self._expires_at = now + max(0.0, expires_in - self.expiry_skew)
+        # Tokens that live shorter than refresh_margin are refreshed halfway through instead of straight away
+        self._schedule_refresh(max(expires_in * 0.5, expires_in - self.refresh_margin, _MIN_REFRESH_DELAY))
+        logger.debug(f"{self.name}: fetched access token valid for {expires_in}s")
+        return token
+
+    def _schedule_refresh(self, delay: float) -> None:
+        if self._refresh_handle is not None:
+            self._refresh_handle.cancel()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._refresh_handle = loop.call_later(delay, self._background_refresh)
+
+    def _background_refresh(self) -> None:
+        self._refresh_handle = None
+        if self._inflight is not None and not self._inflight.done():
+            return
+        self._inflight = asyncio.ensure_future(self._do_fetch())
+        self._inflight.add_done_callback(self._log_background_result)
+
+    def _log_background_result(self, future: asyncio.Future) -> None:
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logger.warning(f"{self.name}: background token refresh failed: {error}")
+
+    def close(self) -> None:
+        """Stop scheduled background refreshes."""
+        if self._refresh_handle is not None:
+            self._refresh_handle.cancel()
+            self._refresh_handle = None
+        if self._inflight is not None and not self._inflight.done():
+            self._inflight.cancel()
@@ -0,0 +1,71 @@
+"""
+Startup warm-up - opens upstream connections (and fetches the Graph token) in the background
+after startup, so the first webhook after a deploy or wake-up finds them hot. /ready reports
+ready once every step has finished.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+WarmupStep = Callable[[], Awaitable[Any]]
+
+
+class Readiness:
+    """Runs the warm-up steps concurrently and tracks their outcome.
+
+    A failed or timed-out step is logged and reported but still counts as finished - an upstream
+    outage must not keep the bridge unready, the first request just pays for the connection itself.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.duration_ms: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, steps: Dict[str, WarmupStep], timeout: float) -> None:
+        """Start warming up in the background; with no steps the bridge is ready straight away."""
+        self.ready = False
+        self.duration_ms = None
+        self.steps = {name: {"status": "pending"} for name in steps}
+        self._task = asyncio.create_task(self._run(steps, timeout))
+
+    async def _run(self, steps: Dict[str, WarmupStep], timeout: float) -> None:
+        started = time.perf_counter()
+        await asyncio.gather(*(self._run_step(name, step, timeout) for name, step in steps.items()))
+        self.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.ready = True
+        if steps:
+            logger.info(f"Warm-up finished in {self.duration_ms:.0f}ms: "
+                        + ", ".join(f"{name} {state['status']}" for name, state in self.steps.items()))
+
+    async def _run_step(self, name: str, step: WarmupStep, timeout: float) -> None:
+        started = time.perf_counter()
+        state: Dict[str, Any] = {"status": "ok"}
+        try:
+            await asyncio.wait_for(step(), timeout)
+        except asyncio.TimeoutError:
+            state = {"status": "timeout", "error": f"not finished after {timeout:g}s"}
+        except Exception as e:
+            state = {"status": "failed", "error": str(e) or type(e).__name__}
+        state["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        self.steps[name] = state
+        if state["status"] != "ok":
+            logger.warning(f"Warm-up step '{name}' {state['status']}: {state['error']}")
+
+    async def stop(self) -> None:
+        """Not ready any more (shutting down); cancels a warm-up still in progress."""
+        self.ready = False
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"ready": self.ready, "warmup_ms": self.duration_ms, "steps": self.steps}
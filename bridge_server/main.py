@@ -1,106 +1,516 @@
+import asyncio
+import html
 import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from functools import partial
 from fastapi import FastAPI, HTTPException, Request, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 from datetime import datetime, timezone
+from typing import Optional, Union
 import pytz
 
 # Schemas for webhook validation
-from schemas.webhook_schemas import CalComWebhookPayload, OutlookEmailWebhookPayload
+from schemas.webhook_schemas import (
+    CalComWebhookPayload, CalComAlternativesWebhookPayload, ScheduleAndConfirmWebhookPayload, OutlookEmailWebhookPayload
+)
 
 # Configuration
 from core.config import (
     CAL_COM_MCP_SERVER_URL, OUTLOOK_MCP_SERVER_URL,
     CAL_COM_API_KEY, CAL_COM_API_BASE_URL, DEFAULT_EVENT_TYPE_ID,
     AZURE_TENANT_ID, AZURE_CLIENT_ID, AZURE_CLIENT_SECRET, SENDER_UPN,
-    INTEGRATION_MODE
+    GRAPH_API_BASE_URL, AZURE_LOGIN_BASE_URL, INTEGRATION_MODE, MCP_INTEGRATION_MODES,
+    SLOT_CACHE_TTL_SECONDS, SLOT_CACHE_MAX_ENTRIES, CAL_COM_VALIDATE_SLOTS_FROM_CACHE,
+    IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_MAX_ENTRIES, REQUEST_BUDGET_SECONDS,
+    SEND_EMAIL_ASYNC, JOB_WORKERS, JOB_QUEUE_MAX, JOB_RETENTION,
+    OUTBOX_ENABLED, OUTBOX_PATH, OUTBOX_WORKERS, OUTBOX_MAX_ATTEMPTS, OUTBOX_BASE_BACKOFF_SECONDS,
+    OUTBOX_MAX_BACKOFF_SECONDS, OUTBOX_RETENTION_SECONDS, GRAPH_BATCH_WINDOW_MS, GRAPH_BATCH_MAX_SIZE,
+    LOG_LEVEL, LOG_FORMAT, LOG_QUEUE_SIZE, LOG_PAYLOAD_SAMPLE_RATE,
+    WARMUP_ENABLED, WARMUP_TIMEOUT_SECONDS, WARMUP_PREFETCH_SLOTS, RATE_LIMIT_ENABLED, RATE_LIMIT_MAX_WAIT_SECONDS,
+    CAL_COM_RATE_LIMIT_RPS, CAL_COM_RATE_LIMIT_BURST, GRAPH_RATE_LIMIT_RPS, GRAPH_RATE_LIMIT_BURST
+)
+from core.adaptive_timeout import adaptive_timeouts
+from core.admission import Overloaded, admission_stats, get_admission_controller
+from core.circuit_breaker import CircuitOpenError, breaker_stats
+from core.deadline import (
+    Deadline, DeadlineExceeded, DEADLINE_HEADER, budget_from_header, check_deadline, current_deadline, set_deadline, reset_deadline
 )
+from core.idempotency import IdempotencyCache, idempotency_key, IDEMPOTENCY_HEADER
+from core.jobs import JobQueue, QueueFull
+from core.json_codec import FastJSONResponse, loads
+from core.logging_setup import configure_logging, log_payload
+from core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, IN_FLIGHT, OUTCOMES, RETRIES, STAGE_SECONDS, Gauge, render as render_metrics
+from core.rate_limiter import RateLimited, get_rate_limiter, limiter_stats
+from core.warmup import Readiness
 
 # Import based on integration mode
-if INTEGRATION_MODE == "mcp":
+if INTEGRATION_MODE in MCP_INTEGRATION_MODES:
     # MCP client utility functions
     from mcp_clients.cal_com_client import call_cal_com_create_booking_tool, CreateCalComBookingClientInput, CreateCalComBookingClientOutput
     from mcp_clients.outlook_client import call_outlook_send_email_tool, SendOutlookEmailClientInput, SendOutlookEmailClientOutput
+    from mcp_clients.session_pool import mcp_session_pool
+    from mcp_clients.inproc import load_inproc_servers
 else:
     # Direct API clients
     from api_clients.cal_com_direct import CalComDirectClient, CalComBookingInput, CalComBookingOutput
     from api_clients.outlook_direct import OutlookDirectClient, OutlookEmailInput, OutlookEmailOutput
+    from core.email_templates import UnknownEmailTemplate, default_engine
+    from core.http_pool import HttpClientPool
+    from core.slot_cache import SlotCache
 
-logging.basicConfig(level=logging.INFO)
+# Structured records written by a background thread; payloads are logged for a sample of requests
+configure_logging(LOG_LEVEL, LOG_FORMAT, LOG_QUEUE_SIZE, LOG_PAYLOAD_SAMPLE_RATE)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(
-    title="Bridge Server for ElevenLabs Agent",
-    description="Receives webhooks from ElevenLabs and calls appropriate tools (MCP or Direct API).",
-    version="0.2.0"
-)
+# Webhook retries (same payload or Idempotency-Key) reuse the first attempt's response
+idempotency_cache = IdempotencyCache(ttl_seconds=IDEMPOTENCY_TTL_SECONDS, max_entries=IDEMPOTENCY_MAX_ENTRIES)
 
-# Initialize direct API clients if in direct mode
-if INTEGRATION_MODE == "direct":
-    cal_com_client = CalComDirectClient(
-        api_key=CAL_COM_API_KEY,
-        api_base_url=CAL_COM_API_BASE_URL
+# Workers for webhooks answered with 202 and finished in the background (async send_email)
+job_queue = JobQueue(workers=JOB_WORKERS, max_queued=JOB_QUEUE_MAX, max_retained=JOB_RETENTION)
+
+# Startup warm-up of upstream connections; /ready reports it
+readiness = Readiness()
+
+_VALIDATION_STAGE = STAGE_SECONDS.labels("validation")
+_TIMEZONE_STAGE = STAGE_SECONDS.labels("timezone_conversion")
+_WEBHOOK_REPLAYS = RETRIES.labels("webhook_replay")
+
+def _pool_usage():
+    """Scrape-time samples for the pool_usage gauge: HTTP connections, MCP sessions and queued jobs."""
+    samples = []
+    http_pool = getattr(app.state, "http_pool", None)
+    if http_pool is not None:
+        for upstream, stats in http_pool.stats().items():
+            samples += [((upstream, "active"), stats["active"]), ((upstream, "idle"), stats["idle"])]
+    if INTEGRATION_MODE in MCP_INTEGRATION_MODES:
+        for url, stats in mcp_session_pool.stats().items():
+            samples += [((url, "alive"), stats["alive"]), ((url, "in_flight"), stats["in_flight"])]
+    job_stats = job_queue.stats()
+    samples += [(("jobs", "queued"), job_stats["queued"]), (("jobs", "workers"), job_stats["workers"])]
+    return samples
+
+Gauge("pool_usage", "Pooled HTTP connections and MCP sessions by state, and background job queue depth",
+      ["pool", "state"], callback=_pool_usage)
+
+def _warmup_steps(app: FastAPI) -> dict:
+    """What to warm up for the active integration mode: MCP sessions, or upstream connections and the Graph token."""
+    if not WARMUP_ENABLED:
+        return {}
+    if INTEGRATION_MODE in MCP_INTEGRATION_MODES:
+        return {
+            f"{name}_mcp": partial(mcp_session_pool.warm, url)
+            for name, url in (("cal_com", CAL_COM_MCP_SERVER_URL), ("outlook", OUTLOOK_MCP_SERVER_URL)) if url
+        }
+    return {
+        "cal_com": partial(app.state.cal_com_client.warm_up, DEFAULT_EVENT_TYPE_ID if WARMUP_PREFETCH_SLOTS else None),
+        "graph": app.state.outlook_client.warm_up,
+    }
+
+def _register_outbox_handlers(outbox, cal_com_client, outlook_client) -> None:
+    async def create_booking(payload: dict) -> tuple:
+        try:
+            result = await cal_com_client.create_booking(CalComBookingInput(**payload))
+        except (CircuitOpenError, RateLimited) as e:
+            result = CalComBookingOutput(success=False, message=str(e), retryable=True)
+        return result.success, result.model_dump(mode="json"), result.retryable
+
+    async def send_email(payload: dict) -> tuple:
+        try:
+            result = await outlook_client.send_email(OutlookEmailInput(**payload))
+        except (CircuitOpenError, RateLimited) as e:
+            result = OutlookEmailOutput(success=False, message=str(e), retryable=True)
+        return result.success, result.model_dump(mode="json"), result.retryable
+
+    outbox.register("cal.create_booking", create_booking)
+    outbox.register("outlook.send_email", send_email)
+
+def _outbox_output(record: dict, output_cls):
+    """Client output model for a finished outbox operation."""
+    if record.get("result"):
+        return output_cls(**record["result"])
+    return output_cls(success=False, message="The operation failed after retrying", error_details=record.get("last_error"))
+
+def _prefers_async(request: Request) -> bool:
+    return "respond-async" in request.headers.get("Prefer", "").lower()
+
+def _accepted_response(job_id: str, message: str) -> FastJSONResponse:
+    return FastJSONResponse(
+        status_code=202,
+        headers={"Location": f"/jobs/{job_id}"},
+        content={"status": "accepted", "message": message, "job_id": job_id, "status_url": f"/jobs/{job_id}"}
     )
-    outlook_client = OutlookDirectClient(
-        tenant_id=AZURE_TENANT_ID,
-        client_id=AZURE_CLIENT_ID,
-        client_secret=AZURE_CLIENT_SECRET,
-        sender_upn=SENDER_UPN
+
+def _direct_booking_input(payload: CalComWebhookPayload) -> "CalComBookingInput":
+    """Direct-mode booking input: the UTC start converted to the attendee's local date/time."""
+    with _TIMEZONE_STAGE.time():
+        # Parse UTC times
+        start_utc = datetime.fromisoformat(payload.start_time_utc.replace('Z', '+00:00'))
+        
+        # Convert to attendee's timezone
+        attendee_tz = pytz.timezone(payload.attendee_timezone)
+        start_local = start_utc.astimezone(attendee_tz)
+    
+    return CalComBookingInput(
+        localDate=start_local.strftime('%Y-%m-%d'),
+        localTime=start_local.strftime('%H:%M'),
+        localTimeZone=payload.attendee_timezone,
+        attendeeName=payload.attendee_name,
+        attendeeEmail=payload.attendee_email,
+        eventTypeId=payload.event_type_id or DEFAULT_EVENT_TYPE_ID,
+        eventDurationMinutes=30,  # Calculate from end time if needed
+        guests=payload.guests or [],
+        metadata=payload.metadata or {},
+        language=payload.language or "en"
     )
 
-@app.on_event("startup")
-async def startup_event():
+async def _create_booking_direct(request: Request, direct_input: "CalComBookingInput") -> "CalComBookingOutput":
+    """Create a booking with the direct client, through the outbox when it is enabled."""
+    outbox = request.app.state.outbox
+    if outbox is not None:
+        return _outbox_output(
+            await outbox.run("cal.create_booking", direct_input.model_dump(mode="json")), CalComBookingOutput
+        )
+    return await request.app.state.cal_com_client.create_booking(direct_input)
+
+def _booking_details(result) -> Optional[dict]:
+    if not result.booking_id:
+        return None
+    return {
+        "id": result.booking_id,
+        "uid": result.booking_uid,
+        "title": result.title,
+        "start_time": result.start_time,
+        "end_time": result.end_time,
+        "meet_url": result.meet_url
+    }
+
+@asynccontextmanager
+async def integration_clients(app: FastAPI):
     logger.info("Bridge Server starting up...")
-    logger.info(f"Integration mode: {INTEGRATION_MODE}")
+    logger.info("Integration mode: %s", INTEGRATION_MODE)
     
-    if INTEGRATION_MODE == "mcp":
-        logger.info(f"Cal.com MCP Server URL: {CAL_COM_MCP_SERVER_URL}")
-        logger.info(f"Outlook MCP Server URL: {OUTLOOK_MCP_SERVER_URL}")
+    if INTEGRATION_MODE in MCP_INTEGRATION_MODES:
+        logger.info("Cal.com MCP Server URL: %s", CAL_COM_MCP_SERVER_URL)
+        logger.info("Outlook MCP Server URL: %s", OUTLOOK_MCP_SERVER_URL)
         if not CAL_COM_MCP_SERVER_URL or not OUTLOOK_MCP_SERVER_URL:
             logger.error("One or more MCP Server URLs are not configured. Check .env file.")
+        if INTEGRATION_MODE == "mcp-inproc":
+            # Import the FastMCP tool servers now so the first webhook doesn't pay for it
+            load_inproc_servers()
+        app.state.outbox = None
+        try:
+            yield
+        finally:
+            logger.info("Bridge Server shutting down, closing pooled MCP sessions...")
+            await mcp_session_pool.close_all()
+        return
+
+    logger.info("Using direct API integration")
+    if not CAL_COM_API_KEY:
+        logger.error("Cal.com API key not configured. Check .env file.")
+    if not all([AZURE_TENANT_ID, AZURE_CLIENT_ID, AZURE_CLIENT_SECRET, SENDER_UPN]):
+        logger.error("Azure/Outlook credentials not fully configured. Check .env file.")
+
+    # One long-lived connection pool per upstream host, shared by every webhook
+    http_pool = HttpClientPool()
+    app.state.http_pool = http_pool
+    app.state.cal_com_client = CalComDirectClient(
+        api_key=CAL_COM_API_KEY,
+        api_base_url=CAL_COM_API_BASE_URL,
+        http_client=http_pool.get("cal_com"),
+        slot_cache=SlotCache(ttl_seconds=SLOT_CACHE_TTL_SECONDS, max_entries=SLOT_CACHE_MAX_ENTRIES),
+        validate_slots_from_cache=CAL_COM_VALIDATE_SLOTS_FROM_CACHE,
+        rate_limiter=get_rate_limiter(
+            "cal_com", CAL_COM_API_KEY or "", CAL_COM_RATE_LIMIT_RPS, CAL_COM_RATE_LIMIT_BURST,
+            RATE_LIMIT_MAX_WAIT_SECONDS, RATE_LIMIT_ENABLED
+        )
+    )
+    app.state.outlook_client = OutlookDirectClient(
+        tenant_id=AZURE_TENANT_ID,
+        client_id=AZURE_CLIENT_ID,
+        client_secret=AZURE_CLIENT_SECRET,
+        sender_upn=SENDER_UPN,
+        graph_base_url=GRAPH_API_BASE_URL,
+        login_base_url=AZURE_LOGIN_BASE_URL,
+        graph_http_client=http_pool.get("graph"),
+        login_http_client=http_pool.get("login"),
+        batch_window_seconds=GRAPH_BATCH_WINDOW_MS / 1000,
+        batch_max_size=GRAPH_BATCH_MAX_SIZE,
+        # Email templates are read and compiled once here, not on every send
+        template_engine=default_engine(),
+        rate_limiter=get_rate_limiter(
+            "graph", AZURE_TENANT_ID or "", GRAPH_RATE_LIMIT_RPS, GRAPH_RATE_LIMIT_BURST,
+            RATE_LIMIT_MAX_WAIT_SECONDS, RATE_LIMIT_ENABLED
+        )
+    )
+    app.state.outbox = None
+    if OUTBOX_ENABLED:
+        # Bookings and emails are persisted before they are attempted and retried until delivered
+        # (imported here so deployments without the outbox don't load sqlite3)
+        from core.outbox import Outbox
+        app.state.outbox = Outbox(
+            OUTBOX_PATH,
+            workers=OUTBOX_WORKERS,
+            max_attempts=OUTBOX_MAX_ATTEMPTS,
+            base_backoff=OUTBOX_BASE_BACKOFF_SECONDS,
+            max_backoff=OUTBOX_MAX_BACKOFF_SECONDS,
+            retention_seconds=OUTBOX_RETENTION_SECONDS
+        )
+        _register_outbox_handlers(app.state.outbox, app.state.cal_com_client, app.state.outlook_client)
+        await app.state.outbox.start()
+    try:
+        yield
+    finally:
+        if app.state.outbox is not None:
+            await app.state.outbox.stop()
+        logger.info("Bridge Server shutting down, closing HTTP connection pools...")
+        await app.state.outlook_client.aclose()
+        await app.state.cal_com_client.aclose()
+        await http_pool.aclose()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with integration_clients(app):
+        # Workers start after, and drain before, the clients they use
+        job_queue.start()
+        # Warm up in the background: the app serves (and /ready answers 503) meanwhile
+        readiness.start(_warmup_steps(app), WARMUP_TIMEOUT_SECONDS)
+        try:
+            yield
+        finally:
+            await readiness.stop()
+            await job_queue.stop()
+
+app = FastAPI(
+    title="Bridge Server for ElevenLabs Agent",
+    description="Receives webhooks from ElevenLabs and calls appropriate tools (MCP or Direct API).",
+    version="0.2.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
+)
+
+def _overloaded_response(exc: Overloaded) -> FastJSONResponse:
+    """503 for a request turned away by admission control - answered without waiting for a slot."""
+    logger.warning("Shed request: %s", exc)
+    return FastJSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+        content={
+            "status": "error",
+            "error": "overloaded",
+            "retryable": True,
+            "message": "We're handling a lot of requests right now. Please try again in a moment."
+        }
+    )
+
+class AdmissionMiddleware:
+    """Per-route concurrency limit and bounded wait queue for the webhook routes (core/admission.py).
+
+    Added before the deadline middleware so it runs inside it: the expected wait is weighed
+    against the time left in the request's own budget.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._routes = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith("/webhook/"):
+            return await self.app(scope, receive, send)
+        if self._routes is None:
+            # Only paths of real routes get a controller, so unknown paths can't create more
+            self._routes = {route.path for route in scope["app"].routes if route.path.startswith("/webhook/")}
+        if scope["path"] not in self._routes:
+            return await self.app(scope, receive, send)
+
+        controller = get_admission_controller(scope["path"])
+        deadline = current_deadline()
+        try:
+            await controller.acquire(deadline.remaining() if deadline is not None else None)
+        except Overloaded as exc:
+            return await _overloaded_response(exc)(scope, receive, send)
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release(time.monotonic() - started)
+
+app.add_middleware(AdmissionMiddleware)
+
+class DeadlineMiddleware:
+    """Give every request a deadline (REQUEST_BUDGET_SECONDS or the caller's X-Request-Timeout-Ms).
+
+    Plain ASGI rather than @app.middleware so it adds no per-request task; the inner app runs in
+    this task, so it sees the deadline contextvar.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._header = DEADLINE_HEADER.lower().encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        header = next((value for name, value in scope["headers"] if name == self._header), None)
+        budget = budget_from_header(header.decode("latin-1") if header is not None else None, REQUEST_BUDGET_SECONDS)
+        token = set_deadline(Deadline(budget))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reset_deadline(token)
+
+app.add_middleware(DeadlineMiddleware)
+
+class RequestMetricsMiddleware:
+    """Counts requests in flight and their outcome per route; marks when each request arrived.
+
+    Plain ASGI rather than @app.middleware so it adds no per-request task.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        scope.setdefault("state", {})["received_at"] = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            IN_FLIGHT.dec()
+            # The router records the matched route on the scope
+            route = getattr(scope.get("route"), "path", "unmatched")
+            outcome = "success" if status_code < 400 else "client_error" if status_code < 500 else "server_error"
+            OUTCOMES.labels(route, outcome).inc()
+
+app.add_middleware(RequestMetricsMiddleware)
+
+def _observe_validation(request: Request) -> None:
+    """Record the time from arrival to the handler: body read, JSON parse and payload validation."""
+    received_at = getattr(request.state, "received_at", None)
+    if received_at is not None:
+        _VALIDATION_STAGE.observe(time.perf_counter() - received_at)
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    logger.warning("%s: %s", request.url.path, exc)
+    return FastJSONResponse(
+        status_code=503,
+        headers={"Retry-After": "1"},
+        content={
+            "status": "error",
+            "error": "deadline_exceeded",
+            "retryable": True,
+            "message": "This is taking longer than expected. Please try again in a moment."
+        }
+    )
+
+def _upstream_unavailable_response(exc: Union[CircuitOpenError, RateLimited]) -> FastJSONResponse:
+    """503 for a call refused by an open circuit breaker or the upstream's rate limit - answered straight away."""
+    rate_limited = isinstance(exc, RateLimited)
+    logger.warning("%s: %s", "Rate limited" if rate_limited else "Circuit open", exc)
+    return FastJSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+        content={
+            "status": "error",
+            "error": "rate_limited" if rate_limited else "upstream_unavailable",
+            "retryable": True,
+            "upstream": exc.upstream,
+            "message": str(exc)
+        }
+    )
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+    return _upstream_unavailable_response(exc)
+
+@app.exception_handler(RateLimited)
+async def rate_limited_handler(request: Request, exc: RateLimited):
+    return _upstream_unavailable_response(exc)
+
+async def _run_idempotent(scope: str, payload, request: Request, handler) -> Response:
+    """Run a webhook handler at most once per payload/Idempotency-Key; retries get the first response."""
+    _observe_validation(request)
+    key = idempotency_key(scope, payload, request.headers.get(IDEMPOTENCY_HEADER))
+    deadline = current_deadline()
+    if deadline is None:
+        response, replayed = await idempotency_cache.run(key, handler)
     else:
-        logger.info("Using direct API integration")
-        if not CAL_COM_API_KEY:
-            logger.error("Cal.com API key not configured. Check .env file.")
-        if not all([AZURE_TENANT_ID, AZURE_CLIENT_ID, AZURE_CLIENT_SECRET, SENDER_UPN]):
-            logger.error("Azure/Outlook credentials not fully configured. Check .env file.")
+        async def run_with_own_budget():
+            # The work runs in its own task; give it the full budget rather than what is left of this
+            # caller's, so a booking that outlives the caller's wait still completes and is cached
+            set_deadline(Deadline(max(REQUEST_BUDGET_SECONDS, deadline.remaining())))
+            return await handler()
+
+        # Out of budget: answer "try again" now; the work carries on and the retry joins it
+        try:
+            response, replayed = await asyncio.wait_for(idempotency_cache.run(key, run_with_own_budget), deadline.remaining())
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(scope)
+    if not replayed:
+        return response
+    _WEBHOOK_REPLAYS.inc()
+    return Response(
+        content=response.body,
+        status_code=response.status_code,
+        headers={**response.headers, "Idempotent-Replayed": "true"}
+    )
 
 @app.post("/webhook/cal/schedule_consultation")
 async def webhook_schedule_consultation(payload: CalComWebhookPayload, request: Request, background_tasks: BackgroundTasks):
     """
     Webhook endpoint to receive Cal.com scheduling requests from ElevenLabs.
     Routes to either MCP server or direct API based on configuration.
+    Retries of the same booking request join/replay the original attempt.
     """
-    logger.info(f"Received Cal.com scheduling webhook. Payload: {payload.model_dump_json(indent=2)}")
+    return await _run_idempotent("cal.schedule_consultation", payload, request, lambda: _schedule_consultation(payload, request))
+
+async def _schedule_consultation(payload: CalComWebhookPayload, request: Request) -> FastJSONResponse:
+    log_payload(logger, payload, "Received Cal.com scheduling webhook")
     
     # Parse and convert timezone
-    try:
-        # Parse the incoming UTC datetime string
-        utc_dt = datetime.strptime(payload.start_time_utc, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
-        
-        # Convert UTC datetime to the attendee's local timezone
-        attendee_tz_str = payload.attendee_timezone
+    with _TIMEZONE_STAGE.time():
         try:
-            attendee_tz = pytz.timezone(attendee_tz_str)
-        except pytz.UnknownTimeZoneError:
-            logger.error(f"Unknown attendee_timezone: {attendee_tz_str}")
-            return JSONResponse(status_code=400, content={"status": "error", "message": f"Unknown attendee_timezone: {attendee_tz_str}"})
+            # Parse the incoming UTC datetime string
+            utc_dt = datetime.strptime(payload.start_time_utc, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+        
+            # Convert UTC datetime to the attendee's local timezone
+            attendee_tz_str = payload.attendee_timezone
+            try:
+                attendee_tz = pytz.timezone(attendee_tz_str)
+            except pytz.UnknownTimeZoneError:
+                logger.error("Unknown attendee_timezone: %s", attendee_tz_str)
+                return FastJSONResponse(status_code=400, content={"status": "error", "message": f"Unknown attendee_timezone: {attendee_tz_str}"})
 
-        local_dt = utc_dt.astimezone(attendee_tz)
+            local_dt = utc_dt.astimezone(attendee_tz)
         
-        date_part = local_dt.strftime("%Y-%m-%d")
-        time_part = local_dt.strftime("%H:%M")
+            date_part = local_dt.strftime("%Y-%m-%d")
+            time_part = local_dt.strftime("%H:%M")
         
-        logger.info(f"Original UTC: {payload.start_time_utc}, Attendee TZ: {attendee_tz_str}, Converted Local DT: {local_dt.isoformat()}, Date Part: {date_part}, Time Part: {time_part}")
+            logger.debug("Original UTC: %s, Attendee TZ: %s, Converted Local DT: %s, Date Part: %s, Time Part: %s",
+                         payload.start_time_utc, attendee_tz_str, local_dt, date_part, time_part)
 
-    except ValueError as e:
-        logger.error(f"Error parsing start_time_utc '{payload.start_time_utc}' or converting timezone: {e}")
-        return JSONResponse(
-            status_code=400,
-            content={"status": "error", "message": f"Invalid start_time_utc format or timezone issue: {payload.start_time_utc}. Expected ISO 8601 like YYYY-MM-DDTHH:MM:SSZ."}
-        )
+        except ValueError as e:
+            logger.error("Error parsing start_time_utc '%s' or converting timezone: %s", payload.start_time_utc, e)
+            return FastJSONResponse(
+                status_code=400,
+                content={"status": "error", "message": f"Invalid start_time_utc format or timezone issue: {payload.start_time_utc}. Expected ISO 8601 like YYYY-MM-DDTHH:MM:SSZ."}
+            )
 
     # Route based on integration mode
-    if INTEGRATION_MODE == "mcp":
+    if INTEGRATION_MODE in MCP_INTEGRATION_MODES:
         # MCP approach
         mcp_input = CreateCalComBookingClientInput(
             localDate=date_part,
@@ -117,20 +527,24 @@ async def webhook_schedule_consultation(payload: CalComWebhookPayload, request:
         try:
             result: CreateCalComBookingClientOutput = await call_cal_com_create_booking_tool(mcp_input)
             if result.success:
-                logger.info(f"Successfully processed Cal.com booking via MCP. Message: {result.message}")
-                return JSONResponse(
+                logger.info("Successfully processed Cal.com booking via MCP. Message: %s", result.message)
+                return FastJSONResponse(
                     status_code=200,
                     content={"status": "success", "message": result.message, "details": result.booking_details.model_dump() if result.booking_details else None}
                 )
             else:
-                logger.error(f"Error processing Cal.com booking via MCP. Message: {result.message}")
-                return JSONResponse(
+                logger.error("Error processing Cal.com booking via MCP. Message: %s", result.message)
+                return FastJSONResponse(
                     status_code=500,
-                    content={"status": "error", "message": result.message, "details": result.error_details}
+                    content={"status": "error", "retryable": result.retryable, "message": result.message, "details": result.error_details}
                 )
+        except DeadlineExceeded:
+            raise
+        except (CircuitOpenError, RateLimited) as e:
+            return _upstream_unavailable_response(e)
         except Exception as e:
             logger.exception("Unhandled exception during Cal.com MCP call from webhook.")
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=500,
                 content={"status": "error", "message": f"Internal server error in Bridge: {str(e)}"}
             )
@@ -138,78 +552,283 @@ async def webhook_schedule_consultation(payload: CalComWebhookPayload, request:
     else:
         # Direct API approach - convert UTC times to local date/time
         try:
-            # Parse UTC times
-            start_utc = datetime.fromisoformat(payload.start_time_utc.replace('Z', '+00:00'))
-            
-            # Convert to attendee's timezone
-            attendee_tz = pytz.timezone(payload.attendee_timezone)
-            start_local = start_utc.astimezone(attendee_tz)
-            
-            # Extract local date and time components
-            local_date = start_local.strftime('%Y-%m-%d')
-            local_time = start_local.strftime('%H:%M')
-            
-            direct_input = CalComBookingInput(
-                localDate=local_date,
-                localTime=local_time,
-                localTimeZone=payload.attendee_timezone,
-                attendeeName=payload.attendee_name,
-                attendeeEmail=payload.attendee_email,
-                eventTypeId=payload.event_type_id or DEFAULT_EVENT_TYPE_ID,
-                eventDurationMinutes=30,  # Calculate from end time if needed
-                guests=payload.guests or [],
-                metadata=payload.metadata or {},
-                language=payload.language or "en"
-            )
+            direct_input = _direct_booking_input(payload)
         except Exception as e:
-            logger.error(f"Error converting UTC times to local: {e}")
-            return JSONResponse(
+            logger.error("Error converting UTC times to local: %s", e)
+            return FastJSONResponse(
                 status_code=400,
                 content={"status": "error", "message": f"Invalid time format: {str(e)}"}
             )
         
+        outbox = request.app.state.outbox
+        if outbox is not None and _prefers_async(request):
+            op_id = await outbox.enqueue("cal.create_booking", direct_input.model_dump(mode="json"))
+            logger.info("Queued Cal.com booking as outbox operation %s", op_id)
+            return _accepted_response(
+                op_id, f"The booking for {direct_input.localDate} at {direct_input.localTime} is being confirmed."
+            )
+
         try:
-            result: CalComBookingOutput = await cal_com_client.create_booking(direct_input)
+            result: CalComBookingOutput = await _create_booking_direct(request, direct_input)
             if result.success:
-                logger.info(f"Successfully processed Cal.com booking via direct API. Message: {result.message}")
-                return JSONResponse(
+                logger.info("Successfully processed Cal.com booking via direct API. Message: %s", result.message)
+                return FastJSONResponse(
                     status_code=200,
                     content={
                         "status": "success", 
                         "message": result.message, 
-                        "details": {
-                            "id": result.booking_id,
-                            "uid": result.booking_uid,
-                            "title": result.title,
-                            "start_time": result.start_time,
-                            "end_time": result.end_time,
-                            "meet_url": result.meet_url
-                        } if result.booking_id else None
+                        "details": _booking_details(result)
                     }
                 )
             else:
-                logger.error(f"Error processing Cal.com booking via direct API. Message: {result.message}")
-                return JSONResponse(
+                logger.error("Error processing Cal.com booking via direct API. Message: %s", result.message)
+                return FastJSONResponse(
                     status_code=500,
                     content={"status": "error", "message": result.message, "details": result.error_details}
                 )
+        except DeadlineExceeded:
+            raise
+        except (CircuitOpenError, RateLimited) as e:
+            return _upstream_unavailable_response(e)
         except Exception as e:
             logger.exception("Unhandled exception during Cal.com direct API call from webhook.")
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=500,
                 content={"status": "error", "message": f"Internal server error in Bridge: {str(e)}"}
             )
 
+@app.post("/webhook/cal/schedule_and_confirm")
+async def webhook_schedule_and_confirm(payload: ScheduleAndConfirmWebhookPayload, request: Request):
+    """
+    Webhook endpoint that books a consultation and emails the confirmation in one tool call.
+    While the booking is in flight the Graph token is prefetched and the confirmation is
+    rendered, so the email goes out as soon as the booking returns. Direct mode only.
+    """
+    if INTEGRATION_MODE in MCP_INTEGRATION_MODES:
+        return FastJSONResponse(
+            status_code=501,
+            content={"status": "error", "message": "schedule_and_confirm requires INTEGRATION_MODE=direct; use schedule_consultation and send_email instead."}
+        )
+    return await _run_idempotent("cal.schedule_and_confirm", payload, request, lambda: _schedule_and_confirm(payload, request))
+
+def _confirmation_email_html(direct_input: "CalComBookingInput", meet_url: Optional[str]) -> str:
+    local_dt = datetime.strptime(f"{direct_input.localDate} {direct_input.localTime}", "%Y-%m-%d %H:%M")
+    when = local_dt.strftime("%A %d %B %Y at %I:%M %p").replace(" 0", " ")
+    first_name = direct_input.attendeeName.split()[0] if direct_input.attendeeName.strip() else "there"
+    # Everything below comes from the webhook body or Cal.com - escape it, and only link http(s) URLs
+    meeting_line = ""
+    if meet_url and meet_url.lower().startswith(("https://", "http://")):
+        url = html.escape(meet_url, quote=True)
+        meeting_line = f'<p>Join the meeting here: <a href="{url}">{url}</a></p>'
+    return (
+        f"<p>Hi {html.escape(first_name, quote=True)},</p>"
+        f"<p>Your consultation is confirmed for <strong>{html.escape(when, quote=True)}</strong>"
+        f" ({html.escape(direct_input.localTimeZone, quote=True)}).</p>"
+        f"{meeting_line}"
+        f"<p>A calendar invitation is on its way. If you need to change the time, just reply to this email.</p>"
+    )
+
+async def _schedule_and_confirm(payload: ScheduleAndConfirmWebhookPayload, request: Request) -> FastJSONResponse:
+    log_payload(logger, payload, "Received schedule-and-confirm webhook")
+    try:
+        direct_input = _direct_booking_input(payload)
+    except Exception as e:
+        logger.error("Error converting UTC times to local: %s", e)
+        return FastJSONResponse(
+            status_code=400,
+            content={"status": "error", "message": f"Invalid start_time_utc or attendee_timezone: {str(e)}"}
+        )
+
+    # Start the booking, then use its round trip to warm the Graph token and render the email
+    booking_task = asyncio.ensure_future(_create_booking_direct(request, direct_input))
+    token_task = None
+    if payload.send_confirmation:
+        token_task = asyncio.ensure_future(request.app.state.outlook_client.token_manager.get_token())
+        token_task.add_done_callback(lambda t: t.cancelled() or t.exception())  # prefetch only; errors surface on send
+        subject = payload.email_subject or f"Your consultation is confirmed - {direct_input.localDate} {direct_input.localTime}"
+        body_html = payload.email_body_html or _confirmation_email_html(direct_input, None)
+
+    try:
+        result: CalComBookingOutput = await booking_task
+    except DeadlineExceeded:
+        raise
+    except (CircuitOpenError, RateLimited) as e:
+        return _upstream_unavailable_response(e)
+    except Exception as e:
+        logger.exception("Unhandled exception during Cal.com direct API call from schedule_and_confirm.")
+        return FastJSONResponse(
+            status_code=500,
+            content={"status": "error", "message": f"Internal server error in Bridge: {str(e)}"}
+        )
+    if not result.success:
+        logger.error("Error processing Cal.com booking via direct API. Message: %s", result.message)
+        return FastJSONResponse(
+            status_code=500,
+            content={"status": "error", "message": result.message, "details": result.error_details}
+        )
+    logger.info("Successfully processed Cal.com booking via direct API. Message: %s", result.message)
+
+    content = {"status": "success", "message": result.message, "details": _booking_details(result), "email": None}
+    if not payload.send_confirmation:
+        return FastJSONResponse(status_code=200, content=content)
+
+    if not payload.email_body_html and result.meet_url:
+        body_html = _confirmation_email_html(direct_input, result.meet_url)
+    email_payload = OutlookEmailWebhookPayload(
+        recipient_email=payload.attendee_email,
+        email_subject=subject,
+        email_body_html=body_html,
+        email_template="confirmation"
+    )
+    if SEND_EMAIL_ASYNC or _prefers_async(request):
+        email_response = await _enqueue_send_email(email_payload, request)
+    else:
+        email_response = await _send_email(email_payload, request)
+    content["email"] = loads(email_response.body)
+    if email_response.status_code < 400:
+        content["message"] = f"{result.message}. Confirmation email to {payload.attendee_email} {'sent' if email_response.status_code == 200 else 'is being sent'}."
+    else:
+        content["message"] = f"{result.message}, but the confirmation email to {payload.attendee_email} could not be sent."
+    return FastJSONResponse(status_code=200, content=content)
+
+@app.post("/webhook/cal/suggest_alternatives")
+async def webhook_suggest_alternatives(payload: CalComAlternativesWebhookPayload, request: Request):
+    """
+    Webhook endpoint returning the free Cal.com slots nearest to a requested time, so the agent
+    can offer alternatives in one call when the requested slot is taken.
+    Served from the slot cache/index; only available in direct mode.
+    """
+    _observe_validation(request)
+    log_payload(logger, payload, "Received Cal.com alternatives webhook")
+
+    if INTEGRATION_MODE in MCP_INTEGRATION_MODES:
+        return FastJSONResponse(
+            status_code=501,
+            content={"status": "error", "message": "Suggesting alternative times requires INTEGRATION_MODE=direct."}
+        )
+
+    try:
+        start_utc = datetime.strptime(payload.start_time_utc, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return FastJSONResponse(
+            status_code=400,
+            content={"status": "error", "message": f"Invalid start_time_utc format: {payload.start_time_utc}. Expected ISO 8601 like YYYY-MM-DDTHH:MM:SSZ."}
+        )
+    try:
+        attendee_tz = pytz.timezone(payload.attendee_timezone)
+    except pytz.UnknownTimeZoneError:
+        return FastJSONResponse(status_code=400, content={"status": "error", "message": f"Unknown attendee_timezone: {payload.attendee_timezone}"})
+
+    cal_com_client = request.app.state.cal_com_client
+    try:
+        # Fetches every searched day in one /slots call; the availability check is then a cache hit
+        suggestions = await cal_com_client.suggest_slots(
+            payload.event_type_id, start_utc, count=payload.count, search_days=payload.search_days
+        )
+        requested_available = await cal_com_client.is_slot_available(payload.event_type_id, start_utc)
+    except DeadlineExceeded:
+        raise
+    except (CircuitOpenError, RateLimited) as e:
+        return _upstream_unavailable_response(e)
+    except Exception as e:
+        check_deadline("Cal.com availability lookup")
+        logger.exception("Unhandled exception while looking up Cal.com alternatives.")
+        return FastJSONResponse(
+            status_code=500,
+            content={"status": "error", "message": f"Could not check availability: {str(e)}"}
+        )
+
+    alternatives = []
+    for slot_utc in suggestions:
+        slot_local = slot_utc.astimezone(attendee_tz)
+        alternatives.append({
+            "start_time_utc": slot_utc.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "local_date": slot_local.strftime("%Y-%m-%d"),
+            "local_time": slot_local.strftime("%H:%M"),
+            "display": slot_local.strftime("%A %d %B at %I:%M %p").replace(" 0", " ")
+        })
+
+    if requested_available:
+        message = "The requested time is available."
+    elif alternatives:
+        message = "The requested time is not available. Nearest available times: " + "; ".join(a["display"] for a in alternatives) + "."
+    else:
+        message = "The requested time is not available and there are no free times nearby. Please ask for a different day."
+    return FastJSONResponse(
+        status_code=200,
+        content={
+            "status": "success",
+            "message": message,
+            "requested_available": requested_available,
+            "alternatives": alternatives
+        }
+    )
+
 @app.post("/webhook/outlook/send_email")
 async def webhook_send_email(payload: OutlookEmailWebhookPayload, request: Request, background_tasks: BackgroundTasks):
     """
     Webhook endpoint to receive Outlook email sending requests from ElevenLabs.
     Routes to either MCP server or direct API based on configuration.
+    Retries of the same email join/replay the original attempt, so it is only sent once.
+    With SEND_EMAIL_ASYNC=true or a `Prefer: respond-async` header the email is queued and
+    the webhook answers 202 with a job id to poll at /jobs/{id}.
     """
-    logger.info(f"Received Outlook email webhook. Payload: {payload.model_dump_json(indent=2)}")
+    if SEND_EMAIL_ASYNC or _prefers_async(request):
+        handler = lambda: _enqueue_send_email(payload, request)
+    else:
+        handler = lambda: _send_email(payload, request)
+    return await _run_idempotent("outlook.send_email", payload, request, handler)
+
+def _unknown_template_response(payload: OutlookEmailWebhookPayload, request: Request) -> Optional[FastJSONResponse]:
+    # Direct mode renders the template itself, so a bad name is rejected before anything is queued or sent
+    if INTEGRATION_MODE in MCP_INTEGRATION_MODES or not payload.email_template:
+        return None
+    template_engine = request.app.state.outlook_client.template_engine
+    if payload.email_template in template_engine:
+        return None
+    return FastJSONResponse(
+        status_code=400,
+        content={"status": "error", "message": str(UnknownEmailTemplate(payload.email_template, template_engine.names))}
+    )
+
+async def _enqueue_send_email(payload: OutlookEmailWebhookPayload, request: Request) -> FastJSONResponse:
+    invalid = _unknown_template_response(payload, request)
+    if invalid is not None:
+        return invalid
+    outbox = request.app.state.outbox
+    if outbox is not None:
+        # Durable path: persisted now, delivered (with retries) by the outbox workers
+        op_id = await outbox.enqueue("outlook.send_email", {
+            "recipientEmail": payload.recipient_email,
+            "emailSubject": payload.email_subject,
+            "emailBodyHtml": payload.email_body_html,
+            "saveToSentItems": payload.save_to_sent_items,
+            "template": payload.email_template
+        })
+        logger.info("Queued email to %s as outbox operation %s", payload.recipient_email, op_id)
+        return _accepted_response(op_id, f"Email to {payload.recipient_email} is being sent.")
+
+    async def send() -> tuple:
+        response = await _send_email(payload, request)
+        return response.status_code < 400, loads(response.body)
+
+    try:
+        job = job_queue.submit("outlook.send_email", send)
+    except QueueFull as e:
+        logger.error(str(e))
+        return FastJSONResponse(
+            status_code=503,
+            headers={"Retry-After": "1"},
+            content={"status": "error", "retryable": True, "message": "The email queue is busy. Please try again in a moment."}
+        )
+    logger.info("Queued email to %s as job %s", payload.recipient_email, job.id)
+    return _accepted_response(job.id, f"Email to {payload.recipient_email} is being sent.")
+
+async def _send_email(payload: OutlookEmailWebhookPayload, request: Request) -> FastJSONResponse:
+    log_payload(logger, payload, "Received Outlook email webhook")
 
     # Route based on integration mode
-    if INTEGRATION_MODE == "mcp":
+    if INTEGRATION_MODE in MCP_INTEGRATION_MODES:
         # MCP approach
         mcp_input = SendOutlookEmailClientInput(
             recipientEmail=payload.recipient_email,
@@ -221,58 +840,98 @@ async def webhook_send_email(payload: OutlookEmailWebhookPayload, request: Reque
         try:
             result: SendOutlookEmailClientOutput = await call_outlook_send_email_tool(mcp_input)
             if result.success:
-                logger.info(f"Successfully processed Outlook email sending via MCP. Message: {result.message}")
-                return JSONResponse(
+                logger.info("Successfully processed Outlook email sending via MCP. Message: %s", result.message)
+                return FastJSONResponse(
                     status_code=200,
                     content={"status": "success", "message": result.message}
                 )
             else:
-                logger.error(f"Error processing Outlook email sending via MCP. Message: {result.message}")
-                return JSONResponse(
+                logger.error("Error processing Outlook email sending via MCP. Message: %s", result.message)
+                return FastJSONResponse(
                     status_code=500,
-                    content={"status": "error", "message": result.message, "details": result.details}
+                    content={"status": "error", "retryable": result.retryable, "message": result.message, "details": result.details}
                 )
+        except DeadlineExceeded:
+            raise
+        except (CircuitOpenError, RateLimited) as e:
+            return _upstream_unavailable_response(e)
         except Exception as e:
             logger.exception("Unhandled exception during Outlook MCP call from webhook.")
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=500,
                 content={"status": "error", "message": f"Internal server error in Bridge: {str(e)}"}
             )
     
     else:
         # Direct API approach
+        invalid = _unknown_template_response(payload, request)
+        if invalid is not None:
+            return invalid
         direct_input = OutlookEmailInput(
             recipientEmail=payload.recipient_email,
             emailSubject=payload.email_subject,
             emailBodyHtml=payload.email_body_html,
-            saveToSentItems=payload.save_to_sent_items
+            saveToSentItems=payload.save_to_sent_items,
+            template=payload.email_template
         )
         
         try:
-            result: OutlookEmailOutput = await outlook_client.send_email(direct_input)
+            outbox = request.app.state.outbox
+            if outbox is not None:
+                result: OutlookEmailOutput = _outbox_output(
+                    await outbox.run("outlook.send_email", direct_input.model_dump(mode="json")), OutlookEmailOutput
+                )
+            else:
+                result: OutlookEmailOutput = await request.app.state.outlook_client.send_email(direct_input)
             if result.success:
-                logger.info(f"Successfully sent email via direct API. Message: {result.message}")
-                return JSONResponse(
+                logger.info("Successfully sent email via direct API. Message: %s", result.message)
+                return FastJSONResponse(
                     status_code=200,
                     content={"status": "success", "message": result.message, "messageId": result.message_id}
                 )
             else:
-                logger.error(f"Error sending email via direct API. Message: {result.message}")
-                return JSONResponse(
+                logger.error("Error sending email via direct API. Message: %s", result.message)
+                return FastJSONResponse(
                     status_code=500,
                     content={"status": "error", "message": result.message, "details": result.error_details}
                 )
+        except DeadlineExceeded:
+            raise
+        except (CircuitOpenError, RateLimited) as e:
+            return _upstream_unavailable_response(e)
         except Exception as e:
             logger.exception("Unhandled exception during Outlook direct API call from webhook.")
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=500,
                 content={"status": "error", "message": f"Internal server error in Bridge: {str(e)}"}
             )
 
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, request: Request):
+    """Status and outcome of a background job or outbox operation (e.g. an async send_email)."""
+    job = job_queue.get(job_id)
+    outbox = request.app.state.outbox
+    if job is None and outbox is not None:
+        record = await outbox.get(job_id)
+        if record is not None:
+            return {
+                "id": record["id"],
+                "kind": record["kind"],
+                "status": record["status"],
+                "attempts": record["attempts"],
+                "created_at": datetime.fromtimestamp(record["created_at"], tz=timezone.utc).isoformat(),
+                "updated_at": datetime.fromtimestamp(record["updated_at"], tz=timezone.utc).isoformat(),
+                "result": record["result"],
+                "error": record["last_error"]
+            }
+    if job is None:
+        return FastJSONResponse(status_code=404, content={"status": "error", "message": f"Unknown or expired job id: {job_id}"})
+    return job.to_dict()
+
 @app.get("/")
 async def root_info():
     mode_info = f" (Mode: {INTEGRATION_MODE})"
-    return {"message": f"Bridge Server is running{mode_info}. Webhook endpoints at /webhook/cal/schedule_consultation and /webhook/outlook/send_email"}
+    return {"message": f"Bridge Server is running{mode_info}. Webhook endpoints at /webhook/cal/schedule_consultation, /webhook/cal/schedule_and_confirm, /webhook/cal/suggest_alternatives and /webhook/outlook/send_email"}
 
 @app.get("/health")
 async def health_check():
@@ -280,9 +939,28 @@ async def health_check():
     return {
         "status": "healthy",
         "integration_mode": INTEGRATION_MODE,
+        # Per-upstream breaker state, failure rate and latency over the rolling window
+        "circuits": breaker_stats(),
+        "timeouts": adaptive_timeouts.stats(),
+        "rate_limits": limiter_stats(),
+        # Per webhook route: concurrency limit, requests handled / waiting, recent handling time
+        "admission": admission_stats(),
         "timestamp": datetime.now(timezone.utc).isoformat()
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: 200 once the startup warm-up has opened the upstream connections, 503 until then."""
+    return FastJSONResponse(
+        status_code=200 if readiness.ready else 503,
+        content={"status": "ready" if readiness.ready else "warming_up", "integration_mode": INTEGRATION_MODE, **readiness.to_dict()}
+    )
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: per-stage latency histograms, outcome and retry counters, pool usage."""
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/ping")
 async def ping():
     """Keep-alive endpoint to prevent Render cold starts"""
@@ -293,7 +971,8 @@ async def ping():
     }
 
 # To run this Bridge Server:
-# 1. Set INTEGRATION_MODE in .env to either "mcp" or "direct"
+# 1. Set INTEGRATION_MODE in .env to "mcp", "mcp-inproc" or "direct"
 # 2. For MCP mode: Ensure MCP servers are running and URLs are set
+#    For mcp-inproc mode: the cal_com_mcp_server/ and outlook_mcp_server/ directories must sit next to bridge_server/
 # 3. For Direct mode: Ensure API credentials are set in .env
 # 4. From the project root: uvicorn bridge_server.main:app --port 8000 --reload
\ No newline at end of file
@@ -2,13 +2,15 @@ import asyncio
 import json
 import logging
 from typing import Dict, Any, Optional
-from datetime import timedelta
 
 from mcp import types
-from mcp.client.session import ClientSession
-from mcp.client.streamable_http import streamablehttp_client
 
 from core.config import CAL_COM_MCP_SERVER_URL
+from core.circuit_breaker import CircuitOpenError, get_breaker
+from core.deadline import DeadlineExceeded
+from core.json_codec import loads
+from core.logging_setup import log_payload
+from mcp_clients.session_pool import ToolCallInterrupted, mcp_session_pool
 # We'll need to define the input/output Pydantic models that the Cal.com MCP tool expects/returns.
 # For now, let's assume they are similar to what we might pass or get.
 # These should ideally mirror or be compatible with cal_com_mcp_server.schemas.cal_com_schemas
@@ -16,6 +18,9 @@ from pydantic import BaseModel, EmailStr, Field # Assuming similar structure
 
 logger = logging.getLogger(__name__)
 
+# Fails tool calls fast while the MCP server is down (or a Render service is still waking up)
+_BREAKER = get_breaker("cal_com_mcp")
+
 # --- Placeholder Pydantic Models (mirroring Cal.com MCP server's schemas) ---
 # These should ideally be shared or imported if possible, or defined to be compatible.
 # This model should match the fields of cal_com_mcp_server.schemas.cal_com_schemas.CreateCalComBookingInput
@@ -46,6 +51,8 @@ class CreateCalComBookingClientOutput(BaseModel):
     message: str
     booking_details: Optional[BookingOutputDetailsClient] = None
     error_details: Optional[str] = None
+    # The call may have gone through but its answer was lost: safe to retry only after checking
+    retryable: bool = False
 # --- End Placeholder Pydantic Models ---
 
 
@@ -68,56 +75,56 @@ async def call_cal_com_create_booking_tool(
     # when its Pydantic model argument is named 'args'.
     tool_args_wrapped = {"args": tool_payload_dict}
 
-    logger.info(f"Calling Cal.com MCP tool '{tool_name}' at {CAL_COM_MCP_SERVER_URL} with wrapped args: {tool_args_wrapped}")
+    log_payload(logger, tool_args_wrapped, "Calling Cal.com MCP tool '%s' at %s", tool_name, CAL_COM_MCP_SERVER_URL)
 
     try:
-        # Use longer timeout for cold starts on Render free tier
-        async with streamablehttp_client(
-            url=CAL_COM_MCP_SERVER_URL,
-            timeout=timedelta(seconds=60)  # 60 second timeout for cold starts
-        ) as (
-            read_stream,
-            write_stream,
-            _,
-        ):
-            async with ClientSession(read_stream, write_stream) as session:
-                await session.initialize()
-                logger.debug("MCP Client session initialized with Cal.com MCP Server.")
-
-                call_result: types.CallToolResult = await session.call_tool(
-                    name=tool_name,
-                    arguments=tool_args_wrapped # Send the wrapped arguments
-                )
-                logger.debug(f"Raw CallToolResult from Cal.com MCP: {call_result}")
-
-                if call_result.isError:
-                    error_message = "Unknown error from Cal.com MCP tool."
-                    if call_result.content:
-                        # Assuming error message is in the first TextContent item
-                        error_item = call_result.content[0]
-                        if isinstance(error_item, types.TextContent):
-                            error_message = error_item.text
-                    logger.error(f"Error from Cal.com MCP tool '{tool_name}': {error_message}")
-                    return CreateCalComBookingClientOutput(success=False, message=error_message)
-
-                if not call_result.content:
-                    logger.error(f"No content received from Cal.com MCP tool '{tool_name}'.")
-                    return CreateCalComBookingClientOutput(success=False, message="No content received from Cal.com MCP tool.")
-
-                # Assuming the tool returns a single JSON string in TextContent
-                response_item = call_result.content[0]
-                if isinstance(response_item, types.TextContent):
-                    response_data = json.loads(response_item.text)
-                    logger.info(f"Successfully called Cal.com MCP tool '{tool_name}'. Response: {response_data}")
-                    # Validate and parse with the Pydantic output model
-                    return CreateCalComBookingClientOutput(**response_data)
-                else:
-                    logger.error(f"Unexpected content type from Cal.com MCP tool: {type(response_item)}")
-                    return CreateCalComBookingClientOutput(success=False, message="Unexpected response format from Cal.com MCP tool.")
+        # Reuse an initialized session from the pool - one tools/call round trip per webhook.
+        # Only transport failures and timeouts trip the breaker; a tool error is still an answer
+        with _BREAKER.guard():
+            call_result: types.CallToolResult = await mcp_session_pool.call_tool(
+                url=CAL_COM_MCP_SERVER_URL,
+                name=tool_name,
+                arguments=tool_args_wrapped # Send the wrapped arguments
+            )
+        logger.debug("Raw CallToolResult from Cal.com MCP: %s", call_result)
+
+        if call_result.isError:
+            error_message = "Unknown error from Cal.com MCP tool."
+            if call_result.content:
+                # Assuming error message is in the first TextContent item
+                error_item = call_result.content[0]
+                if isinstance(error_item, types.TextContent):
+                    error_message = error_item.text
+            logger.error(f"Error from Cal.com MCP tool '{tool_name}': {error_message}")
+            return CreateCalComBookingClientOutput(success=False, message=error_message)
+
+        if not call_result.content:
+            logger.error(f"No content received from Cal.com MCP tool '{tool_name}'.")
+            return CreateCalComBookingClientOutput(success=False, message="No content received from Cal.com MCP tool.")
+
+        # Assuming the tool returns a single JSON string in TextContent
+        response_item = call_result.content[0]
+        if isinstance(response_item, types.TextContent):
+            response_data = loads(response_item.text)
+            log_payload(logger, response_data, "Successfully called Cal.com MCP tool '%s'", tool_name)
+            # Validate and parse with the Pydantic output model
+            return CreateCalComBookingClientOutput(**response_data)
+        else:
+            logger.error(f"Unexpected content type from Cal.com MCP tool: {type(response_item)}")
+            return CreateCalComBookingClientOutput(success=False, message="Unexpected response format from Cal.com MCP tool.")
 
     except json.JSONDecodeError as e:
         logger.exception(f"JSON decoding error for Cal.com MCP tool response: {e}")
         return CreateCalComBookingClientOutput(success=False, message=f"Invalid JSON response from Cal.com MCP tool: {e}")
+    except (DeadlineExceeded, CircuitOpenError):
+        raise
+    except ToolCallInterrupted as e:
+        logger.error("Cal.com MCP tool call '%s' interrupted: %s", tool_name, e)
+        return CreateCalComBookingClientOutput(
+            success=False,
+            message=f"Connection to the Cal.com MCP server was lost mid-request: {e}",
+            retryable=True
+        )
     except ConnectionRefusedError:
         logger.error(f"Connection refused by Cal.com MCP server at {CAL_COM_MCP_SERVER_URL}.")
         return CreateCalComBookingClientOutput(success=False, message="Connection refused by Cal.com MCP server.")
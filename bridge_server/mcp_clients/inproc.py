@@ -0,0 +1,54 @@
+"""
+In-process MCP servers - hosts the Cal.com and Outlook FastMCP instances inside the bridge
+and connects to them through an in-memory stream pair instead of streamable HTTP.
+"""
+import importlib
+import logging
+import sys
+from pathlib import Path
+from typing import Dict
+
+from mcp.server.fastmcp import FastMCP
+
+logger = logging.getLogger(__name__)
+
+INPROC_SCHEME = "inproc://"
+
+# inproc:// URL -> (module path, FastMCP instance attribute)
+INPROC_SERVERS = {
+    f"{INPROC_SCHEME}cal_com": ("cal_com_mcp_server.tools.cal_com_tools", "cal_com_mcp_instance"),
+    f"{INPROC_SCHEME}outlook": ("outlook_mcp_server.tools.outlook_tools", "outlook_mcp_instance"),
+}
+
+# Project root, so the MCP server directories import as packages alongside the bridge
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+_loaded: Dict[str, FastMCP] = {}
+
+
+def is_inproc_url(url: str) -> bool:
+    return bool(url) and url.startswith(INPROC_SCHEME)
+
+
+def get_inproc_server(url: str) -> FastMCP:
+    """Return the FastMCP instance for an inproc:// URL, importing it on first use."""
+    server = _loaded.get(url)
+    if server is not None:
+        return server
+    if url not in INPROC_SERVERS:
+        raise ValueError(f"Unknown in-process MCP server: {url}")
+
+    if str(PROJECT_ROOT) not in sys.path:
+        sys.path.append(str(PROJECT_ROOT))
+    module_path, attribute = INPROC_SERVERS[url]
+    module = importlib.import_module(module_path)
+    server = getattr(module, attribute)
+    _loaded[url] = server
+    logger.info(f"Loaded in-process MCP server {url} from {module_path}")
+    return server
+
+
+def load_inproc_servers() -> None:
+    """Import every in-process MCP server up front so the first tool call doesn't pay for it."""
+    for url in INPROC_SERVERS:
+        get_inproc_server(url)
@@ -2,18 +2,23 @@ import asyncio
 import json
 import logging
 from typing import Dict, Any, Optional
-from datetime import timedelta
 
 from mcp import types
-from mcp.client.session import ClientSession
-from mcp.client.streamable_http import streamablehttp_client
 
 from core.config import OUTLOOK_MCP_SERVER_URL
+from core.circuit_breaker import CircuitOpenError, get_breaker
+from core.deadline import DeadlineExceeded
+from core.json_codec import loads
+from core.logging_setup import log_payload
+from mcp_clients.session_pool import ToolCallInterrupted, mcp_session_pool
 # Assuming similar Pydantic models as defined in outlook_mcp_server.schemas.outlook_schemas
 from pydantic import BaseModel, EmailStr, Field # Assuming similar structure
 
 logger = logging.getLogger(__name__)
 
+# Fails tool calls fast while the MCP server is down (or a Render service is still waking up)
+_BREAKER = get_breaker("outlook_mcp")
+
 # --- Placeholder Pydantic Models (mirroring Outlook MCP server's schemas) ---
 # These should ideally be shared or imported if possible, or defined to be compatible.
 
@@ -27,6 +32,8 @@ class SendOutlookEmailClientOutput(BaseModel):
     success: bool
     message: str
     details: Optional[str] = None
+    # The call may have gone through but its answer was lost: safe to retry only after checking
+    retryable: bool = False
 # --- End Placeholder Pydantic Models ---
 
 
@@ -51,58 +58,58 @@ async def call_outlook_send_email_tool(
     # when its Pydantic model argument is named 'args'.
     tool_args_wrapped = {"args": tool_args_dict}
 
-    logger.info(f"Calling Outlook MCP tool '{tool_name}' at {OUTLOOK_MCP_SERVER_URL} with wrapped args: {tool_args_wrapped}")
+    log_payload(logger, tool_args_wrapped, "Calling Outlook MCP tool '%s' at %s", tool_name, OUTLOOK_MCP_SERVER_URL)
 
     try:
-        # Use longer timeout for cold starts on Render free tier
-        async with streamablehttp_client(
-            url=OUTLOOK_MCP_SERVER_URL,
-            timeout=timedelta(seconds=60)  # 60 second timeout for cold starts
-        ) as (
-            read_stream,
-            write_stream,
-            _,
-        ):
-            async with ClientSession(read_stream, write_stream) as session:
-                await session.initialize()
-                logger.debug("MCP Client session initialized with Outlook MCP Server.")
-
-                call_result: types.CallToolResult = await session.call_tool(
-                    name=tool_name,
-                    arguments=tool_args_wrapped # Send the wrapped arguments
-                )
-                logger.debug(f"Raw CallToolResult from Outlook MCP: {call_result}")
-
-                if call_result.isError:
-                    error_message = "Unknown error from Outlook MCP tool."
-                    if call_result.content:
-                        error_item = call_result.content[0]
-                        if isinstance(error_item, types.TextContent):
-                            # Attempt to parse as JSON if it's a structured error
-                            try:
-                                error_data = json.loads(error_item.text)
-                                error_message = error_data.get("message", error_item.text)
-                            except json.JSONDecodeError:
-                                error_message = error_item.text
-                    logger.error(f"Error from Outlook MCP tool '{tool_name}': {error_message}")
-                    return SendOutlookEmailClientOutput(success=False, message=error_message)
-
-                if not call_result.content:
-                    logger.error(f"No content received from Outlook MCP tool '{tool_name}'.")
-                    return SendOutlookEmailClientOutput(success=False, message="No content received from Outlook MCP tool.")
-
-                response_item = call_result.content[0]
-                if isinstance(response_item, types.TextContent):
-                    response_data = json.loads(response_item.text)
-                    logger.info(f"Successfully called Outlook MCP tool '{tool_name}'. Response: {response_data}")
-                    return SendOutlookEmailClientOutput(**response_data)
-                else:
-                    logger.error(f"Unexpected content type from Outlook MCP tool: {type(response_item)}")
-                    return SendOutlookEmailClientOutput(success=False, message="Unexpected response format from Outlook MCP tool.")
+        # Reuse an initialized session from the pool - one tools/call round trip per webhook.
+        # Only transport failures and timeouts trip the breaker; a tool error is still an answer
+        with _BREAKER.guard():
+            call_result: types.CallToolResult = await mcp_session_pool.call_tool(
+                url=OUTLOOK_MCP_SERVER_URL,
+                name=tool_name,
+                arguments=tool_args_wrapped # Send the wrapped arguments
+            )
+        logger.debug("Raw CallToolResult from Outlook MCP: %s", call_result)
+
+        if call_result.isError:
+            error_message = "Unknown error from Outlook MCP tool."
+            if call_result.content:
+                error_item = call_result.content[0]
+                if isinstance(error_item, types.TextContent):
+                    # Attempt to parse as JSON if it's a structured error
+                    try:
+                        error_data = loads(error_item.text)
+                        error_message = error_data.get("message", error_item.text)
+                    except json.JSONDecodeError:
+                        error_message = error_item.text
+            logger.error(f"Error from Outlook MCP tool '{tool_name}': {error_message}")
+            return SendOutlookEmailClientOutput(success=False, message=error_message)
+
+        if not call_result.content:
+            logger.error(f"No content received from Outlook MCP tool '{tool_name}'.")
+            return SendOutlookEmailClientOutput(success=False, message="No content received from Outlook MCP tool.")
+
+        response_item = call_result.content[0]
+        if isinstance(response_item, types.TextContent):
+            response_data = loads(response_item.text)
+            log_payload(logger, response_data, "Successfully called Outlook MCP tool '%s'", tool_name)
+            return SendOutlookEmailClientOutput(**response_data)
+        else:
+            logger.error(f"Unexpected content type from Outlook MCP tool: {type(response_item)}")
+            return SendOutlookEmailClientOutput(success=False, message="Unexpected response format from Outlook MCP tool.")
 
     except json.JSONDecodeError as e:
         logger.exception(f"JSON decoding error for Outlook MCP tool response: {e}")
         return SendOutlookEmailClientOutput(success=False, message=f"Invalid JSON response from Outlook MCP tool: {e}")
+    except (DeadlineExceeded, CircuitOpenError):
+        raise
+    except ToolCallInterrupted as e:
+        logger.error("Outlook MCP tool call '%s' interrupted: %s", tool_name, e)
+        return SendOutlookEmailClientOutput(
+            success=False,
+            message=f"Connection to the Outlook MCP server was lost mid-request: {e}",
+            retryable=True
+        )
     except ConnectionRefusedError:
         logger.error(f"Connection refused by Outlook MCP server at {OUTLOOK_MCP_SERVER_URL}.")
         return SendOutlookEmailClientOutput(success=False, message="Connection refused by Outlook MCP server.")
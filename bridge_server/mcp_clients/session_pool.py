@@ -0,0 +1,321 @@
+"""
+Persistent MCP session pool - keeps initialized ClientSessions open per MCP server URL
+so a tool call costs a single tools/call round trip instead of a full handshake.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import anyio
+import httpx
+from mcp import types
+from mcp.client.session import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.shared.exceptions import McpError
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from core.adaptive_timeout import adaptive_timeouts
+from core.config import (
+    MCP_SESSION_POOL_SIZE, MCP_SESSION_TIMEOUT_SECONDS, MCP_SESSION_HEALTHCHECK_SECONDS
+)
+from core.deadline import DeadlineExceeded, current_deadline
+from core.metrics import OUTCOMES, RETRIES, STAGE_SECONDS
+from mcp_clients.inproc import is_inproc_url, get_inproc_server
+
+logger = logging.getLogger(__name__)
+
+
+class SessionRejected(ConnectionError):
+    """The server turned the pooled session away (e.g. it restarted and no longer knows its ID)."""
+
+
+# Errors that mean the request was never handled: the pooled connection was dead before it left,
+# or the server refused the session outright. One retry on a fresh session is safe (as it is for
+# a session the server reports terminated).
+_NOT_SENT_ERRORS = (
+    SessionRejected,
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    httpx.ConnectError,
+)
+# Errors that mean the connection died while the request may already have been delivered
+_CONNECTION_ERRORS = (
+    httpx.TransportError,
+    anyio.EndOfStream,
+    ConnectionError,
+    *_NOT_SENT_ERRORS,
+)
+
+
+class ToolCallInterrupted(ConnectionError):
+    """The tool call was sent but its answer never came (connection lost or timed out), so the
+    tool may or may not have run.
+
+    Not retried automatically - a booking or an email could go out twice.
+    """
+
+    def __init__(self, url: str, name: str, cause: BaseException):
+        super().__init__(f"MCP tool {name} on {url} was interrupted ({cause!r}); it may have completed")
+        self.url = url
+        self.name = name
+
+
+def _rejected_by_server(error: Optional[BaseException]) -> bool:
+    """Whether a session ended because the server answered 4xx - it refused the request unread."""
+    # Task-group failures arrive wrapped in an exception group
+    if isinstance(getattr(error, "exceptions", None), (list, tuple)):
+        return any(_rejected_by_server(e) for e in error.exceptions)
+    return isinstance(error, httpx.HTTPStatusError) and 400 <= error.response.status_code < 500
+
+
+_SESSION_INIT = STAGE_SECONDS.labels("mcp_session_init")
+_CALL_TOOL = STAGE_SECONDS.labels("mcp_call_tool")
+_CALL_TOOL_OK = OUTCOMES.labels("mcp_call_tool", "success")
+_CALL_TOOL_FAILED = OUTCOMES.labels("mcp_call_tool", "error")
+_STALE_SESSION_RETRIES = RETRIES.labels("mcp_session_reconnect")
+
+
+@asynccontextmanager
+async def open_mcp_session(url: str, timeout: timedelta) -> AsyncIterator[ClientSession]:
+    """Open and initialize a ClientSession over streamable HTTP, or in memory for inproc:// URLs."""
+    if is_inproc_url(url):
+        server = get_inproc_server(url)
+        async with create_connected_server_and_client_session(
+            server._mcp_server, read_timeout_seconds=timeout
+        ) as session:
+            yield session
+        return
+
+    async with streamablehttp_client(url=url, timeout=timeout) as (
+        read_stream,
+        write_stream,
+        _,
+    ):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            yield session
+
+
+class _PooledSession:
+    """One initialized ClientSession kept alive by a dedicated background task.
+
+    Both transports use anyio task groups, which must be entered and exited
+    from the same task, so the session lives inside its own task until it is closed.
+    """
+
+    def __init__(self, url: str, timeout: timedelta):
+        self.url = url
+        self.timeout = timeout
+        self.session: Optional[ClientSession] = None
+        self.in_flight = 0
+        self.last_used = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._error: Optional[BaseException] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_alive(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def _run(self) -> None:
+        try:
+            async with open_mcp_session(self.url, self.timeout) as session:
+                self.session = session
+                self.last_used = time.monotonic()
+                logger.info(f"MCP session initialized with {self.url}")
+                self._ready.set()
+                await self._closing.wait()
+        except BaseException as e:
+            self._error = e
+            if not isinstance(e, asyncio.CancelledError):
+                logger.warning(f"MCP session to {self.url} ended: {e!r}")
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def ensure_connected(self) -> ClientSession:
+        """Return a live session, (re)connecting and health-checking as needed."""
+        async with self._lock:
+            if self.is_alive and time.monotonic() - self.last_used > MCP_SESSION_HEALTHCHECK_SECONDS:
+                try:
+                    with anyio.fail_after(MCP_SESSION_TIMEOUT_SECONDS):
+                        await self.session.send_ping()
+                    self.last_used = time.monotonic()
+                except Exception as e:
+                    logger.info(f"Idle MCP session to {self.url} failed health check ({e!r}), reconnecting")
+                    await self._shutdown()
+
+            if not self.is_alive:
+                await self._shutdown()
+                self._ready = asyncio.Event()
+                self._closing = asyncio.Event()
+                self._error = None
+                with _SESSION_INIT.time():
+                    self._task = asyncio.create_task(self._run())
+                    await self._ready.wait()
+                if self.session is None:
+                    raise ConnectionError(f"Could not initialize MCP session with {self.url}: {self._error!r}")
+            return self.session
+
+    async def _shutdown(self) -> None:
+        if self._task is None:
+            return
+        self._closing.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=5)
+        except (asyncio.TimeoutError, Exception):
+            self._task.cancel()
+        self._task = None
+        self.session = None
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._shutdown()
+
+    async def call_tool(self, session: ClientSession, name: str, arguments: Optional[Dict[str, Any]]) -> types.CallToolResult:
+        """Run a tool call, failing fast if the underlying transport dies while it is in flight."""
+        lifetime = self._task
+        call = asyncio.ensure_future(session.call_tool(name=name, arguments=arguments))
+        try:
+            await asyncio.wait({call, lifetime}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+        if call.done():
+            return call.result()
+        call.cancel()
+        if _rejected_by_server(self._error):
+            raise SessionRejected(f"MCP server at {self.url} rejected the session: {self._error!r}")
+        raise ConnectionError(f"MCP session to {self.url} closed while a request was in flight")
+
+    def discard(self) -> None:
+        """Mark the session dead so the next caller reconnects."""
+        self.session = None
+        self._closing.set()
+
+
+class McpSessionPool:
+    """Pool of initialized MCP sessions keyed by server URL.
+
+    ClientSession multiplexes concurrent requests over one transport, so concurrent
+    webhook handlers share sessions; each call goes to the least busy one.
+    """
+
+    def __init__(
+        self,
+        size: int = MCP_SESSION_POOL_SIZE,
+        timeout: timedelta = timedelta(seconds=MCP_SESSION_TIMEOUT_SECONDS)
+    ):
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._pools: Dict[str, List[_PooledSession]] = {}
+
+    def _slots(self, url: str) -> List[_PooledSession]:
+        slots = self._pools.get(url)
+        if slots is None:
+            slots = [_PooledSession(url, self.timeout) for _ in range(self.size)]
+            self._pools[url] = slots
+        return slots
+
+    def _pick(self, url: str) -> _PooledSession:
+        # Least busy session first; on a tie prefer one that is already connected
+        return min(self._slots(url), key=lambda s: (s.in_flight, not s.is_alive))
+
+    async def call_tool(
+        self,
+        url: str,
+        name: str,
+        arguments: Optional[Dict[str, Any]] = None,
+        idempotent: bool = False
+    ) -> types.CallToolResult:
+        """Call a tool on a pooled session, reconnecting once if the session has gone stale.
+
+        Inside a webhook request the whole call (including any reconnect) is bounded by the
+        time left in the request's deadline budget. Only an `idempotent` (read-only) tool gets an
+        adaptive timeout; others wait up to the session read timeout, since giving up early on a
+        write doesn't stop it from going through.
+        """
+        deadline = current_deadline()
+        if deadline is None:
+            return await self._call_tool(url, name, arguments, idempotent)
+        operation = f"MCP tool {name}"
+        try:
+            timeout = deadline.check(operation)
+            return await asyncio.wait_for(self._call_tool(url, name, arguments, idempotent), timeout)
+        except asyncio.TimeoutError:
+            if not deadline.expired:
+                raise
+            raise DeadlineExceeded(operation)
+
+    async def _call_tool(
+        self,
+        url: str,
+        name: str,
+        arguments: Optional[Dict[str, Any]],
+        idempotent: bool
+    ) -> types.CallToolResult:
+        slot = self._pick(url)
+        reused = slot.is_alive
+        slot.in_flight += 1
+        try:
+            for attempt in range(2):
+                session = await slot.ensure_connected()
+                timeout = self.timeout.total_seconds()
+                if idempotent:
+                    # Multiple of this tool's recent p99 on this server, at most the session read timeout
+                    timeout = adaptive_timeouts.timeout(url, name, timeout)
+                try:
+                    with _CALL_TOOL.time(), adaptive_timeouts.measure(url, name):
+                        try:
+                            result = await asyncio.wait_for(slot.call_tool(session, name, arguments), timeout)
+                        except asyncio.TimeoutError:
+                            _CALL_TOOL_FAILED.inc()
+                            raise ToolCallInterrupted(url, name, asyncio.TimeoutError(f"no answer within {timeout:.1f}s"))
+                    slot.last_used = time.monotonic()
+                    _CALL_TOOL_OK.inc()
+                    return result
+                except ToolCallInterrupted:
+                    raise
+                except (McpError, *_CONNECTION_ERRORS) as e:
+                    stale = isinstance(e, _NOT_SENT_ERRORS) or (isinstance(e, McpError) and "session terminated" in str(e).lower())
+                    if not (stale and reused and attempt == 0):
+                        _CALL_TOOL_FAILED.inc()
+                        if isinstance(e, _CONNECTION_ERRORS) and not isinstance(e, _NOT_SENT_ERRORS):
+                            raise ToolCallInterrupted(url, name, e) from e
+                        raise
+                    logger.info(f"Pooled MCP session to {url} went stale ({e!r}), reconnecting and retrying")
+                    _STALE_SESSION_RETRIES.inc()
+                    slot.discard()
+                    reused = False
+            raise ConnectionError(f"MCP session to {url} unavailable")
+        finally:
+            slot.in_flight -= 1
+
+    async def warm(self, url: str) -> None:
+        """Open one session for a URL ahead of the first tool call."""
+        await self._pick(url).ensure_connected()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            url: {
+                "size": len(slots),
+                "alive": sum(1 for s in slots if s.is_alive),
+                "in_flight": sum(s.in_flight for s in slots),
+            }
+            for url, slots in self._pools.items()
+        }
+
+    async def close_all(self) -> None:
+        for slots in self._pools.values():
+            for slot in slots:
+                await slot.close()
+        self._pools.clear()
+
+
+# Process-wide pool shared by the MCP client helpers
+mcp_session_pool = McpSessionPool()
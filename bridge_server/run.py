@@ -5,6 +5,7 @@ Handles import path issues
 """
 import sys
 import os
+import time
 
 # Ensure the bridge_server directory is in the Python path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -14,18 +15,22 @@ parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, current_dir)
 sys.path.insert(0, parent_dir)
 
-# Debug MCP installation
-print("Checking MCP installation...")
-try:
-    import mcp
-    print(f"✓ MCP module found at: {mcp.__file__}")
-except ImportError as e:
-    print(f"✗ MCP module not found: {e}")
-    print("Installed packages:")
-    import pkg_resources
-    for pkg in pkg_resources.working_set:
-        if 'mcp' in pkg.key.lower():
-            print(f"  - {pkg.key}: {pkg.version}")
+
+def report_mcp_installation():
+    """Debug MCP installation - only called when the app fails to import, so a healthy
+    start (and direct mode, which never uses mcp) doesn't pay for importing it."""
+    print("Checking MCP installation...")
+    try:
+        import mcp
+        print(f"✓ MCP module found at: {mcp.__file__}")
+    except ImportError as e:
+        print(f"✗ MCP module not found: {e}")
+        print("Installed packages:")
+        from importlib.metadata import distributions
+        for dist in distributions():
+            name = dist.metadata["Name"] or ""
+            if 'mcp' in name.lower():
+                print(f"  - {name}: {dist.version}")
 
 # Now we can import our app
 if __name__ == "__main__":
@@ -34,7 +39,9 @@ if __name__ == "__main__":
     
     try:
         # Import the FastAPI app
+        import_started = time.perf_counter()
         from main import app
+        print(f"Imported app in {(time.perf_counter() - import_started) * 1000:.0f}ms")
         
         # Get port from environment
         port = int(os.environ.get("PORT", 8000))
@@ -44,9 +51,12 @@ if __name__ == "__main__":
         print(f"Python path: {sys.path}")
         print(f"Current directory: {current_dir}")
         
-        uvicorn.run(app, host="0.0.0.0", port=port)
+        # log_config=None: keep the app's queued JSON logging instead of uvicorn's console handlers
+        # ws="none": the bridge has no websocket routes, so don't import a websockets protocol at startup
+        uvicorn.run(app, host="0.0.0.0", port=port, log_config=None, ws="none")
     except ImportError as e:
         print(f"Failed to import app: {e}")
+        report_mcp_installation()
         print("Creating fallback app...")
         
         # Create a minimal fallback app
@@ -18,6 +18,27 @@ class CalComWebhookPayload(BaseModel):
     # additional_notes: Optional[str] = Field(None, description="Any additional notes from the user.") # This was not in the curl
 
 
+class ScheduleAndConfirmWebhookPayload(CalComWebhookPayload):
+    """
+    Expected payload from ElevenLabs webhook to book a consultation and email the
+    confirmation in a single tool call.
+    """
+    send_confirmation: Optional[bool] = Field(True, description="Whether to email the attendee a confirmation once the booking succeeds.")
+    email_subject: Optional[str] = Field(None, description="Subject of the confirmation email. A standard subject is used if not provided.")
+    email_body_html: Optional[str] = Field(None, description="HTML body of the confirmation email. A standard confirmation is used if not provided.")
+
+class CalComAlternativesWebhookPayload(BaseModel):
+    """
+    Expected payload from ElevenLabs webhook when the requested time is taken and the
+    agent needs the nearest free slots to offer instead.
+    """
+    event_type_id: int = Field(..., description="Cal.com event type ID.")
+    start_time_utc: str = Field(..., description="Requested start date and time in UTC (ISO 8601 format, e.g., YYYY-MM-DDTHH:MM:SSZ).")
+    attendee_timezone: Optional[str] = Field("America/New_York", description="Timezone of the attendee, used to phrase the suggestions. Defaults to America/New_York if not provided.")
+    count: int = Field(3, ge=1, le=10, description="How many alternative slots to suggest. Defaults to 3.")
+    search_days: int = Field(1, ge=0, le=7, description="How many days either side of the requested day to search. Defaults to 1.")
+
+
 class OutlookEmailWebhookPayload(BaseModel):
     """
     Expected payload from ElevenLabs webhook for sending an Outlook email.
@@ -27,5 +48,6 @@ class OutlookEmailWebhookPayload(BaseModel):
     email_subject: str = Field(..., description="Subject of the email.")
     email_body_html: str = Field(..., description="HTML content of the email body.")
     save_to_sent_items: Optional[bool] = Field(True, description="Whether to save the email in the sender's Sent Items folder.")
+    email_template: Optional[str] = Field(None, description="Named email template wrapping the body: default, confirmation, follow_up or reminder. Defaults to the standard layout (direct mode).")
     # We might receive other dynamic parameters from ElevenLabs
     metadata: Optional[Dict[str, Any]] = Field(None, description="Additional dynamic parameters from ElevenLabs.")
\ No newline at end of file
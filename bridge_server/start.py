@@ -14,4 +14,6 @@ from main import app
 if __name__ == "__main__":
     import uvicorn
     port = int(os.environ.get("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
+    # log_config=None: keep the app's queued JSON logging instead of uvicorn's console handlers
+    # ws="none": the bridge has no websocket routes, so don't import a websockets protocol at startup
+    uvicorn.run(app, host="0.0.0.0", port=port, log_config=None, ws="none")
\ No newline at end of file
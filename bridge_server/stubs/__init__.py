@@ -0,0 +1 @@
+# Local stand-ins for the upstream APIs (Cal.com, Azure AD, Microsoft Graph), for offline benchmarks.
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for the upstream APIs, so load tests and benchmarks run without network access.
+
+One ASGI app serves the endpoints the bridge and MCP servers call:
+  - Cal.com v2       GET /v2/slots, POST /v2/bookings
+  - Azure AD         POST /{tenant}/oauth2/v2.0/token
+  - Microsoft Graph  POST /v1.0/users/{upn}/sendMail, POST /v1.0/$batch
+
+Each endpoint has a latency distribution, an error rate and a throttle rate (random 429s),
+and each upstream host can be rate limited (a token bucket; 429 with Retry-After and
+X-RateLimit-* headers once it is empty). Point the services at it with UPSTREAM_STUB_URL:
+
+    python bridge_server/stubs/upstreams.py --port 9100 --latency lognormal:80,0.5 --error-rate 0.01
+    UPSTREAM_STUB_URL=http://127.0.0.1:9100 python bridge_server/run.py
+
+Latency specs are in milliseconds: "50" (fixed), "uniform:20,80", "normal:50,10",
+"lognormal:50,0.5" (median, sigma) or "exponential:50" (mean).
+
+Defaults come from STUB_* environment variables (see StubConfig.from_env) and can be changed
+while the stub runs: GET/PATCH /_stub/config, GET /_stub/stats, POST /_stub/reset.
+"""
+import argparse
+import asyncio
+import itertools
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+# Endpoint name -> the upstream host it belongs to (rate limits are per host)
+ENDPOINTS = {
+    "cal_com_slots": "cal_com",
+    "cal_com_bookings": "cal_com",
+    "token": "login",
+    "send_mail": "graph",
+    "batch": "graph",
+}
+UPSTREAMS = ("cal_com", "login", "graph")
+
+SLOT_INTERVAL_MINUTES = 30
+
+
+class Latency:
+    """A latency distribution parsed from a spec like "lognormal:80,0.5" (milliseconds)."""
+
+    KINDS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+    def __init__(self, spec: str):
+        kind, _, params = str(spec).partition(":")
+        if not params and kind not in self.KINDS:
+            kind, params = "fixed", kind
+        try:
+            values = [float(v) for v in params.split(",") if v.strip()]
+        except ValueError:
+            raise ValueError(f"Invalid latency spec '{spec}'")
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exponential": 1}.get(kind)
+        if expected is None or len(values) != expected:
+            raise ValueError(f"Invalid latency spec '{spec}' (use e.g. 50, uniform:20,80, normal:50,10, lognormal:50,0.5, exponential:50)")
+        self.spec = str(spec)
+        self.kind = kind
+        self.values = values
+
+    def sample(self, rng: random.Random) -> float:
+        """One latency in seconds."""
+        if self.kind == "fixed":
+            ms = self.values[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(*self.values)
+        elif self.kind == "normal":
+            ms = rng.gauss(*self.values)
+        elif self.kind == "lognormal":
+            median, sigma = self.values
+            ms = median * math.exp(rng.gauss(0.0, sigma)) if median > 0 else 0.0
+        else:
+            ms = rng.expovariate(1.0 / self.values[0]) if self.values[0] > 0 else 0.0
+        return max(0.0, ms) / 1000
+
+
+class EndpointBehaviour:
+    __slots__ = ("latency", "error_rate", "throttle_rate")
+
+    def __init__(self, latency: str = "0", error_rate: float = 0.0, throttle_rate: float = 0.0):
+        self.latency = Latency(latency)
+        self.error_rate = float(error_rate)
+        self.throttle_rate = float(throttle_rate)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"latency": self.latency.spec, "error_rate": self.error_rate, "throttle_rate": self.throttle_rate}
+
+
+class RateLimit:
+    """Token bucket: `rps` requests per second with bursts of up to `burst`."""
+
+    def __init__(self, rps: float, burst: Optional[float] = None):
+        self.rps = float(rps)
+        self.burst = float(burst) if burst else max(1.0, self.rps)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    def take(self) -> Tuple[bool, int, float]:
+        """Spend a token if one is left: (allowed, tokens remaining, seconds until the next token)."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rps)
+        self._updated = now
+        allowed = self._tokens >= 1.0
+        if allowed:
+            self._tokens -= 1.0
+        wait = 0.0 if self._tokens >= 1.0 else (1.0 - self._tokens) / self.rps
+        return allowed, int(self._tokens), wait
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"rps": self.rps, "burst": self.burst}
+
+
+class StubConfig:
+    """Per-endpoint behaviour plus per-upstream rate limits."""
+
+    def __init__(
+        self,
+        latency: str = "0",
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        rate_limit_rps: Optional[float] = None,
+        rate_limit_burst: Optional[float] = None,
+        retry_after_seconds: float = 1.0,
+        token_expires_in: int = 3600,
+        seed: Optional[int] = None
+    ):
+        self.endpoints = {name: EndpointBehaviour(latency, error_rate, throttle_rate) for name in ENDPOINTS}
+        self.rate_limits: Dict[str, Optional[RateLimit]] = {
+            upstream: RateLimit(rate_limit_rps, rate_limit_burst) if rate_limit_rps else None for upstream in UPSTREAMS
+        }
+        self.retry_after_seconds = float(retry_after_seconds)
+        self.token_expires_in = int(token_expires_in)
+        self.rng = random.Random(seed)
+
+    @classmethod
+    def from_env(cls, **overrides: Any) -> "StubConfig":
+        """STUB_LATENCY, STUB_ERROR_RATE, STUB_THROTTLE_RATE, STUB_RATE_LIMIT_RPS, STUB_RATE_LIMIT_BURST,
+        STUB_RETRY_AFTER_SECONDS, STUB_TOKEN_EXPIRES_IN and STUB_SEED set the defaults; per-endpoint
+        (e.g. STUB_CAL_COM_BOOKINGS_LATENCY) and per-upstream (e.g. STUB_GRAPH_RATE_LIMIT_RPS) variables override them.
+        Keyword arguments (e.g. from the command line) take precedence over the environment."""
+        def setting(name: str, default: Any) -> Any:
+            if overrides.get(name) is not None:
+                return overrides[name]
+            return os.getenv(f"STUB_{name.upper()}", default)
+
+        seed = setting("seed", None)
+        config = cls(
+            latency=setting("latency", "0"),
+            error_rate=float(setting("error_rate", 0.0)),
+            throttle_rate=float(setting("throttle_rate", 0.0)),
+            rate_limit_rps=float(setting("rate_limit_rps", 0.0)) or None,
+            rate_limit_burst=float(setting("rate_limit_burst", 0.0)) or None,
+            retry_after_seconds=float(setting("retry_after_seconds", 1.0)),
+            token_expires_in=int(setting("token_expires_in", 3600)),
+            seed=int(seed) if seed is not None else None
+        )
+        for name in config.endpoints:
+            prefix = f"STUB_{name.upper()}_"
+            config.update_endpoint(name, {
+                key: os.environ[prefix + key.upper()]
+                for key in ("latency", "error_rate", "throttle_rate") if prefix + key.upper() in os.environ
+            })
+        for upstream in UPSTREAMS:
+            rps = os.getenv(f"STUB_{upstream.upper()}_RATE_LIMIT_RPS")
+            if rps is not None:
+                burst = os.getenv(f"STUB_{upstream.upper()}_RATE_LIMIT_BURST")
+                config.rate_limits[upstream] = RateLimit(float(rps), float(burst) if burst else None) if float(rps) else None
+        return config
+
+    def update_endpoint(self, name: str, changes: Dict[str, Any]) -> None:
+        behaviour = self.endpoints[name]
+        if "latency" in changes:
+            behaviour.latency = Latency(changes["latency"])
+        if "error_rate" in changes:
+            behaviour.error_rate = float(changes["error_rate"])
+        if "throttle_rate" in changes:
+            behaviour.throttle_rate = float(changes["throttle_rate"])
+
+    def update(self, changes: Dict[str, Any]) -> None:
+        """Apply a PATCH /_stub/config body, e.g.
+        {"endpoints": {"*": {"latency": "normal:50,10"}, "send_mail": {"throttle_rate": 0.2}},
+         "rate_limits": {"graph": {"rps": 5, "burst": 10}, "cal_com": null}, "retry_after_seconds": 2}"""
+        for name, endpoint_changes in (changes.get("endpoints") or {}).items():
+            if name != "*" and name not in self.endpoints:
+                raise ValueError(f"Unknown endpoint '{name}' (known: {', '.join(ENDPOINTS)})")
+            for target in (self.endpoints if name == "*" else [name]):
+                self.update_endpoint(target, endpoint_changes)
+        for upstream, limit in (changes.get("rate_limits") or {}).items():
+            if upstream not in self.rate_limits:
+                raise ValueError(f"Unknown upstream '{upstream}' (known: {', '.join(UPSTREAMS)})")
+            self.rate_limits[upstream] = RateLimit(limit["rps"], limit.get("burst")) if limit and limit.get("rps") else None
+        if "retry_after_seconds" in changes:
+            self.retry_after_seconds = float(changes["retry_after_seconds"])
+        if "token_expires_in" in changes:
+            self.token_expires_in = int(changes["token_expires_in"])
+        if "seed" in changes:
+            self.rng.seed(changes["seed"])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "endpoints": {name: behaviour.to_dict() for name, behaviour in self.endpoints.items()},
+            "rate_limits": {upstream: limit.to_dict() if limit else None for upstream, limit in self.rate_limits.items()},
+            "retry_after_seconds": self.retry_after_seconds,
+            "token_expires_in": self.token_expires_in,
+        }
+
+
+def _new_stats() -> Dict[str, Dict[str, int]]:
+    return {name: {"requests": 0, "errors": 0, "throttled": 0} for name in ENDPOINTS}
+
+
+# Error bodies in each upstream's own format
+def _cal_com_error(code: str, message: str) -> Dict[str, Any]:
+    return {"status": "error", "timestamp": datetime.now(timezone.utc).isoformat(), "error": {"code": code, "message": message}}
+
+
+def _graph_error(code: str, message: str) -> Dict[str, Any]:
+    return {"error": {"code": code, "message": message}}
+
+
+def _token_error(code: str, message: str) -> Dict[str, Any]:
+    return {"error": code, "error_description": message}
+
+
+# upstream -> (error body, status of an injected failure, its error code, the 429 error code)
+_ERRORS = {
+    "cal_com": (_cal_com_error, 500, "InternalServerErrorException", "TooManyRequestsException"),
+    "login": (_token_error, 503, "temporarily_unavailable", "temporarily_unavailable"),
+    "graph": (_graph_error, 503, "ServiceUnavailable", "TooManyRequests"),
+}
+
+
+def create_app(config: Optional[StubConfig] = None) -> Starlette:
+    """The stub app; `app.state.stub_config` and `app.state.stub_stats` can be inspected and changed in-process."""
+    config = config or StubConfig.from_env()
+    stats = _new_stats()
+    booking_ids = itertools.count(1)
+    token_ids = itertools.count(1)
+
+    def _throttled_headers(upstream: str, wait: float = 0.0) -> Dict[str, str]:
+        retry_after = max(config.retry_after_seconds, wait)
+        headers = {"Retry-After": str(max(1, math.ceil(retry_after)))}
+        limit = config.rate_limits[upstream]
+        if limit is not None:
+            headers.update({
+                "X-RateLimit-Limit": str(int(limit.burst)),
+                "X-RateLimit-Remaining": "0",
+                "X-RateLimit-Reset": str(max(1, math.ceil(wait))),
+            })
+        return headers
+
+    def _rate_limit(upstream: str) -> Tuple[Optional[Dict[str, str]], Dict[str, str]]:
+        """(429 headers if the host's bucket is empty, X-RateLimit-* headers for a response that goes through)"""
+        limit = config.rate_limits[upstream]
+        if limit is None:
+            return None, {}
+        allowed, remaining, wait = limit.take()
+        if not allowed:
+            return _throttled_headers(upstream, wait), {}
+        return None, {
+            "X-RateLimit-Limit": str(int(limit.burst)),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(max(1, math.ceil(wait))) if remaining == 0 else "1",
+        }
+
+    def _fault(endpoint: str, rate_limited: bool = True) -> Tuple[Optional[Tuple[int, Dict[str, Any], Dict[str, str]]], Dict[str, str]]:
+        """Decide this request's fate: ((status, body, headers) for an injected failure or None, headers for success)."""
+        upstream = ENDPOINTS[endpoint]
+        behaviour = config.endpoints[endpoint]
+        error_body, error_status, error_code, throttle_code = _ERRORS[upstream]
+        throttled_headers, rate_headers = _rate_limit(upstream) if rate_limited else (None, {})
+        if throttled_headers is None and behaviour.throttle_rate and config.rng.random() < behaviour.throttle_rate:
+            throttled_headers = _throttled_headers(upstream)
+        if throttled_headers is not None:
+            stats[endpoint]["throttled"] += 1
+            return (429, error_body(throttle_code, "Too many requests (stub)"), throttled_headers), {}
+        if behaviour.error_rate and config.rng.random() < behaviour.error_rate:
+            stats[endpoint]["errors"] += 1
+            return (error_status, error_body(error_code, "Injected upstream failure (stub)"), {}), {}
+        return None, rate_headers
+
+    async def _enter(endpoint: str, rate_limited: bool = True) -> Tuple[Optional[Response], Dict[str, str]]:
+        stats[endpoint]["requests"] += 1
+        await asyncio.sleep(config.endpoints[endpoint].latency.sample(config.rng))
+        fault, headers = _fault(endpoint, rate_limited)
+        if fault is not None:
+            status, body, fault_headers = fault
+            return JSONResponse(body, status_code=status, headers=fault_headers), {}
+        return None, headers
+
+    async def slots(request: Request) -> Response:
+        failure, headers = await _enter("cal_com_slots")
+        if failure is not None:
+            return failure
+        try:
+            start = datetime.fromisoformat(request.query_params["start"].replace("Z", "+00:00"))
+            end = datetime.fromisoformat(request.query_params["end"].replace("Z", "+00:00"))
+        except (KeyError, ValueError):
+            return JSONResponse(_cal_com_error("BadRequestException", "start and end are required ISO 8601 times"), status_code=400)
+        data: Dict[str, list] = {}
+        slot = start.replace(minute=start.minute - start.minute % SLOT_INTERVAL_MINUTES, second=0, microsecond=0)
+        while slot <= end:
+            data.setdefault(slot.strftime("%Y-%m-%d"), []).append({"start": slot.strftime("%Y-%m-%dT%H:%M:%S.000Z")})
+            slot += timedelta(minutes=SLOT_INTERVAL_MINUTES)
+        return JSONResponse({"status": "success", "data": data}, headers=headers)
+
+    async def bookings(request: Request) -> Response:
+        failure, headers = await _enter("cal_com_bookings")
+        if failure is not None:
+            return failure
+        try:
+            body = await request.json()
+            start = datetime.fromisoformat(str(body["start"]).replace("Z", "+00:00"))
+            attendee = body["attendee"]
+        except (KeyError, TypeError, ValueError):
+            return JSONResponse(_cal_com_error("BadRequestException", "start and attendee are required"), status_code=400)
+        booking_id = next(booking_ids)
+        uid = uuid.uuid4().hex
+        return JSONResponse({"status": "success", "data": {
+            "id": booking_id,
+            "uid": uid,
+            "title": f"Consultation with {attendee.get('name', 'attendee')}",
+            "status": "accepted",
+            "start": start.isoformat(),
+            "end": (start + timedelta(minutes=30)).isoformat(),
+            "eventTypeId": body.get("eventTypeId"),
+            "meetingUrl": f"https://meet.example.com/{uid[:12]}",
+            "attendees": [attendee],
+        }}, status_code=201, headers=headers)
+
+    async def token(request: Request) -> Response:
+        failure, headers = await _enter("token")
+        if failure is not None:
+            return failure
+        form = {key: values[0] for key, values in parse_qs((await request.body()).decode()).items()}
+        if form.get("grant_type") != "client_credentials" or not form.get("client_id"):
+            return JSONResponse(_token_error("invalid_request", "client_credentials grant expected"), status_code=400)
+        return JSONResponse({
+            "token_type": "Bearer",
+            "expires_in": config.token_expires_in,
+            "access_token": f"stub-token-{next(token_ids)}",
+        }, headers=headers)
+
+    def _authorized(request: Request) -> bool:
+        return request.headers.get("authorization", "").startswith("Bearer ")
+
+    async def send_mail(request: Request) -> Response:
+        failure, headers = await _enter("send_mail")
+        if failure is not None:
+            return failure
+        if not _authorized(request):
+            return JSONResponse(_graph_error("InvalidAuthenticationToken", "Access token is empty."), status_code=401)
+        await request.body()
+        return Response(status_code=202, headers=headers)
+
+    async def batch(request: Request) -> Response:
+        # Graph counts the requests inside a batch against the rate limit, not the batch itself
+        failure, headers = await _enter("batch", rate_limited=False)
+        if failure is not None:
+            return failure
+        if not _authorized(request):
+            return JSONResponse(_graph_error("InvalidAuthenticationToken", "Access token is empty."), status_code=401)
+        requests = (await request.json()).get("requests", [])
+        if len(requests) > 20:
+            return JSONResponse(_graph_error("BadRequest", "A batch may contain at most 20 requests."), status_code=400)
+        responses = []
+        for sub_request in requests:
+            # Each request in the batch is throttled/failed independently, as Graph does
+            stats["send_mail"]["requests"] += 1
+            fault, _ = _fault("send_mail")
+            if fault is None:
+                responses.append({"id": sub_request["id"], "status": 202, "headers": {}, "body": None})
+            else:
+                status, body, fault_headers = fault
+                responses.append({"id": sub_request["id"], "status": status, "headers": fault_headers, "body": body})
+        return JSONResponse({"responses": responses}, headers=headers)
+
+    async def get_config(request: Request) -> Response:
+        return JSONResponse(config.to_dict())
+
+    async def patch_config(request: Request) -> Response:
+        try:
+            config.update(await request.json())
+        except (KeyError, TypeError, ValueError) as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        return JSONResponse(config.to_dict())
+
+    async def get_stats(request: Request) -> Response:
+        return JSONResponse(stats)
+
+    async def reset(request: Request) -> Response:
+        stats.update(_new_stats())
+        return JSONResponse(stats)
+
+    app = Starlette(routes=[
+        Route("/v2/slots", slots, methods=["GET"]),
+        Route("/v2/bookings", bookings, methods=["POST"]),
+        Route("/{tenant}/oauth2/v2.0/token", token, methods=["POST"]),
+        Route("/v1.0/users/{upn}/sendMail", send_mail, methods=["POST"]),
+        Route("/v1.0/$batch", batch, methods=["POST"]),
+        Route("/_stub/config", get_config, methods=["GET"]),
+        Route("/_stub/config", patch_config, methods=["PATCH"]),
+        Route("/_stub/stats", get_stats, methods=["GET"]),
+        Route("/_stub/reset", reset, methods=["POST"]),
+    ])
+    app.state.stub_config = config
+    app.state.stub_stats = stats
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", help="Latency spec for every endpoint (ms), e.g. lognormal:80,0.5")
+    parser.add_argument("--error-rate", type=float, help="Share of requests failing with a 5xx")
+    parser.add_argument("--throttle-rate", type=float, help="Share of requests answered with a 429")
+    parser.add_argument("--rate-limit-rps", type=float, help="Per-host token bucket rate (429 once exhausted)")
+    parser.add_argument("--rate-limit-burst", type=float)
+    parser.add_argument("--retry-after-seconds", type=float)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = StubConfig.from_env(
+        latency=args.latency, error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+        rate_limit_rps=args.rate_limit_rps, rate_limit_burst=args.rate_limit_burst,
+        retry_after_seconds=args.retry_after_seconds, seed=args.seed
+    )
+    print(f"Upstream stubs on http://{args.host}:{args.port} - set UPSTREAM_STUB_URL to this to use them", file=sys.stderr)
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,49 @@
 import httpx
 import logging # Added for logger
-import json # Added for logging params and headers
 from datetime import datetime, timedelta, timezone
 import pytz # For timezone conversion
 
-from .config import CAL_COM_API_KEY, CAL_COM_API_BASE_URL, DEFAULT_EVENT_TYPE_ID
+from .config import (
+    CAL_COM_API_KEY, CAL_COM_API_BASE_URL, DEFAULT_EVENT_TYPE_ID, SLOT_CACHE_TTL_SECONDS, SLOT_CACHE_MAX_ENTRIES,
+    RATE_LIMIT_ENABLED, RATE_LIMIT_MAX_WAIT_SECONDS, CAL_COM_RATE_LIMIT_RPS, CAL_COM_RATE_LIMIT_BURST
+)
+from .slot_cache import SlotCache, parse_slot_start, utc_day
+from .slot_index import SlotIndex
+from .logging_setup import log_payload
+from .metrics import OUTCOMES, STAGE_SECONDS
+from .rate_limiter import RateLimited, get_rate_limiter
 
 logger = logging.getLogger(__name__) # Initialize logger
 
+_SLOTS_STAGE = STAGE_SECONDS.labels("cal_com_slots")
+_BOOKING_STAGE = STAGE_SECONDS.labels("cal_com_post")
+_BOOKING_CREATED = OUTCOMES.labels("cal_com_booking", "success")
+_BOOKING_REJECTED = OUTCOMES.labels("cal_com_booking", "failure")
+_BOOKING_ERROR = OUTCOMES.labels("cal_com_booking", "error")
+
+# Per-(eventTypeId, day) availability cache; invalidated whenever a booking is attempted
+slot_cache = SlotCache(ttl_seconds=SLOT_CACHE_TTL_SECONDS, max_entries=SLOT_CACHE_MAX_ENTRIES)
+
+# Token bucket for the API key, paced by Cal.com's X-RateLimit-* / Retry-After headers
+rate_limiter = get_rate_limiter(
+    "cal_com", CAL_COM_API_KEY or "", CAL_COM_RATE_LIMIT_RPS, CAL_COM_RATE_LIMIT_BURST,
+    RATE_LIMIT_MAX_WAIT_SECONDS, RATE_LIMIT_ENABLED
+)
+
+_cal_http_client: httpx.AsyncClient | None = None
+
+def _get_cal_http_client() -> httpx.AsyncClient:
+    """One pooled client for the Cal.com API, reused across calls.
+
+    A new AsyncClient per call loads the CA bundle into a fresh SSL context (~30ms of CPU that blocks
+    the event loop - and with INTEGRATION_MODE=mcp-inproc that is the bridge's loop) and opens a new
+    connection, so concurrent bookings were effectively handled one at a time.
+    """
+    global _cal_http_client
+    if _cal_http_client is None or _cal_http_client.is_closed:
+        _cal_http_client = httpx.AsyncClient(timeout=httpx.Timeout(10.0, connect=5.0))
+    return _cal_http_client
+
 async def convert_to_utc(local_date_str: str, local_time_str: str, local_timezone_str: str) -> str | None:
     """
     Converts a local date, time, and timezone to an ISO 8601 UTC string.
@@ -22,7 +58,7 @@ async def convert_to_utc(local_date_str: str, local_time_str: str, local_timezon
         utc_dt = localized_dt.astimezone(timezone.utc)
         return utc_dt.strftime("%Y-%m-%dT%H:%M:%SZ")
     except Exception as e:
-        print(f"Error in convert_to_utc: {e}")
+        logger.error("Error in convert_to_utc: %s", e)
         return None
 
 async def check_availability(
@@ -32,68 +68,54 @@ async def check_availability(
 ) -> bool:
     """
     Checks slot availability with Cal.com API.
+    A day's slots are fetched once and then answered from the in-memory slot cache until the TTL expires.
     """
+    try:
+        start_epoch = parse_slot_start(utc_start_time_iso)
+    except ValueError:
+        logger.error(f"Invalid utc_start_time_iso for availability check: {utc_start_time_iso}")
+        return False
+    day = utc_day(start_epoch)
+
+    available_starts = slot_cache.get(event_type_id, day)
+    if available_starts is not None:
+        return start_epoch in available_starts
+
     if not CAL_COM_API_KEY:
-        print("Cal.com API key not configured.")
+        logger.error("Cal.com API key not configured.")
         return False
 
     url = f"{CAL_COM_API_BASE_URL}/slots"
+    # Fetch the whole UTC day so later checks for the same day are cache hits
     params = {
         "eventTypeId": event_type_id,
-        "start": utc_start_time_iso, # Changed from startTime to start
-        "end": utc_end_time_iso,     # Changed from endTime to end
+        "start": f"{day}T00:00:00Z",
+        "end": f"{day}T23:59:59Z",
     }
     headers = {
         "Content-Type": "application/json",
         "apiKey": CAL_COM_API_KEY,
         "cal-api-version": "2024-09-04" # Added based on successful curl
     }
-    logger.debug(f"Calling Cal.com /slots API. URL: {url}")
-    logger.debug(f"Params for /slots: {json.dumps(params)}")
-    logger.debug(f"Headers for /slots: {json.dumps(headers)}")
+    logger.debug("Calling Cal.com /slots API. URL: %s, params: %s", url, params)
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params, headers=headers)
-            response.raise_for_status() # Raise an exception for bad status codes
-            data = response.json()
-            print(f"Cal.com /slots API response data: {data}") # DEBUG LOG
-            
-            # The Cal.com /slots API returns data keyed by date, e.g., "2024-08-13"
-            # We need to check if any slots are returned for the requested period.
-            if data.get("data"):
-                print(f"Found 'data' key in response: {data['data']}") # DEBUG LOG
-                for date_key in data["data"]:
-                    print(f"Processing date_key: {date_key}") # DEBUG LOG
-                    if data["data"][date_key]: # Check if the list of slots for this date is not empty
-                        print(f"Slots found for {date_key}: {data['data'][date_key]}") # DEBUG LOG
-                        for slot in data["data"][date_key]:
-                            api_slot_time = slot.get("start")
-                            print(f"Checking slot: {api_slot_time} against utc_start_time_iso: {utc_start_time_iso}") # DEBUG LOG
-                            # Compare up to the seconds, ignoring milliseconds and 'Z' for a more robust comparison
-                            # utc_start_time_iso is like "2025-05-22T03:00:00Z"
-                            # api_slot_time is like "2025-05-22T03:00:00.000Z"
-                            if api_slot_time and utc_start_time_iso:
-                                # Ensure utc_start_time_iso is at least 20 chars "YYYY-MM-DDTHH:MM:SSZ"
-                                if len(utc_start_time_iso) >= 20:
-                                    compare_str = utc_start_time_iso[:-1] # Remove Z
-                                    print(f"Comparing api_slot_time: '{api_slot_time}' with compare_str: '{compare_str}'") # DEBUG LOG
-                                    if api_slot_time.startswith(compare_str):
-                                        print(f"Slot matched: {api_slot_time}") # DEBUG LOG
-                                        return True
-                                else:
-                                    print(f"utc_start_time_iso '{utc_start_time_iso}' is too short for comparison.") # DEBUG LOG
-                            else:
-                                print(f"Either api_slot_time or utc_start_time_iso is None. api_slot_time: {api_slot_time}, utc_start_time_iso: {utc_start_time_iso}") # DEBUG LOG
-                    else:
-                        print(f"No slots list found for date_key: {date_key}") # DEBUG LOG
-            else:
-                print("No 'data' key found in Cal.com /slots API response.") # DEBUG LOG
-            print("Slot not found in check_availability after checking all conditions.") # DEBUG LOG
-            return False
+        client = _get_cal_http_client()
+        with _SLOTS_STAGE.time():
+            response = await rate_limiter.send(lambda: client.get(url, params=params, headers=headers))
+        response.raise_for_status() # Raise an exception for bad status codes
+        data = response.json()
+        logger.debug("Cal.com /slots API response data: %s", data)
+        
+        # The Cal.com /slots API returns data keyed by date, e.g., "2024-08-13"
+        slot_cache.put_response(event_type_id, [day], data.get("data") or {})
+        return start_epoch in (slot_cache.get(event_type_id, day) or SlotIndex())
     except httpx.HTTPStatusError as e:
         logger.error(f"HTTP error checking availability: {e.response.status_code} - {e.response.text}")
         return False
+    except RateLimited:
+        # Not an answer about the slot - the caller reports it as such
+        raise
     except Exception as e:
         logger.exception(f"Unexpected error in check_availability: {e}")
         return False
@@ -142,31 +164,46 @@ async def create_cal_booking_api_call(
     # if metadata_obj:
     #     payload["metadata"] = metadata_obj
     
-    print(f"Attempting to create booking with payload: {json.dumps(payload, indent=2)}")
-    print(f"Using headers: {json.dumps(headers, indent=2)}")
+    # Headers carry the API key, so only the payload is logged (for a sample of bookings)
+    log_payload(logger, payload, "Attempting to create Cal.com booking")
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, headers=headers) # Using the 'ordered_payload' which is now just 'payload'
-            print(f"Cal.com /bookings API raw response status: {response.status_code}") # DEBUG LOG
-            print(f"Cal.com /bookings API raw response content: {response.text}") # DEBUG LOG
-            response.raise_for_status()
-            return {"success": True, "data": response.json()}
+        client = _get_cal_http_client()
+        try:
+            with _BOOKING_STAGE.time():
+                # A 429 is sent once more if Cal.com's Retry-After fits in RATE_LIMIT_MAX_WAIT_SECONDS
+                response = await rate_limiter.send(lambda: client.post(url, json=payload, headers=headers))
+        finally:
+            # The slot may be gone - also when the request failed in flight, since Cal.com may have
+            # created the booking anyway - so drop the cached availability for that day
+            try:
+                slot_cache.invalidate(event_type_id, utc_day(parse_slot_start(utc_start_time_iso)))
+            except ValueError:
+                slot_cache.invalidate(event_type_id)
+        logger.debug("Cal.com /bookings API response: %s %s", response.status_code, response.text)
+        response.raise_for_status()
+        _BOOKING_CREATED.inc()
+        return {"success": True, "data": response.json()}
     except httpx.HTTPStatusError as e:
+        _BOOKING_REJECTED.inc()
         error_message = f"HTTPStatusError for {e.request.url}: {e.response.status_code}"
         try:
             error_details = e.response.json()
-            print(f"{error_message} - JSON Response: {error_details}") # DEBUG LOG
+            logger.error("%s - JSON Response: %s", error_message, error_details)
         except ValueError: # If response is not JSON
             error_details = {"error": "Failed to parse error response from Cal.com", "details": e.response.text, "status_code": e.response.status_code}
-            print(f"{error_message} - Non-JSON Response: {e.response.text}") # DEBUG LOG
+            logger.error("%s - Non-JSON Response: %s", error_message, e.response.text)
         # Return a consistent error structure
         return {"success": False, "error": f"API Error: {e.response.status_code}", "details": error_details}
+    except RateLimited as e:
+        _BOOKING_ERROR.inc()
+        logger.error("Booking not sent: %s", e)
+        return {"success": False, "error": "RateLimited", "details": str(e)}
     except httpx.RequestError as e:
-        print(f"RequestError for {e.request.url}: {str(e)}") # DEBUG LOG
+        _BOOKING_ERROR.inc()
+        logger.error("RequestError for %s: %s", e.request.url, e)
         return {"success": False, "error": "RequestError", "details": f"Cal.com API request failed: {str(e)}"}
     except Exception as e: # Catch any other unexpected errors
-        import traceback
-        print(f"Unexpected error in create_cal_booking_api_call: {type(e).__name__} - {str(e)}") # DEBUG LOG
-        print(traceback.format_exc()) # DEBUG LOG
+        _BOOKING_ERROR.inc()
+        logger.exception("Unexpected error in create_cal_booking_api_call: %s - %s", type(e).__name__, e)
         return {"success": False, "error": "UnexpectedError", "details": f"An unexpected error occurred: {type(e).__name__} - {str(e)}"}
\ No newline at end of file
@@ -11,6 +11,10 @@ load_dotenv(dotenv_path=ENV_FILE_PATH) # For local development, Render will use
 
 CAL_COM_API_KEY = os.getenv("CAL_COM_API_KEY")
 CAL_COM_API_BASE_URL = os.getenv("CAL_COM_API_BASE_URL", "https://api.cal.com/v2")
+# Offline benchmarking: call the Cal.com stand-in in bridge_server/stubs/upstreams.py instead
+UPSTREAM_STUB_URL = os.getenv("UPSTREAM_STUB_URL", "").rstrip("/")
+if UPSTREAM_STUB_URL:
+    CAL_COM_API_BASE_URL = f"{UPSTREAM_STUB_URL}/v2"
 DEFAULT_EVENT_TYPE_ID_STR = os.getenv("DEFAULT_EVENT_TYPE_ID", "1837761")
 DEFAULT_EVENT_DURATION_MINUTES_STR = os.getenv("DEFAULT_EVENT_DURATION_MINUTES", "30")
 
@@ -26,6 +30,24 @@ except ValueError:
     print(f"CRITICAL: Invalid DEFAULT_EVENT_DURATION_MINUTES value: {DEFAULT_EVENT_DURATION_MINUTES_STR}. Must be an integer.")
     DEFAULT_EVENT_DURATION_MINUTES = 30 # Fallback to a known default
 
+# Availability slot cache: how long a day's /slots response answers availability checks locally
+SLOT_CACHE_TTL_SECONDS = float(os.getenv("SLOT_CACHE_TTL_SECONDS", "60"))
+SLOT_CACHE_MAX_ENTRIES = int(os.getenv("SLOT_CACHE_MAX_ENTRIES", "512"))
+
+# Client-side rate limiting per API key: a token bucket that follows Cal.com's X-RateLimit-* and Retry-After headers
+# and queues requests for up to RATE_LIMIT_MAX_WAIT_SECONDS instead of sending them into a 429.
+# CAL_COM_RATE_LIMIT_RPS/BURST add a limit of our own (0 = headers only)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("RATE_LIMIT_MAX_WAIT_SECONDS", "5"))
+CAL_COM_RATE_LIMIT_RPS = float(os.getenv("CAL_COM_RATE_LIMIT_RPS", "0"))
+CAL_COM_RATE_LIMIT_BURST = float(os.getenv("CAL_COM_RATE_LIMIT_BURST", "0"))
+
+# Logging: records are written by a background thread ("json" = one JSON object per line, or "text")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # Records beyond this are dropped rather than block a request
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.1"))  # Share of request payloads logged in full
+
 # It's good practice to validate that critical config is loaded
 if not CAL_COM_API_KEY:
     # In a real app, you might raise an error or log a critical warning
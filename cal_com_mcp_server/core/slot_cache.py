@@ -0,0 +1,106 @@
+"""
+In-memory Cal.com availability cache keyed by (eventTypeId, UTC day), with TTL and
+invalidation on successful bookings.
+
+Mirrored in bridge_server/core/slot_cache.py (the services deploy separately) - keep both in sync.
+"""
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .slot_index import SlotIndex
+
+SlotKey = Tuple[int, str]  # (eventTypeId, "YYYY-MM-DD" in UTC)
+
+
+def parse_slot_start(value: str) -> int:
+    """Parse a Cal.com slot start ("2025-05-22T03:00:00.000Z" or with offset) to epoch seconds."""
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def utc_day(epoch_seconds: int) -> str:
+    return datetime.fromtimestamp(epoch_seconds, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def slots_by_day(slots_data: Dict[str, Any]) -> Dict[str, SlotIndex]:
+    """Convert the `data` object of a /slots response into {day: SlotIndex of start epochs}."""
+    result: Dict[str, SlotIndex] = {}
+    for day, slots in (slots_data or {}).items():
+        starts = []
+        for slot in slots or []:
+            start = slot.get("start") if isinstance(slot, dict) else slot
+            if start:
+                starts.append(parse_slot_start(start))
+        result[day] = SlotIndex(starts)
+    return result
+
+
+class SlotCache:
+    """Bounded TTL cache of available slot start times (as a SlotIndex) per (eventTypeId, day)."""
+
+    def __init__(self, ttl_seconds: float = 60.0, max_entries: int = 512):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[SlotKey, Tuple[float, SlotIndex]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, event_type_id: int, day: str) -> Optional[SlotIndex]:
+        key = (event_type_id, day)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, event_type_id: int, day: str, starts: SlotIndex) -> None:
+        key = (event_type_id, day)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, starts)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def put_response(self, event_type_id: int, requested_days, slots_data: Dict[str, Any]) -> None:
+        """Cache a /slots response; requested days missing from it are cached as fully booked."""
+        by_day = slots_by_day(slots_data)
+        for day in requested_days:
+            by_day.setdefault(day, SlotIndex())
+        for day, starts in by_day.items():
+            self.put(event_type_id, day, starts)
+
+    def get_many(self, event_type_id: int, days: Iterable[str]) -> Tuple[Dict[str, SlotIndex], List[str]]:
+        """Cached indexes for the given days, plus the days that missed."""
+        found: Dict[str, SlotIndex] = {}
+        missing: List[str] = []
+        for day in days:
+            index = self.get(event_type_id, day)
+            if index is None:
+                missing.append(day)
+            else:
+                found[day] = index
+        return found, missing
+
+    def is_available(self, event_type_id: int, start_epoch: int) -> Optional[bool]:
+        """True/False if the day is cached, None on a cache miss."""
+        starts = self.get(event_type_id, utc_day(start_epoch))
+        if starts is None:
+            return None
+        return start_epoch in starts
+
+    def invalidate(self, event_type_id: int, day: Optional[str] = None) -> None:
+        if day is not None:
+            self._entries.pop((event_type_id, day), None)
+            return
+        for key in [k for k in self._entries if k[0] == event_type_id]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
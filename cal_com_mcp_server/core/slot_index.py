@@ -0,0 +1,62 @@
+"""
+Compact sorted index of available slot start times (epoch seconds) with O(log n) lookups.
+
+Mirrored in bridge_server/core/slot_index.py (the services deploy separately) - keep both in sync.
+"""
+from array import array
+from bisect import bisect_left
+from typing import Iterable, List, Optional
+
+
+class SlotIndex:
+    """Immutable sorted array('q') of slot starts supporting membership and nearest-slot queries."""
+
+    __slots__ = ("_starts",)
+
+    def __init__(self, starts: Iterable[int] = ()):
+        self._starts = array("q", sorted(set(starts)))
+
+    @classmethod
+    def merge(cls, indexes: Iterable["SlotIndex"]) -> "SlotIndex":
+        merged = cls()
+        for index in indexes:
+            merged._starts.extend(index._starts)
+        merged._starts = array("q", sorted(set(merged._starts)))
+        return merged
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __iter__(self):
+        return iter(self._starts)
+
+    def __contains__(self, start: int) -> bool:
+        i = bisect_left(self._starts, start)
+        return i < len(self._starts) and self._starts[i] == start
+
+    def next_available(self, at_or_after: int) -> Optional[int]:
+        """First slot starting at or after the given time."""
+        i = bisect_left(self._starts, at_or_after)
+        return self._starts[i] if i < len(self._starts) else None
+
+    def nearest(self, target: int, count: int, not_before: Optional[int] = None, exclude_target: bool = False) -> List[int]:
+        """Up to `count` slots closest to `target` (ties go to the earlier slot), sorted by start.
+
+        Slots before `not_before` (e.g. "now") are never returned, nor `target` itself with exclude_target.
+        """
+        starts = self._starts
+        low = bisect_left(starts, not_before) if not_before is not None else 0
+        right = max(bisect_left(starts, target), low)
+        left = right - 1
+        if exclude_target and right < len(starts) and starts[right] == target:
+            right += 1
+        picked: List[int] = []
+        while len(picked) < count and (left >= low or right < len(starts)):
+            if right >= len(starts) or (left >= low and target - starts[left] <= starts[right] - target):
+                picked.append(starts[left])
+                left -= 1
+            else:
+                picked.append(starts[right])
+                right += 1
+        picked.sort()
+        return picked
@@ -1,4 +1,16 @@
 from tools.cal_com_tools import cal_com_mcp_instance
+from core.config import LOG_LEVEL, LOG_FORMAT, LOG_QUEUE_SIZE, LOG_PAYLOAD_SAMPLE_RATE
+from core.logging_setup import configure_logging
+from core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, render as render_metrics
+from starlette.responses import Response
+
+# Replaces FastMCP's synchronous console handler with the background JSON writer
+configure_logging(LOG_LEVEL, LOG_FORMAT, LOG_QUEUE_SIZE, LOG_PAYLOAD_SAMPLE_RATE)
+
+@cal_com_mcp_instance.custom_route("/metrics", methods=["GET"])
+async def metrics(request):
+    """Prometheus metrics: tool calls in flight, upstream stage latencies and outcomes."""
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
 
 # For newer MCP versions, FastMCP might not expose .app directly
 # Try different approaches to get the FastAPI app
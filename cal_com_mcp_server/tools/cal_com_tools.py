@@ -20,6 +20,8 @@ try:
         check_availability,
         create_cal_booking_api_call,
     )
+    from ..core.metrics import IN_FLIGHT
+    from ..core.rate_limiter import RateLimited
     from ..schemas.cal_com_schemas import CreateCalComBookingInput, CreateCalComBookingOutput, BookingOutputDetails
 except ImportError:
     # Fallback for when running as main module
@@ -32,6 +34,8 @@ except ImportError:
         check_availability,
         create_cal_booking_api_call,
     )
+    from core.metrics import IN_FLIGHT
+    from core.rate_limiter import RateLimited
     from schemas.cal_com_schemas import CreateCalComBookingInput, CreateCalComBookingOutput, BookingOutputDetails
 
 
@@ -51,6 +55,7 @@ cal_com_mcp_instance = FastMCP(
     description="Schedules a booking on Cal.com. It converts local time to UTC, checks availability, and then creates the booking."
     # input_schema and output_schema are removed; FastMCP infers from type hints
 )
+@IN_FLIGHT.track_in_flight
 async def create_cal_com_booking_mcp_tool(args: CreateCalComBookingInput, ctx: MCPContext) -> CreateCalComBookingOutput:
     """
     MCP Tool to handle Cal.com booking process:
@@ -87,11 +92,18 @@ async def create_cal_com_booking_mcp_tool(args: CreateCalComBookingInput, ctx: M
             "bookingDetails": {"error_step": "duration_calculation", "utc_start_iso": utc_start_iso},
         }
 
-    is_available = await check_availability(
-        utc_start_time_iso=utc_start_iso,
-        utc_end_time_iso=utc_end_iso,
-        event_type_id=event_type_id
-    )
+    try:
+        is_available = await check_availability(
+            utc_start_time_iso=utc_start_iso,
+            utc_end_time_iso=utc_end_iso,
+            event_type_id=event_type_id
+        )
+    except RateLimited as e:
+        return {
+            "success": False,
+            "message": f"Could not check availability: {e}",
+            "bookingDetails": {"error_step": "availability_check", "retry_after_seconds": round(e.retry_after, 1)},
+        }
 
     if not is_available:
         return {
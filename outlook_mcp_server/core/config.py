@@ -15,9 +15,33 @@ AZURE_CLIENT_ID = os.getenv("AZURE_CLIENT_ID")
 AZURE_CLIENT_SECRET = os.getenv("AZURE_CLIENT_SECRET")
 SENDER_UPN = os.getenv("SENDER_UPN") # User Principal Name of the sender
 
-GRAPH_API_BASE_URL = "https://graph.microsoft.com/v1.0"
+GRAPH_API_BASE_URL = os.getenv("GRAPH_API_BASE_URL", "https://graph.microsoft.com/v1.0")
+AZURE_LOGIN_BASE_URL = os.getenv("AZURE_LOGIN_BASE_URL", "https://login.microsoftonline.com")
+# Offline benchmarking: call the Graph/Azure AD stand-ins in bridge_server/stubs/upstreams.py instead
+UPSTREAM_STUB_URL = os.getenv("UPSTREAM_STUB_URL", "").rstrip("/")
+if UPSTREAM_STUB_URL:
+    GRAPH_API_BASE_URL = f"{UPSTREAM_STUB_URL}/v1.0"
+    AZURE_LOGIN_BASE_URL = UPSTREAM_STUB_URL
 GRAPH_API_SCOPES = ["https://graph.microsoft.com/.default"] # For client credentials flow
 
+# Coalesce sendMail calls arriving within this window into one Graph $batch (0 disables batching)
+GRAPH_BATCH_WINDOW_MS = float(os.getenv("GRAPH_BATCH_WINDOW_MS", "10"))
+GRAPH_BATCH_MAX_SIZE = int(os.getenv("GRAPH_BATCH_MAX_SIZE", "20"))  # Graph allows at most 20 per batch
+
+# Client-side rate limiting per tenant: a token bucket that follows Graph's throttling headers (Retry-After, RateLimit-*)
+# and queues requests for up to RATE_LIMIT_MAX_WAIT_SECONDS instead of sending them into a 429.
+# GRAPH_RATE_LIMIT_RPS/BURST add a limit of our own (0 = headers only)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("RATE_LIMIT_MAX_WAIT_SECONDS", "5"))
+GRAPH_RATE_LIMIT_RPS = float(os.getenv("GRAPH_RATE_LIMIT_RPS", "0"))
+GRAPH_RATE_LIMIT_BURST = float(os.getenv("GRAPH_RATE_LIMIT_BURST", "0"))
+
+# Logging: records are written by a background thread ("json" = one JSON object per line, or "text")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # Records beyond this are dropped rather than block a request
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.1"))  # Share of request payloads logged in full
+
 # Validate critical config
 critical_configs = {
     "AZURE_TENANT_ID": AZURE_TENANT_ID,
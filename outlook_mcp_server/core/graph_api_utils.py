@@ -1,35 +1,40 @@
 import httpx
 import json
+import logging
 from .config import (
     AZURE_TENANT_ID,
     AZURE_CLIENT_ID,
     AZURE_CLIENT_SECRET,
     SENDER_UPN,
     GRAPH_API_BASE_URL,
-    GRAPH_API_SCOPES
+    AZURE_LOGIN_BASE_URL,
+    GRAPH_API_SCOPES,
+    GRAPH_BATCH_WINDOW_MS,
+    GRAPH_BATCH_MAX_SIZE,
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_MAX_WAIT_SECONDS,
+    GRAPH_RATE_LIMIT_RPS,
+    GRAPH_RATE_LIMIT_BURST
 )
+from .graph_batch import GraphBatcher
+from .metrics import OUTCOMES, STAGE_SECONDS
+from .rate_limiter import RateLimited, get_rate_limiter
+from .token_manager import AccessTokenManager
 
-# In-memory cache for the access token (in a real app, consider a more robust cache)
-_cached_token = None
+logger = logging.getLogger(__name__)
 
-async def get_graph_api_access_token() -> str | None:
+_TOKEN_STAGE = STAGE_SECONDS.labels("token_acquisition")
+_SEND_MAIL_STAGE = STAGE_SECONDS.labels("graph_send_mail")
+_MAIL_SENT = OUTCOMES.labels("graph_send_mail", "success")
+_MAIL_REJECTED = OUTCOMES.labels("graph_send_mail", "failure")
+_MAIL_ERROR = OUTCOMES.labels("graph_send_mail", "error")
+
+async def _fetch_graph_api_access_token() -> tuple[str, int]:
     """
-    Retrieves an access token for Microsoft Graph API using client credentials flow.
-    Caches the token in memory.
+    Requests a new access token for Microsoft Graph API using client credentials flow.
+    Returns (access_token, expires_in_seconds).
     """
-    global _cached_token
-    # Basic check if token exists and is not (naively) expired. 
-    # A real implementation should check token expiry time.
-    if _cached_token:
-        # Here you would normally decode the token and check its 'exp' claim
-        # For simplicity, we're not doing that. Assume it's valid if it exists.
-        return _cached_token
-
-    if not all([AZURE_TENANT_ID, AZURE_CLIENT_ID, AZURE_CLIENT_SECRET]):
-        print("Azure AD credentials not fully configured for Graph API.")
-        return None
-
-    token_url = f"https://login.microsoftonline.com/{AZURE_TENANT_ID}/oauth2/v2.0/token"
+    token_url = f"{AZURE_LOGIN_BASE_URL}/{AZURE_TENANT_ID}/oauth2/v2.0/token"
     
     payload = {
         "client_id": AZURE_CLIENT_ID,
@@ -39,21 +44,92 @@ async def get_graph_api_access_token() -> str | None:
     }
     headers = {"Content-Type": "application/x-www-form-urlencoded"}
 
-    try:
-        async with httpx.AsyncClient() as client:
+    async with httpx.AsyncClient() as client:
+        with _TOKEN_STAGE.time():
             response = await client.post(token_url, data=payload, headers=headers)
-            response.raise_for_status()
-            token_data = response.json()
-            _cached_token = token_data.get("access_token")
-            # You might also want to store token_data.get("expires_in") to manage expiry
-            return _cached_token
+        response.raise_for_status()
+        token_data = response.json()
+        return token_data["access_token"], int(token_data.get("expires_in", 3600))
+
+# Single-flight token cache that honours expires_in and refreshes in the background before expiry
+graph_token_manager = AccessTokenManager(_fetch_graph_api_access_token, name="graph", refresh_margin=300)
+
+async def get_graph_api_access_token() -> str | None:
+    """
+    Retrieves an access token for Microsoft Graph API using client credentials flow.
+    Serves the cached token without I/O until it is close to expiry.
+    """
+    if not all([AZURE_TENANT_ID, AZURE_CLIENT_ID, AZURE_CLIENT_SECRET]):
+        logger.error("Azure AD credentials not fully configured for Graph API.")
+        return None
+
+    try:
+        return await graph_token_manager.get_token()
     except httpx.HTTPStatusError as e:
-        print(f"HTTP error getting Graph API token: {e.response.status_code} - {e.response.text}")
+        logger.error("HTTP error getting Graph API token: %s - %s", e.response.status_code, e.response.text)
         return None
     except Exception as e:
-        print(f"Error getting Graph API token: {e}")
+        logger.error("Error getting Graph API token: %s", e)
         return None
 
+_graph_http_client: httpx.AsyncClient | None = None
+
+# Token bucket for the tenant, paced by Graph's throttling headers (Retry-After on 429s)
+rate_limiter = get_rate_limiter(
+    "graph", AZURE_TENANT_ID or "", GRAPH_RATE_LIMIT_RPS, GRAPH_RATE_LIMIT_BURST,
+    RATE_LIMIT_MAX_WAIT_SECONDS, RATE_LIMIT_ENABLED
+)
+
+def _get_graph_http_client() -> httpx.AsyncClient:
+    """One pooled client for graph.microsoft.com, reused across sends"""
+    global _graph_http_client
+    if _graph_http_client is None or _graph_http_client.is_closed:
+        _graph_http_client = httpx.AsyncClient(timeout=httpx.Timeout(10.0, connect=5.0))
+    return _graph_http_client
+
+def _parse_body(response: httpx.Response):
+    try:
+        return response.json() if response.content else None
+    except ValueError:
+        return response.text
+
+async def _send_graph_request(request: dict, access_token: str | None = None) -> dict:
+    """Send one Graph request ({method, url, headers, body}) and return {status, headers, body}."""
+    access_token = access_token or await get_graph_api_access_token()
+    response = await rate_limiter.send(lambda: _get_graph_http_client().request(
+        request["method"],
+        f"{GRAPH_API_BASE_URL}{request['url']}",
+        headers={**request.get("headers", {}), "Authorization": f"Bearer {access_token}"},
+        json=request.get("body"),
+    ))
+    return {"status": response.status_code, "headers": dict(response.headers), "body": _parse_body(response)}
+
+async def _send_graph_batch(requests: list) -> list:
+    """POST up to 20 requests as one Graph $batch and return the per-request responses."""
+    access_token = await get_graph_api_access_token()
+    response = await rate_limiter.send(lambda: _get_graph_http_client().post(
+        f"{GRAPH_API_BASE_URL}/$batch",
+        headers={"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"},
+        json={"requests": requests},
+    ))
+    if response.status_code != 200:
+        # The whole batch was rejected (e.g. throttled) - every request gets that outcome
+        body = _parse_body(response)
+        return [{"id": r["id"], "status": response.status_code, "headers": dict(response.headers), "body": body} for r in requests]
+    responses = response.json().get("responses", [])
+    # Requests inside a batch are throttled individually, with their own Retry-After
+    for item in responses:
+        if item.get("status") == 429:
+            rate_limiter.observe(429, item.get("headers") or {})
+    return responses
+
+graph_batcher = GraphBatcher(
+    _send_graph_batch,
+    _send_graph_request,
+    window_seconds=GRAPH_BATCH_WINDOW_MS / 1000,
+    max_batch_size=GRAPH_BATCH_MAX_SIZE
+) if GRAPH_BATCH_WINDOW_MS > 0 else None
+
 async def send_email_via_graph_api(
     recipient_email: str,
     subject: str,
@@ -70,8 +146,6 @@ async def send_email_via_graph_api(
     if not access_token:
         return {"success": False, "error": "Failed to obtain Graph API access token."}
 
-    send_mail_url = f"{GRAPH_API_BASE_URL}/users/{SENDER_UPN}/sendMail"
-    
     email_payload = {
         "message": {
             "subject": subject,
@@ -91,31 +165,46 @@ async def send_email_via_graph_api(
         "saveToSentItems": str(save_to_sent_items).lower() # API expects string "true" or "false"
     }
 
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
+    send_mail_request = {
+        "method": "POST",
+        "url": f"/users/{SENDER_UPN}/sendMail",
+        "headers": {"Content-Type": "application/json"},
+        "body": email_payload
     }
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(send_mail_url, json=email_payload, headers=headers)
-            
-            # A 202 Accepted means the request was accepted for processing
-            if response.status_code == 202:
-                return {"success": True, "message": "Email send request accepted."}
+        with _SEND_MAIL_STAGE.time():
+            if graph_batcher is not None:
+                # Coalesced with other sends in the same window into one $batch
+                response = await graph_batcher.submit(send_mail_request)
             else:
-                response.raise_for_status() # Will raise for other 4xx/5xx errors
-                # Should not be reached if raise_for_status works as expected for non-202
-                return {"success": False, "error": f"Unexpected status code: {response.status_code}", "details": response.text}
+                response = await _send_graph_request(send_mail_request, access_token)
+
+        if response["status"] == 429:
+            # Throttled inside a $batch (a request of its own would have been retried by the limiter)
+            raise RateLimited("graph", rate_limiter.retry_after)
+        # A 202 Accepted means the request was accepted for processing
+        if response["status"] == 202:
+            _MAIL_SENT.inc()
+            return {"success": True, "message": "Email send request accepted."}
+        _MAIL_REJECTED.inc()
+        logger.error("HTTP error sending email: %s - %s", response["status"], response["body"])
+        return {"success": False, "error": f"Graph API Error: {response['status']}", "details": response["body"]}
 
     except httpx.HTTPStatusError as e:
+        _MAIL_REJECTED.inc()
         error_details = e.response.text
         try:
             error_details = e.response.json()
         except:
             pass
-        print(f"HTTP error sending email: {e.response.status_code} - {error_details}")
+        logger.error("HTTP error sending email: %s - %s", e.response.status_code, error_details)
         return {"success": False, "error": f"Graph API Error: {e.response.status_code}", "details": error_details}
+    except RateLimited as e:
+        _MAIL_ERROR.inc()
+        logger.error("Email not sent: %s", e)
+        return {"success": False, "error": "RateLimited", "details": str(e)}
     except Exception as e:
-        print(f"Error sending email: {e}")
+        _MAIL_ERROR.inc()
+        logger.exception("Error sending email: %s", e)
         return {"success": False, "error": str(e)}
\ No newline at end of file
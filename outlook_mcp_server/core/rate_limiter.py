@@ -0,0 +1,246 @@
+"""
+Client-side rate limiting for Cal.com and Microsoft Graph, driven by the upstreams' own headers.
+
+One limiter per upstream account (Cal.com API key, Azure AD tenant). Each request takes a slot
+before it is sent; when none is left it waits briefly in line instead of bursting into the
+upstream's limit and coming back as a 429. Slots come from what the upstream reports:
+  - X-RateLimit-Limit / -Remaining / -Reset (or the unprefixed RateLimit-* draft headers): up to
+    the remaining quota goes out straight away, later requests wait for the window to reset
+  - Retry-After on a 429 or 503: nothing is sent until it has passed, and the throttled request
+    is sent once more if that fits in the caller's wait budget
+plus, optionally, a token bucket of our own (rate/burst) for upstreams that don't report limits.
+A request that would wait longer than its budget fails at once with RateLimited.
+
+Mirrored in bridge_server/core/ and cal_com_mcp_server/core/ (the services deploy separately) - keep all three in sync.
+"""
+import asyncio
+import hashlib
+import math
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple, TypeVar
+
+R = TypeVar("R")
+
+# Used when a 429 comes without Retry-After
+_DEFAULT_RETRY_AFTER = 1.0
+# Upstream name -> how it is named in error messages
+_LABELS = {"cal_com": "Cal.com", "graph": "Microsoft Graph"}
+# X-RateLimit-Reset values above this are epoch timestamps rather than seconds from now
+_EPOCH_THRESHOLD = 1e9
+
+
+class RateLimited(Exception):
+    """The request would have had to wait longer than its budget for the upstream's rate limit."""
+
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(f"{_LABELS.get(upstream, upstream)} rate limit reached; retry in {max(1, math.ceil(retry_after))}s")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+def _number(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delay in seconds or an HTTP date)."""
+    seconds = _number(value)
+    if seconds is not None:
+        return max(0.0, seconds)
+    if not value:
+        return None
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _reset_seconds(value: float) -> float:
+    if value > _EPOCH_THRESHOLD * 1000:  # epoch milliseconds
+        value /= 1000
+    if value > _EPOCH_THRESHOLD:
+        return max(0.0, value - time.time())
+    return max(0.0, value)
+
+
+class RateLimiter:
+    """Token bucket for one upstream account, combined with the quota the upstream reports.
+
+    Not thread-safe - like the rest of the services it is used from the event loop only.
+    """
+
+    def __init__(
+        self, upstream: str, account: str = "", rate: float = 0.0, burst: float = 0.0, max_wait: float = 5.0, enabled: bool = True
+    ):
+        self.upstream = upstream
+        # The account is only kept as a short fingerprint, so API keys don't end up in /health
+        self.name = f"{upstream}:{hashlib.sha256(account.encode()).hexdigest()[:8]}"
+        self.max_wait = max_wait
+        self.enabled = enabled
+        # Our own bucket; rate 0 = no limit of our own
+        self.rate = rate if rate > 0 else math.inf
+        self.burst = burst if burst > 0 else max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        # The upstream's quota from its X-RateLimit-* headers (unknown until a response carries them).
+        # Both balances go negative while requests are queued for them.
+        self._quota_limit: Optional[float] = None
+        self._quota_remaining: Optional[float] = None
+        self._quota_reset_at = 0.0
+        self._quota_window = 0.0
+        # Retry-After: nothing is sent before this
+        self._blocked_until = 0.0
+        self.queued = 0
+        self.rejected = 0
+        self.throttled = 0
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until the upstream's last Retry-After has passed."""
+        return max(0.0, self._blocked_until - time.monotonic())
+
+    def _refill(self, now: float) -> None:
+        if not math.isinf(self.rate):
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._quota_remaining is not None and now >= self._quota_reset_at:
+            if self._quota_window > 0:
+                # A new window: the upstream has granted its limit again
+                windows = 1 + int((now - self._quota_reset_at) // self._quota_window)
+                self._quota_remaining = min(self._quota_limit, self._quota_remaining + windows * self._quota_limit)
+                self._quota_reset_at += windows * self._quota_window
+            else:
+                self._quota_remaining = None
+
+    def _quota_wait(self, now: float) -> float:
+        if self._quota_remaining is None or self._quota_remaining >= 1:
+            return 0.0
+        # Windows needed before the upstream grants this request a slot
+        windows = math.ceil((1 - self._quota_remaining) / self._quota_limit)
+        return self._quota_reset_at - now + (windows - 1) * self._quota_window
+
+    def reserve(self, max_wait: Optional[float] = None) -> float:
+        """Take a token and return how long to wait before sending.
+
+        Raises RateLimited (without taking one) when the wait would exceed max_wait.
+        """
+        if not self.enabled:
+            return 0.0
+        now = time.monotonic()
+        self._refill(now)
+        wait = max(0.0, self._blocked_until - now, self._quota_wait(now))
+        if self._tokens < 1:
+            wait = max(wait, (1 - self._tokens) / self.rate)
+        limit = self.max_wait if max_wait is None else max_wait
+        if wait > limit:
+            self.rejected += 1
+            raise RateLimited(self.upstream, wait)
+        if not math.isinf(self.rate):
+            self._tokens -= 1
+        if self._quota_remaining is not None:
+            self._quota_remaining -= 1
+        return wait
+
+    def _release(self) -> None:
+        if not math.isinf(self.rate):
+            self._tokens = min(self.burst, self._tokens + 1)
+        if self._quota_remaining is not None:
+            self._quota_remaining = min(self._quota_limit, self._quota_remaining + 1)
+
+    async def acquire(self, max_wait: Optional[float] = None) -> None:
+        """Wait in line for a token (at most max_wait, default self.max_wait)."""
+        wait = self.reserve(max_wait)
+        if wait <= 0:
+            return
+        self.queued += 1
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            # Gave up its place - hand the token back
+            self._release()
+            raise
+
+    def observe(self, status: int, headers: Mapping[str, Any]) -> None:
+        """Adapt to a response's rate-limit headers."""
+        if not self.enabled:
+            return
+        lowered = {key.lower(): value for key, value in headers.items()}
+        now = time.monotonic()
+        self._refill(now)
+
+        limit = _number(lowered.get("x-ratelimit-limit", lowered.get("ratelimit-limit")))
+        remaining = _number(lowered.get("x-ratelimit-remaining", lowered.get("ratelimit-remaining")))
+        reset = _number(lowered.get("x-ratelimit-reset", lowered.get("ratelimit-reset")))
+        if limit is not None and limit >= 1 and remaining is not None and reset is not None:
+            reset_in = _reset_seconds(reset)
+            self._quota_limit = limit
+            self._quota_window = max(self._quota_window, reset_in)
+            if self._quota_remaining is None or now + reset_in > self._quota_reset_at + 0.5:
+                # First sight of the quota, or a later window than the one being tracked
+                self._quota_remaining = remaining
+            else:
+                # Requests sent since this one was answered have already been taken off
+                self._quota_remaining = min(self._quota_remaining, remaining)
+            self._quota_reset_at = now + reset_in
+
+        if status == 429:
+            self.throttled += 1
+        if status == 429 or (status == 503 and "retry-after" in lowered):
+            retry_after = parse_retry_after(lowered.get("retry-after"))
+            self._blocked_until = max(self._blocked_until, now + (retry_after if retry_after is not None else _DEFAULT_RETRY_AFTER))
+
+    async def send(self, request: Callable[[], Awaitable[R]], max_wait: Optional[float] = None) -> R:
+        """Send an HTTP request through the limiter; `request()` returns an httpx.Response.
+
+        A 429 is sent once more after its Retry-After when that still fits in max_wait; when it
+        doesn't (or the second attempt is throttled too), RateLimited is raised with the time to wait.
+        """
+        started = time.monotonic()
+        limit = self.max_wait if max_wait is None else max_wait
+        await self.acquire(limit)
+        response = await request()
+        self.observe(response.status_code, response.headers)
+        if response.status_code != 429 or not self.enabled:
+            return response
+        await self.acquire(limit - (time.monotonic() - started))
+        response = await request()
+        self.observe(response.status_code, response.headers)
+        if response.status_code == 429:
+            raise RateLimited(self.upstream, self.retry_after)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        self._refill(now)
+        return {
+            "rate": None if math.isinf(self.rate) else self.rate,
+            "tokens": None if math.isinf(self.rate) else round(self._tokens, 2),
+            "quota_limit": self._quota_limit,
+            "quota_remaining": self._quota_remaining,
+            "quota_reset_seconds": round(max(0.0, self._quota_reset_at - now), 2) if self._quota_remaining is not None else None,
+            "blocked_seconds": round(max(0.0, self._blocked_until - now), 2),
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "throttled": self.throttled,
+        }
+
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+
+
+def get_rate_limiter(
+    upstream: str, account: str, rate: float = 0.0, burst: float = 0.0, max_wait: float = 5.0, enabled: bool = True
+) -> RateLimiter:
+    """The process-wide limiter for an upstream account (API key, tenant id), created on first use."""
+    limiter = _limiters.get((upstream, account))
+    if limiter is None:
+        limiter = _limiters[(upstream, account)] = RateLimiter(upstream, account, rate, burst, max_wait, enabled)
+    return limiter
+
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    return {limiter.name: limiter.stats() for limiter in _limiters.values()}
@@ -3,6 +3,7 @@ from mcp.server.fastmcp import FastMCP, Context as MCPContext
 try:
     from ..schemas.outlook_schemas import SendOutlookEmailInput, SendOutlookEmailOutput
     from ..core.graph_api_utils import send_email_via_graph_api
+    from ..core.metrics import IN_FLIGHT
 except ImportError:
     # Fallback for when running as main module
     import sys
@@ -10,6 +11,7 @@ except ImportError:
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from schemas.outlook_schemas import SendOutlookEmailInput, SendOutlookEmailOutput
     from core.graph_api_utils import send_email_via_graph_api
+    from core.metrics import IN_FLIGHT
 
 outlook_mcp_instance = FastMCP(
     name="outlook_tools_server",
@@ -23,6 +25,7 @@ outlook_mcp_instance = FastMCP(
     description="Sends an email using Microsoft Graph API."
     # Input and output schemas are inferred from type hints
 )
+@IN_FLIGHT.track_in_flight
 async def send_outlook_email_mcp_tool(args: SendOutlookEmailInput, ctx: MCPContext) -> SendOutlookEmailOutput:
     """
     MCP Tool to send an email via Microsoft Graph API.
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the bridge server (direct mode) against the local upstream stubs
+(bridge_server/stubs/upstreams.py) - no credentials or network access needed.
+Run from project root: python test_bridge_offline.py  (or python -m pytest test_bridge_offline.py)
+"""
+
+import asyncio
+import atexit
+import os
+import sys
+from pathlib import Path
+
+BRIDGE_DIR = Path(__file__).parent / "bridge_server"
+
+# The bridge imports its own modules as top-level packages (core, api_clients, ...)
+sys.path.insert(0, str(BRIDGE_DIR))
+sys.path.insert(0, str(BRIDGE_DIR / "benchmarks"))
+
+from harness import bridge_env, start_stub, stop
+
+# The bridge reads its configuration at import time, so the stub has to be up first
+_stub, STUB_URL = start_stub("fixed:5")
+atexit.register(stop, _stub)
+os.environ.update(bridge_env("direct", STUB_URL, "ERROR"))
+os.environ.update({"WARMUP_ENABLED": "false", "ADMISSION_CONTROL_ENABLED": "false"})
+
+import httpx
+import main
+
+BOOKING = {
+    "attendee_name": "Jane Doe",
+    "attendee_email": "jane@example.com",
+    "attendee_timezone": "Australia/Sydney",
+    "event_type_id": 1,
+    "start_time_utc": "2030-01-15T00:00:00Z"
+}
+
+
+def _stub_config(config: dict) -> None:
+    httpx.patch(f"{STUB_URL}/_stub/config", json=config).raise_for_status()
+
+
+def _stub_requests(endpoint: str) -> int:
+    return httpx.get(f"{STUB_URL}/_stub/stats").json()[endpoint]["requests"]
+
+
+async def _with_bridge(scenario):
+    async with main.lifespan(main.app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bridge", timeout=30) as client:
+            return await scenario(client)
+
+
+def test_booking_retry_after_timeout_joins_original():
+    """A booking that outlives the caller's deadline is not sent again by the retry."""
+    async def scenario(client):
+        first = await client.post(
+            "/webhook/cal/schedule_consultation", json=BOOKING, headers={"X-Request-Timeout-Ms": "1000"}
+        )
+        retry = await client.post("/webhook/cal/schedule_consultation", json=BOOKING)
+        return first, retry
+
+    _stub_config({"endpoints": {"cal_com_bookings": {"latency": "fixed:3000"}}})
+    posts_before = _stub_requests("cal_com_bookings")
+    try:
+        first, retry = asyncio.run(_with_bridge(scenario))
+    finally:
+        _stub_config({"endpoints": {"cal_com_bookings": {"latency": "fixed:5"}}})
+
+    assert first.status_code == 503, first.text
+    assert first.json()["error"] == "deadline_exceeded"
+    assert retry.status_code == 200, retry.text
+    assert retry.headers.get("Idempotent-Replayed") == "true"
+    assert _stub_requests("cal_com_bookings") - posts_before == 1
+
+
+def test_alternatives_rejects_null_count_and_search_days():
+    """A null count or search_days is a validation error (422), not a server error."""
+    async def scenario(client):
+        request = {"event_type_id": 1, "start_time_utc": "2030-01-15T00:00:00Z"}
+        return [
+            await client.post("/webhook/cal/suggest_alternatives", json={**request, field: None})
+            for field in ("count", "search_days")
+        ]
+
+    for response in asyncio.run(_with_bridge(scenario)):
+        assert response.status_code == 422, response.text
+
+
+def _baseline_format_email_html(content: str) -> str:
+    """OutlookDirectClient._format_email_html as it was before templates/email/ - the golden output."""
+    # Clean up content by adding proper line breaks and structure
+    formatted_content = content.replace('\n', '<br>')
+    
+    # Create a professional HTML email template
+    html_template = f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <style type="text/css">
+        /* Reset styles for Outlook */
+        .ExternalClass, .ExternalClass p, .ExternalClass span, 
+        .ExternalClass font, .ExternalClass td, .ExternalClass div {{
+            line-height: 100%;
+        }}
+        p {{
+            margin: 0;
+            padding: 0;
+            margin-bottom: 15px;
+            line-height: 1.6;
+        }}
+        /* Table styles */
+        table {{
+            border-collapse: collapse;
+            mso-table-lspace: 0px;
+            mso-table-rspace: 0px;
+        }}
+        td, a, span {{
+            border-collapse: collapse;
+            mso-line-height-rule: exactly;
+        }}
+        /* Custom styles */
+        .email-container {{
+            font-family: Arial, sans-serif;
+            font-size: 14px;
+            line-height: 1.6;
+            color: #333333;
+        }}
+        .header {{
+            background-color: #f8f9fa;
+            padding: 20px;
+            border-bottom: 2px solid #e9ecef;
+        }}
+        .content {{
+            padding: 25px;
+        }}
+        .footer {{
+            background-color: #343a40;
+            color: #ffffff;
+            padding: 20px;
+            font-size: 12px;
+        }}
+        h1, h2, h3 {{
+            margin-top: 20px;
+            margin-bottom: 10px;
+            font-weight: bold;
+        }}
+        h1 {{ font-size: 24px; color: #2c3e50; }}
+        h2 {{ font-size: 18px; color: #34495e; }}
+        h3 {{ font-size: 16px; color: #34495e; }}
+        ul, ol {{
+            margin-bottom: 15px;
+            padding-left: 20px;
+        }}
+        li {{
+            margin-bottom: 8px;
+            line-height: 1.6;
+        }}
+        .cta-button {{
+            background-color: #007bff;
+            color: #ffffff;
+            padding: 12px 24px;
+            text-decoration: none;
+            border-radius: 5px;
+            display: inline-block;
+            margin: 15px 0;
+            font-weight: bold;
+        }}
+        .highlight {{
+            background-color: #fff3cd;
+            padding: 10px;
+            border-left: 4px solid #ffc107;
+            margin: 15px 0;
+        }}
+    </style>
+</head>
+<body style="margin: 0; padding: 0;">
+    <table width="100%" cellpadding="0" cellspacing="0" border="0" style="max-width: 600px; margin: 0 auto;">
+        <tr>
+            <td class="email-container">
+                <div class="content">
+                    {formatted_content}
+                </div>
+                <div class="footer">
+                    <p style="margin: 0; text-align: center;">
+                        <strong>Stuart | AI Sales Strategist</strong><br>
+                        Cre8tive AI<br>
+                        📧 stuart@cre8tive.ai | 🌐 <a href="https://cre8tive.ai" style="color: #ffffff;">cre8tive.ai</a>
+                    </p>
+                </div>
+            </td>
+        </tr>
+    </table>
+</body>
+</html>"""
+    return html_template
+
+
+def test_default_email_template_matches_baseline_rendering():
+    """templates/email/ renders the default email byte for byte as the original inline template did."""
+    from core.email_templates import default_engine
+
+    engine = default_engine()
+    for content in ("Hi Jane,\nSee you on <b>Monday</b>.\n\nThanks", "", "Café 100% ✓ {not a slot}"):
+        assert engine.render(content) == _baseline_format_email_html(content), repr(content)
+
+
+def run_all():
+    """Run every test in this file and print a summary."""
+    tests = [(name, test) for name, test in globals().items() if name.startswith("test_") and callable(test)]
+    failed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"[PASS] {name}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {name}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_all())